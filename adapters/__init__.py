@@ -1,14 +1,19 @@
-from analyst.settings import INVESTING_CONFIG, REDIS_CONFIG
+from analyst.settings import (DATAREADERS_CONFIG, INVESTING_CONFIG,
+                              REDIS_CONFIG, TIMESERIES_CONFIG)
 
 from .datareaders import alpha_vantage, yahoo
 from .datareaders.manager import DataReaderManager
 from .investing import InvestingAdapter
 from .redis import RedisAdapter
+from .timeseries import build_storage
 
 investing = InvestingAdapter(**INVESTING_CONFIG)
 redis = RedisAdapter(**REDIS_CONFIG)
+timeseries = build_storage(redis=redis, **TIMESERIES_CONFIG)
 
 datareaders = DataReaderManager(
     yahoo,
-    alpha_vantage
+    alpha_vantage,
+    redis=redis,
+    **DATAREADERS_CONFIG
 )
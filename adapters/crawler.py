@@ -0,0 +1,106 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InvestingCrawler(object):
+    """
+    Crawl investing.com with several requests in flight, all of them
+    drawing from the politeness budget of the adapter
+
+    Requests are run on threads with the adapter session,
+    the pages are parsed on the event loop
+    """
+
+    def __init__(self, adapter, concurrency=4):
+        self.adapter = adapter
+        self.concurrency = concurrency
+        self.semaphores = {}
+
+    def get_semaphore(self):
+        loop = asyncio.get_running_loop()
+
+        if loop not in self.semaphores:
+            self.semaphores = {loop: asyncio.Semaphore(self.concurrency)}
+
+        return self.semaphores[loop]
+
+    async def get_soup(self, endpoint):
+        if (content := self.adapter.get_cached(endpoint)) is None:
+            async with self.get_semaphore():
+                await self.adapter.rate_limit.acquire_async()
+
+                content = await asyncio.to_thread(self.adapter.fetch, endpoint)
+
+        return self.adapter.parse_html(content)
+
+    async def get_page(self, indice_url, page_num=None):
+        soup = await self.get_soup(self.adapter.get_components_url(indice_url, page_num=page_num))
+
+        return "page", soup
+
+    async def get_asset(self, asset):
+        soup = await self.get_soup(asset["link"])
+
+        return "asset", {**asset, **self.adapter.parse_asset(asset["link"], soup)}
+
+    async def iter_assets(self, indice_url, skip=()):
+        """
+        Yield the assets of an index as their details come, the pages
+        past the first one being fetched together once their count is
+        known, the assets named in skip are yielded without details
+        """
+        _, first_page = await self.get_page(indice_url)
+
+        pending = {
+            asyncio.ensure_future(self.get_page(indice_url, page_num=page_num))
+            for page_num in range(2, self.adapter.get_page_count(first_page) + 1)
+        }
+
+        try:
+            for asset in self.adapter.parse_assets(first_page).values():
+                if asset["name"] in skip:
+                    yield asset
+                else:
+                    pending.add(asyncio.ensure_future(self.get_asset(asset)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    kind, result = task.result()
+
+                    if kind == "asset":
+                        yield result
+                        continue
+
+                    for asset in self.adapter.parse_assets(result).values():
+                        if asset["name"] in skip:
+                            yield asset
+                        else:
+                            pending.add(asyncio.ensure_future(self.get_asset(asset)))
+        finally:
+            for task in pending:
+                task.cancel()
+
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    def iter_sync(iterator):
+        """
+        Consume an async iterator from sync code, the event loop only
+        runs while waiting for the next item so the caller can use
+        the database in between
+        """
+        loop = asyncio.new_event_loop()
+
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(iterator.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(iterator.aclose())
+            loop.close()
@@ -1,24 +1,34 @@
 import logging
 
 from datetime import date, datetime, timedelta
-from time import sleep
 
+import numpy as np
 import pandas as pd
 import requests
 
-from .exceptions import NoDataAvailable, SymbolNotFound, TooMuchApiCall
+from adapters.ratelimit import TokenBucket
+
+from .exceptions import (NoDataAvailable, ProviderUnavailable, SymbolNotFound,
+                         TooMuchApiCall)
 
 logger = logging.getLogger(__name__)
 
 
+# Days returned by the compact output size
+COMPACT_SIZE = 100
+
+
 class AlphaVantageAdapter(object):
     name = "alpha_vantage"
 
+    # Concurrent calls allowed
+    max_workers = 1
+
     def __init__(self, url=None, key=None):
         self.url = url
         self.key = key
         self.session = requests.Session()
-        self.last_call = None
+        self.rate_limit = TokenBucket(5, period=60)
         self.available_at = None
 
     def _is_available(self):
@@ -35,46 +45,23 @@ class AlphaVantageAdapter(object):
         To avoid reaching the api call limit
         for there are only 5 requests allowed by minutes
         """
-        if not self.last_call:
-            self.last_call = datetime.now()
-
-            return
-
-        now = datetime.now()
-        delta = (now - self.last_call).seconds
-
-        if delta < 12:
-            sleep(12 - delta)
-
-        self.last_call = datetime.now()
+        self.rate_limit.acquire()
 
-    def _build_dataframe(self, data):
+    @staticmethod
+    def _build_dataframe(data, column="5. adjusted close"):
         """
-        Build a generic dataframe with a daily datetime index
-        with float values
+        Build a dataframe with a sorted daily datetime index and the
+        given column of the json time serie as float close values,
+        dates and values being parsed by numpy in single calls
         """
-        df = pd.DataFrame(data).T
-        df.index = pd.to_datetime(df.index)
-
-        df = (
-            df
-            .rename(columns={
-                "1. open": "open",
-                "2. high": "high",
-                "3. low": "low",
-                "4. close": "close",
-                "5. adjusted close": "adj_close",
-                "6. volume": "volume"
-            })
-            .drop(
-                ["7. dividend amount", "8. split coefficient"],
-                axis=1
-            )
-            .sort_index()
-            .applymap(lambda v: float(v))
-        )
+        dates = np.array(list(data), dtype="datetime64[ns]")
+        values = np.array([day[column] for day in data.values()], dtype="float64")
+        order = np.argsort(dates, kind="stable")
 
-        return df
+        return pd.DataFrame(
+            {"close": values[order]},
+            index=pd.DatetimeIndex(dates[order])
+        )
 
     def _build_url_query(self, symbol, asset_type, freq="DAILY", full=True, interval="60min"):
         """
@@ -99,9 +86,37 @@ class AlphaVantageAdapter(object):
 
         return url_query
 
-    def get(self, symbol, asset_type=None, **kwargs):
+    @staticmethod
+    def is_compact(since):
+        """
+        Whether the compact output size covers the days after since,
+        there are no more trading days than business days
+        """
+        return since is not None and np.busday_count(pd.Timestamp(since).date(), date.today()) < COMPACT_SIZE
+
+    def _request(self, symbol, url_query):
         """
-        Get the latest data for the specified symbol
+        Get the json answer, raise ProviderUnavailable
+        if the api can't be reached or fails
+        """
+        self._wait_before_call()
+
+        try:
+            ret = self.session.get(url_query)
+        except requests.RequestException as exc:
+            logger.error(f"Alpha Vantage unreachable for {symbol} ({exc})")
+            raise ProviderUnavailable(symbol) from exc
+
+        if not ret.ok:
+            logger.error(f"Alpha Vantage failed for {symbol} ({ret.reason})")
+            raise ProviderUnavailable(symbol)
+
+        return ret.json()
+
+    def get(self, symbol, asset_type=None, since=None, **kwargs):
+        """
+        Get the latest data for the specified symbol, only the last
+        days if they cover the ones after since
         """
         if not self._is_available():
             return
@@ -110,17 +125,12 @@ class AlphaVantageAdapter(object):
             logger.error("No asset_type argument set")
             raise Exception("asset_type must be set")
 
-        url_query = self._build_url_query(symbol, asset_type, **kwargs)
-
-        self._wait_before_call()
-
-        ret = self.session.get(url_query)
+        if self.is_compact(since):
+            kwargs.setdefault("full", False)
 
-        if not ret.ok:
-            logger.error(f"No data available for {symbol} ({ret.reason})")
-            raise NoDataAvailable(symbol)
+        url_query = self._build_url_query(symbol, asset_type, **kwargs)
 
-        ret_json = ret.json()
+        ret_json = self._request(symbol, url_query)
 
         if ret_json.get("Error Message"):
             logger.error(f"Symbol {symbol} not found")
@@ -137,19 +147,15 @@ class AlphaVantageAdapter(object):
             raise TooMuchApiCall(symbol)
 
         if asset_type == "F":
+            # No adjusted close for currencies
             data = ret_json.get("Time Series FX (Daily)")
+            column = "4. close"
         elif asset_type in ("S", "I"):
             data = ret_json.get("Time Series (Daily)")
+            column = "5. adjusted close"
 
         if data:
-            df = self._build_dataframe(data)
-
-            df = (
-                df[["adj_close"]]
-                .rename({"adj_close": "close"}, axis=1)
-            )
-
-            return df
+            return self._build_dataframe(data, column=column)
         else:
             logger.error(f"No data available for {symbol}")
             raise NoDataAvailable(symbol)
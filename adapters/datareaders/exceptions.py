@@ -12,3 +12,7 @@ class TooMuchApiCall(DataReaderException):
 
 class NoDataAvailable(DataReaderException):
     pass
+
+
+class ProviderUnavailable(DataReaderException):
+    pass
@@ -1,28 +1,255 @@
+import logging
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from time import monotonic
+
 import pandas as pd
 
-from .exceptions import NoDataAvailable, SymbolNotFound, TooMuchApiCall
+from adapters.ratelimit import CircuitBreaker
+
+from .exceptions import NoDataAvailable, ProviderUnavailable, SymbolNotFound
+
+logger = logging.getLogger(__name__)
 
 
 class DataReaderManager(object):
-    def __init__(self, *adapters):
+    """
+    Adapters are tried in order, starting with the one which last served
+    the symbol, each one having its own thread pool for submitted
+    fetches, so a rate limited adapter only holds back the fetches it serves
+
+    Symbols an adapter doesn't have are remembered for missing_ttl seconds,
+    in Redis if set, and adapters failing threshold times in a row are
+    skipped for cooldown seconds
+    """
+
+    def __init__(self, *adapters, redis=None, missing_ttl=7 * 24 * 3600, threshold=5, cooldown=300):
         self.adapters = adapters
+        self.redis = redis
+        self.missing_ttl = missing_ttl
+        self.executors = {}
+        self.lock = Lock()
 
-    def get(self, symbol, asset_type=None):
-        for adapter in self.adapters:
-            if (
-                (asset_type == "C" and adapter.name == "alpha_vantage") or
-                (asset_type != "C" and adapter.name == "binance")
-            ):
-                continue
+        self.sources = {}
+        self.missing = {}
+        self.breakers = {
+            adapter.name: CircuitBreaker(threshold=threshold, cooldown=cooldown)
+            for adapter in adapters
+        }
+        self.counters = {
+            adapter.name: {"served": 0, "not_found": 0, "failures": 0, "skipped": 0, "latency": 0.0}
+            for adapter in adapters
+        }
+
+    def get_adapters(self, asset_type=None, symbol=None, source=None):
+        """
+        Adapters serving the asset type, the one which last served
+        the symbol or else the given source first
+        """
+        preferred = self.sources.get(symbol) or source
+
+        return sorted(
+            (
+                adapter
+                for adapter in self.adapters
+                if not (
+                    (asset_type == "C" and adapter.name == "alpha_vantage") or
+                    (asset_type != "C" and adapter.name == "binance")
+                )
+            ),
+            key=lambda adapter: adapter.name != preferred
+        )
+
+    def get_executor(self, adapter):
+        with self.lock:
+            if adapter.name not in self.executors:
+                self.executors[adapter.name] = ThreadPoolExecutor(
+                    max_workers=getattr(adapter, "max_workers", 1),
+                    thread_name_prefix=adapter.name
+                )
+
+            return self.executors[adapter.name]
+
+    @staticmethod
+    def get_missing_label(adapter, symbol):
+        return f"datareaders:missing:{adapter.name}:{symbol}"
+
+    def is_missing(self, adapter, symbol):
+        label = self.get_missing_label(adapter, symbol)
+
+        if self.redis is not None:
+            return self.redis.get(label) is not None
+
+        return self.missing.get(label, 0) > monotonic()
+
+    def set_missing(self, adapter, symbol):
+        label = self.get_missing_label(adapter, symbol)
+
+        if self.redis is not None:
+            self.redis.set(label, 1, ex=self.missing_ttl)
+        else:
+            self.missing[label] = monotonic() + self.missing_ttl
+
+    def _count(self, adapter, counter, latency=0.0):
+        with self.lock:
+            counters = self.counters[adapter.name]
+            counters[counter] += 1
+            counters["latency"] += latency
+
+    @property
+    def stats(self):
+        """
+        Counters by adapter, with the mean latency of their calls in seconds
+        """
+        stats = {}
+
+        with self.lock:
+            for name, counters in self.counters.items():
+                calls = counters["served"] + counters["not_found"] + counters["failures"]
+                stats[name] = {**counters, "latency": counters["latency"] / calls if calls else 0.0}
+
+        return stats
+
+    def fetch(self, adapter, symbol, asset_type=None, since=None):
+        """
+        Get the dataframe of an adapter, None if it doesn't serve the symbol,
+        raise ProviderUnavailable if the adapter can't tell
+
+        Only the symbols the adapter answered it doesn't know are remembered
+        as missing, request failures count against its circuit breaker
+
+        Adapters are given the since date to request the fewest days
+        covering it, only the rows from it are returned, the row of the
+        since date being kept to check the stored values against
+        """
+        if self.is_missing(adapter, symbol):
+            self._count(adapter, "skipped")
+            return None
+
+        breaker = self.breakers[adapter.name]
+
+        if not breaker.allow():
+            self._count(adapter, "skipped")
+            raise ProviderUnavailable(f"{adapter.name} disabled after repeated failures")
 
+        started_at = monotonic()
+
+        try:
+            df = adapter.get(symbol, asset_type=asset_type, since=since)
+        except SymbolNotFound:
+            breaker.success()
+            self._count(adapter, "not_found", latency=monotonic() - started_at)
+            self.set_missing(adapter, symbol)
+            return None
+        except NoDataAvailable:
+            # Answered without data, which may be temporary
+            breaker.success()
+            self._count(adapter, "not_found", latency=monotonic() - started_at)
+            return None
+        except Exception as exc:
+            logger.warning(f"{adapter.name} failed on {symbol}: {exc}")
+            breaker.failure()
+            self._count(adapter, "failures", latency=monotonic() - started_at)
+            raise ProviderUnavailable(f"{adapter.name}: {exc}") from exc
+
+        if df is None:
+            self._count(adapter, "skipped")
+            raise ProviderUnavailable(f"{adapter.name} unavailable")
+
+        breaker.success()
+        self._count(adapter, "served", latency=monotonic() - started_at)
+
+        if not isinstance(df, pd.DataFrame):
+            return None
+
+        if df.empty:
+            # No rows after the since date isn't an unknown symbol, nothing is remembered
+            return df if since is not None else None
+
+        self.sources[symbol] = adapter.name
+
+        return self.trim(df, since=since)
+
+    @staticmethod
+    def trim(df, since=None):
+        """
+        Rows from 1970 on, and from the since date if given
+        """
+        df = df.loc["1970-01-01":]
+
+        if since is not None:
+            df = df[df.index >= pd.Timestamp(since)]
+
+        return df
+
+    def get(self, symbol, asset_type=None, since=None, source=None):
+        """
+        Get the dataframe of the first adapter serving the symbol,
+        only the rows from the since date if specified
+
+        Return (None, None) if no adapter has the symbol, raise
+        ProviderUnavailable if none served it and one couldn't tell
+        """
+        error = None
+
+        for adapter in self.get_adapters(asset_type, symbol=symbol, source=source):
             try:
-                df = adapter.get(symbol, asset_type=asset_type)
-            except (NoDataAvailable, SymbolNotFound, TooMuchApiCall):
+                df = self.fetch(adapter, symbol, asset_type=asset_type, since=since)
+            except ProviderUnavailable as exc:
+                error = exc
                 continue
 
-            if isinstance(df, pd.DataFrame) and not df.empty:
-                df = df.loc["1970-01-01":]
-
+            if df is not None:
                 return adapter.name, df
 
+        if error is not None:
+            raise error
+
         return None, None
+
+    def submit(self, symbol, asset_type=None, since=None, source=None):
+        """
+        Same as get, run on the adapters thread pools,
+        return a future of the (source, dataframe) result
+        """
+        future = Future()
+        adapters = self.get_adapters(asset_type, symbol=symbol, source=source)
+
+        self._submit(future, adapters, symbol, asset_type, since)
+
+        return future
+
+    def _submit(self, future, adapters, symbol, asset_type, since, error=None):
+        if not adapters:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result((None, None))
+            return
+
+        adapter, *remaining = adapters
+
+        def run():
+            try:
+                df = self.fetch(adapter, symbol, asset_type=asset_type, since=since)
+            except ProviderUnavailable as exc:
+                self._submit(future, remaining, symbol, asset_type, since, error=exc)
+                return
+            except Exception as exc:
+                future.set_exception(exc)
+                return
+
+            if df is None:
+                self._submit(future, remaining, symbol, asset_type, since, error=error)
+            else:
+                future.set_result((adapter.name, df))
+
+        self.get_executor(adapter).submit(run)
+
+    def shutdown(self):
+        with self.lock:
+            for executor in self.executors.values():
+                executor.shutdown()
+
+            self.executors = {}
@@ -3,17 +3,38 @@ import logging
 from pandas_datareader._utils import RemoteDataError
 from pandas_datareader.data import DataReader
 
-from .exceptions import SymbolNotFound
+from adapters.ratelimit import TokenBucket
+
+from .exceptions import ProviderUnavailable, SymbolNotFound
 
 logger = logging.getLogger(__name__)
 
 
+def is_unknown_symbol(error):
+    """
+    Whether the RemoteDataError is Yahoo answering it has no data for
+    the symbol, failed requests being reported as "Unable to read URL"
+    along with the request exception or the error response text
+    """
+    message = str(error)
+
+    return not message.startswith("Unable to read URL") or "Not Found" in message or "No data found" in message
+
+
 class YahooAdapter(object):
     name = "yahoo"
 
-    def get(self, symbol, asset_type=None, **kwargs):
+    # Concurrent calls allowed
+    max_workers = 4
+
+    def __init__(self):
+        # No documented limit, stay polite
+        self.rate_limit = TokenBucket(4, capacity=4)
+
+    def get(self, symbol, asset_type=None, since=None, **kwargs):
         """
-        Get the latest data for the specified symbol
+        Get the latest data for the specified symbol,
+        starting from the since date if specified
         """
         if not asset_type:
             logger.error("No asset_type argument set")
@@ -22,9 +43,18 @@ class YahooAdapter(object):
         if asset_type == "F":
             symbol = symbol.replace("/", "") + "=X"
 
+        self.rate_limit.acquire()
+
         try:
-            df = DataReader(symbol, "yahoo", start="1950-01-01", **kwargs)
-        except (RemoteDataError, KeyError):
+            df = DataReader(symbol, "yahoo", start=since if since is not None else "1950-01-01", **kwargs)
+        except RemoteDataError as exc:
+            if not is_unknown_symbol(exc):
+                logger.error(f"Yahoo unreachable for {symbol}")
+                raise ProviderUnavailable(symbol) from exc
+
+            logger.error(f"Symbol {symbol} not found")
+            raise SymbolNotFound(symbol)
+        except KeyError:
             logger.error(f"Symbol {symbol} not found")
             raise SymbolNotFound(symbol)
 
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time
+
+from .timeseries import codecs
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache(object):
+    """
+    Responses bodies stored compressed in a directory, keyed by url,
+    along with their fetch time and validators in a json file
+
+    Fresh entries are served without any request, stale ones are
+    revalidated with their ETag and Last-Modified headers
+    """
+
+    def __init__(self, path, ttl=86400, codec="zlib"):
+        self.path = path
+        self.ttl = ttl
+        self.codec = codecs.get_codec(codec)
+        self.lock = Lock()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    @property
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses
+        }
+
+    def _count(self, stat):
+        with self.lock:
+            setattr(self, stat, getattr(self, stat) + 1)
+
+    def _get_path(self, url, extension):
+        key = hashlib.sha256(url.encode()).hexdigest()
+
+        return os.path.join(self.path, f"{key}.{extension}")
+
+    def _write(self, path, data):
+        os.makedirs(self.path, exist_ok=True)
+
+        with NamedTemporaryFile(dir=self.path, delete=False) as tmp_file:
+            tmp_file.write(data)
+
+        os.replace(tmp_file.name, path)
+
+    def get_entry(self, url):
+        try:
+            with open(self._get_path(url, "json"), "rb") as entry_file:
+                return json.loads(entry_file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def is_fresh(self, entry):
+        return time() - entry["fetched_at"] < self.ttl
+
+    def get_body(self, url):
+        try:
+            with open(self._get_path(url, "body"), "rb") as body_file:
+                return codecs.decode(body_file.read())
+        except FileNotFoundError:
+            return None
+
+    def get(self, url):
+        """
+        Return the body of a fresh entry, None if missing or stale
+        """
+        if (entry := self.get_entry(url)) and self.is_fresh(entry):
+            if (body := self.get_body(url)) is not None:
+                self._count("hits")
+
+                return body
+
+        return None
+
+    def get_validators(self, url):
+        """
+        Conditional request headers of a stored entry
+        """
+        headers = {}
+
+        if entry := self.get_entry(url):
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def set(self, url, body, headers):
+        """
+        Store a fetched body, the body is written before the entry
+        so an entry always points to a complete body
+        """
+        self._count("misses")
+
+        self._write(self._get_path(url, "body"), codecs.encode(body, self.codec))
+        self._write(self._get_path(url, "json"), json.dumps({
+            "url": url,
+            "fetched_at": time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified")
+        }).encode())
+
+    def revalidate(self, url):
+        """
+        Refresh an entry left unchanged upstream, return its body
+        """
+        if (entry := self.get_entry(url)) is None or (body := self.get_body(url)) is None:
+            return None
+
+        self._count("revalidations")
+
+        entry["fetched_at"] = time()
+        self._write(self._get_path(url, "json"), json.dumps(entry).encode())
+
+        return body
@@ -1,13 +1,13 @@
 import logging
 import re
 
-from datetime import datetime
-from time import sleep
-
-from bs4 import BeautifulSoup
 from cached_property import cached_property
 from requests import Session
 
+from .http_cache import ResponseCache
+from .parsing import get_parser
+from .ratelimit import TokenBucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -83,9 +83,15 @@ class NoTickerDataFound(Exception):
 
 class InvestingAdapter(object):
 
-    def __init__(self, url=None, config=None, session=None):
+    def __init__(
+        self, url=None, config=None, session=None,
+        concurrency=4, requests_per_minute=6, cache_path=None, cache_ttl=86400, parser="lxml"
+    ):
         self.url = url
         self.config = config
+        self.parser = get_parser(parser)
+        self.concurrency = concurrency
+        self.cache = ResponseCache(cache_path, ttl=cache_ttl) if cache_path else None
 
         if session:
             self.session = session
@@ -93,35 +99,61 @@ class InvestingAdapter(object):
             self.session = Session()
             self.session.headers["User-Agent"] = "Mozilla/5.1"
 
-        self.last_call = None
+        # Politeness budget shared by the sync calls and the crawler
+        self.rate_limit = TokenBucket(requests_per_minute, period=60)
 
     def _wait_before_call(self):
         """
         To avoid reaching the api call limit
         for there are only 5 requests allowed by minutes
         """
-        if not self.last_call:
-            self.last_call = datetime.now()
+        self.rate_limit.acquire()
 
-            return
+    def get_full_url(self, url):
+        return self.url + url
 
-        now = datetime.now()
-        delta = (now - self.last_call).seconds
+    def get_cached(self, endpoint):
+        """
+        Body of a fresh cached response, None if it has to be fetched
+        """
+        if self.cache:
+            return self.cache.get(self.url + endpoint)
 
-        if delta < 10:
-            sleep(10 - delta)
+    def fetch(self, endpoint):
+        url = self.url + endpoint
 
-        self.last_call = datetime.now()
+        if not self.cache:
+            return self.session.get(url).content
 
-    def get_full_url(self, url):
-        return self.url + url
+        response = self.session.get(url, headers=self.cache.get_validators(url))
+
+        if response.status_code == 304:
+            if (content := self.cache.revalidate(url)) is not None:
+                return content
+
+            response = self.session.get(url)
+
+        if response.status_code == 200:
+            self.cache.set(url, response.content, response.headers)
+
+        return response.content
+
+    def parse_html(self, content):
+        return self.parser.parse(content)
 
     def get_soup(self, endpoint):
-        data = self.session.get(self.url + endpoint)
+        if (content := self.get_cached(endpoint)) is None:
+            content = self.fetch(endpoint)
 
-        self._wait_before_call()
+            self._wait_before_call()
 
-        return BeautifulSoup(data.content, "html.parser")
+        return self.parse_html(content)
+
+    @cached_property
+    def crawler(self):
+        from .crawler import InvestingCrawler
+
+        return InvestingCrawler(self, concurrency=self.concurrency)
 
     def is_allowed(self, data, filter_key=None, bypass_filter=False, **kwargs):
         if self.config and filter_key and not bypass_filter:
@@ -150,10 +182,11 @@ class InvestingAdapter(object):
         ]
 
     def parse_span(self, tr_item):
-        tds = tr_item.findAll("td")
-        country = tds[0].span.attrs["title"]
-        link = tds[1].a.attrs["href"]
-        name = tds[1].a.text.replace(";", "")
+        parser = self.parser
+        tds = parser.find_all(tr_item, "td")
+        country = parser.get_attr(parser.find(tds[0], "span"), "title")
+        link = parser.get_attr(parser.find(tds[1], "a"), "href")
+        name = parser.get_text(parser.find(tds[1], "a")).replace(";", "")
 
         return {
             "name": name,
@@ -169,11 +202,7 @@ class InvestingAdapter(object):
         indices = {}
 
         soup = self.get_soup("/indices/major-indices")
-        indices_data = (
-            soup.find(id="cross_rates_container")
-            .find("tbody")
-            .findAll("tr")
-        )
+        indices_data = self.get_rows(soup, "cross_rates_container")
 
         for indice_data in indices_data:
             indice = self.parse_span(indice_data)
@@ -186,19 +215,32 @@ class InvestingAdapter(object):
     def get_assets(self, indice_url):
         return self._get_assets(indice_url)
 
-    def _get_assets(self, indice_url, page_num=None):
-        assets = {}
+    def crawl_assets(self, indice_url, skip=()):
+        """
+        Yield the assets of an index with their details, fetched
+        concurrently, the details of the skipped names aren't fetched
+        """
+        return self.crawler.iter_sync(self.crawler.iter_assets(indice_url, skip=skip))
 
+    @staticmethod
+    def get_components_url(indice_url, page_num=None):
         full_indice_url = f"{indice_url}-components"
         if page_num:
             full_indice_url += f"/{page_num}"
 
-        soup = self.get_soup(full_indice_url)
-        assets_data = (
-            soup.find(id="marketInnerContent")
-            .find("tbody")
-            .findAll("tr")
-        )
+        return full_indice_url
+
+    def get_rows(self, soup, table_id):
+        """
+        Rows of the body of the table under the element with the given id
+        """
+        tbody = self.parser.find(self.parser.find_id(soup, table_id), "tbody")
+
+        return self.parser.find_all(tbody, "tr")
+
+    def parse_assets(self, soup):
+        assets = {}
+        assets_data = self.get_rows(soup, "marketInnerContent")
 
         for asset_data in assets_data:
             asset = self.parse_span(asset_data)
@@ -206,9 +248,20 @@ class InvestingAdapter(object):
             if self.is_allowed(asset, filter_key="asset"):
                 assets[asset["name"]] = asset
 
-        if not page_num and (pagination := soup.find(id="paginationWrap")):
-            page_nums = pagination.findAll("a", attrs={"class": "pagination"})
-            for page_num in range(2, len(page_nums) + 1):
+        return assets
+
+    def get_page_count(self, soup):
+        if (pagination := self.parser.find_id(soup, "paginationWrap")) is not None:
+            return len(self.parser.find_all_class(pagination, "a", "pagination"))
+
+        return 1
+
+    def _get_assets(self, indice_url, page_num=None):
+        soup = self.get_soup(self.get_components_url(indice_url, page_num=page_num))
+        assets = self.parse_assets(soup)
+
+        if not page_num:
+            for page_num in range(2, self.get_page_count(soup) + 1):
                 assets.update(self._get_assets(
                     indice_url,
                     page_num=page_num
@@ -216,18 +269,18 @@ class InvestingAdapter(object):
 
         return assets
 
-    @staticmethod
-    def parse_extra_list(soup):
+    def parse_extra_list(self, soup):
+        parser = self.parser
         extra_dict = {}
-        extra_list = soup.find("div", attrs={"class": "overviewDataTable"})
+        extra_list = parser.find_class(soup, "div", "overviewDataTable")
 
-        if not extra_list:
+        if extra_list is None:
             return {}
 
-        for div in extra_list.findAll("div"):
-            spans = div.findAll("span")
-            key = spans[0].text
-            value = spans[1].text
+        for div in parser.find_all(extra_list, "div"):
+            spans = parser.find_all(div, "span")
+            key = parser.get_text(spans[0])
+            value = parser.get_text(spans[1])
 
             if parsing_conf := PARSING_DICT.get(key):
                 if "n/a" in value.lower():
@@ -237,16 +290,16 @@ class InvestingAdapter(object):
 
         return extra_dict
 
-    @staticmethod
-    def get_ticker_datas(soup):
+    def get_ticker_datas(self, soup):
+        parser = self.parser
         ticker = None
 
-        ticker_list = soup.find(id="DropdownSiblingsTable")
-        if ticker_list:
-            for tr_item in ticker_list.findAll("tr")[1:]:
-                tds = tr_item.findAll("td")
-                ticker = tds[1].a.text
-                currency = tds[3].text
+        ticker_list = parser.find_id(soup, "DropdownSiblingsTable")
+        if ticker_list is not None:
+            for tr_item in parser.find_all(ticker_list, "tr")[1:]:
+                tds = parser.find_all(tr_item, "td")
+                ticker = parser.get_text(parser.find(tds[1], "a"))
+                currency = parser.get_text(tds[3])
 
                 if ticker.isdigit():
                     continue
@@ -256,12 +309,9 @@ class InvestingAdapter(object):
                     "currency": currency
                 }
         else:
-            instrument = soup.findAll(
-                "div",
-                attrs={"class": "instrumentHead"}
-            )
-            if instrument:
-                indice_text = instrument[0].h1.text
+            instrument = parser.find_class(soup, "div", "instrumentHead")
+            if instrument is not None:
+                indice_text = parser.get_text(parser.find(instrument, "h1"))
                 splitted = re.split(r"\(|\)", indice_text)
                 if len(splitted) > 1:
                     ticker = splitted[-2]
@@ -271,8 +321,9 @@ class InvestingAdapter(object):
         return {"pending_ticker": ticker}
 
     def get_asset(self, asset_url):
-        sleep(10)
-        soup = self.get_soup(asset_url)
+        return self.parse_asset(asset_url, self.get_soup(asset_url))
+
+    def parse_asset(self, asset_url, soup):
         ticker_data = self.get_ticker_datas(soup)
 
         if "indices" in asset_url:
@@ -0,0 +1,114 @@
+import logging
+
+import lxml.html
+
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownParser(Exception):
+    pass
+
+
+class LxmlParser(object):
+    """
+    Pages are parsed into an lxml tree, built in C, and the elements
+    are looked up with lxml own lookups instead of a soup traversal
+    """
+    name = "lxml"
+
+    def __init__(self):
+        self.html_parser = lxml.html.HTMLParser(encoding="utf-8")
+
+    def parse(self, content):
+        if isinstance(content, str):
+            content = content.encode()
+
+        return lxml.html.document_fromstring(content, parser=self.html_parser)
+
+    @staticmethod
+    def find_id(element, element_id):
+        return element.get_element_by_id(element_id, None)
+
+    @staticmethod
+    def iter_class(element, tag, class_name):
+        # Faster than find_class as only the tag elements are visited
+        for found in element.iterdescendants(tag):
+            if class_name in (found.get("class") or "").split():
+                yield found
+
+    def find_class(self, element, tag, class_name):
+        return next(self.iter_class(element, tag, class_name), None)
+
+    def find_all_class(self, element, tag, class_name):
+        return list(self.iter_class(element, tag, class_name))
+
+    @staticmethod
+    def find(element, tag):
+        return next(element.iterdescendants(tag), None)
+
+    @staticmethod
+    def find_all(element, tag):
+        return list(element.iterdescendants(tag))
+
+    @staticmethod
+    def get_text(element):
+        return element.text_content()
+
+    @staticmethod
+    def get_attr(element, name):
+        return element.get(name)
+
+
+class SoupParser(object):
+    """
+    Pages are parsed into a BeautifulSoup tree with the pure Python parser
+    """
+    name = "html.parser"
+
+    @staticmethod
+    def parse(content):
+        return BeautifulSoup(content, "html.parser")
+
+    @staticmethod
+    def find_id(element, element_id):
+        return element.find(id=element_id)
+
+    @staticmethod
+    def find_class(element, tag, class_name):
+        return element.find(tag, attrs={"class": class_name})
+
+    @staticmethod
+    def find_all_class(element, tag, class_name):
+        return element.findAll(tag, attrs={"class": class_name})
+
+    @staticmethod
+    def find(element, tag):
+        return element.find(tag)
+
+    @staticmethod
+    def find_all(element, tag):
+        return element.findAll(tag)
+
+    @staticmethod
+    def get_text(element):
+        return element.text
+
+    @staticmethod
+    def get_attr(element, name):
+        return element.get(name)
+
+
+PARSERS = {
+    parser.name: parser
+    for parser in (LxmlParser(), SoupParser())
+}
+
+
+def get_parser(name):
+    if not (parser := PARSERS.get(name)):
+        logger.error(f"Unknown html parser {name}")
+        raise UnknownParser(name)
+
+    return parser
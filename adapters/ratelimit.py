@@ -0,0 +1,92 @@
+import asyncio
+
+from threading import Lock
+from time import monotonic, sleep
+
+
+class TokenBucket(object):
+    """
+    Allow rate calls per period seconds on average,
+    with bursts of up to capacity calls
+    """
+
+    def __init__(self, rate, period=1.0, capacity=1):
+        self.rate = rate / period
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = monotonic()
+        self.lock = Lock()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens=1):
+        """
+        Take the tokens if available, return 0 if taken
+        or else the seconds to wait for them
+        """
+        with self.lock:
+            self._refill()
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+
+                return 0
+
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        while (wait := self.try_acquire(tokens)) > 0:
+            sleep(wait)
+
+    async def acquire_async(self, tokens=1):
+        """
+        Same as acquire, waiting without blocking the event loop
+        """
+        while (wait := self.try_acquire(tokens)) > 0:
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker(object):
+    """
+    Opened after threshold consecutive failures, calls are then refused
+    until the cooldown is over, when a single trial call is let through
+    to close it again or to keep it open for another cooldown
+    """
+
+    def __init__(self, threshold=5, cooldown=300):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.lock = Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+
+            if monotonic() - self.opened_at >= self.cooldown:
+                self.opened_at = monotonic()
+
+                return True
+
+            return False
+
+    def success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+
+            if self.failures >= self.threshold:
+                self.opened_at = monotonic()
@@ -1,7 +1,11 @@
 import logging
 
+from contextlib import contextmanager
+
 from redis import StrictRedis
 
+from .utils import chunked
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,18 +17,102 @@ class RedisAdapter(object):
     def _set_prefix(self, value):
         return f"{self.prefix}{value}"
 
+    def _unset_prefix(self, value):
+        if isinstance(value, bytes):
+            value = value.decode()
+
+        return value[len(self.prefix):]
+
     def set(self, key, value, **kwargs):
         return self.redis.set(self._set_prefix(key), value, **kwargs)
 
     def get(self, key):
         return self.redis.get(self._set_prefix(key))
 
+    def mset(self, mapping):
+        return self.redis.mset({
+            self._set_prefix(key): value
+            for key, value in mapping.items()
+        })
+
+    def mget(self, keys):
+        return self.redis.mget([self._set_prefix(key) for key in keys])
+
+    def append(self, key, value):
+        return self.redis.append(self._set_prefix(key), value)
+
+    def getrange(self, key, start, end):
+        return self.redis.getrange(self._set_prefix(key), start, end)
+
+    def incr(self, key):
+        return self.redis.incr(self._set_prefix(key))
+
+    def hset(self, key, mapping):
+        return self.redis.hset(self._set_prefix(key), mapping=mapping)
+
+    def hgetall(self, key):
+        return self.redis.hgetall(self._set_prefix(key))
+
+    def expire(self, key, seconds):
+        return self.redis.expire(self._set_prefix(key), seconds)
+
     def delete(self, key):
         return self.redis.delete(self._set_prefix(key))
 
+    def unlink(self, *keys):
+        return self.redis.unlink(*[self._set_prefix(key) for key in keys])
+
+    @contextmanager
+    def pipeline(self, transaction=True):
+        """
+        Queue the commands sent through the yielded pipeline
+        and execute them at once when leaving the context,
+        their results are then available in pipeline.results
+        """
+        pipeline = RedisPipeline(self.redis.pipeline(transaction=transaction), self.prefix)
+
+        try:
+            yield pipeline
+            pipeline.execute()
+        finally:
+            pipeline.reset()
+
+    def scan_iter(self, pattern="*", count=1000):
+        """
+        Iterate over the keys matching the pattern with SCAN,
+        yield them without prefix
+        """
+        for key in self.redis.scan_iter(match=self._set_prefix(pattern), count=count):
+            yield self._unset_prefix(key)
+
     def list(self, pattern="*"):
-        return self.redis.keys(self._set_prefix(pattern))
+        return [self._set_prefix(key) for key in self.scan_iter(pattern)]
+
+    def delete_all(self, pattern="*", chunk_size=1000):
+        deleted = 0
+
+        for keys in chunked(self.scan_iter(pattern), chunk_size):
+            deleted += self.unlink(*keys)
+
+        return deleted
+
+
+class RedisPipeline(RedisAdapter):
+    def __init__(self, pipeline, prefix):
+        self.redis = pipeline
+        self.prefix = prefix
+        self.results = None
+
+    def watch(self, *keys):
+        return self.redis.watch(*[self._set_prefix(key) for key in keys])
+
+    def multi(self):
+        return self.redis.multi()
+
+    def execute(self):
+        self.results = self.redis.execute()
+
+        return self.results
 
-    def delete_all(self):
-        for k in self.list():
-            self.redis.delete(k)
+    def reset(self):
+        self.redis.reset()
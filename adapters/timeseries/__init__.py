@@ -0,0 +1,12 @@
+from .exceptions import UnknownBackend
+from .files import FileTimeserieStorage
+from .redis import RedisTimeserieStorage
+
+
+def build_storage(backend="redis", redis=None, path=None, cache_size=0, codec=None):
+    if backend == "redis":
+        return RedisTimeserieStorage(redis, cache_size=cache_size, codec=codec)
+    elif backend == "file":
+        return FileTimeserieStorage(path, cache_size=cache_size)
+
+    raise UnknownBackend(backend)
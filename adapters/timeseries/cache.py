@@ -0,0 +1,97 @@
+import logging
+
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+CacheEntry = namedtuple("CacheEntry", ["version", "value", "size"])
+
+
+def get_size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+
+    return getattr(value, "nbytes", 0)
+
+
+class LRUCache(object):
+    """
+    In process least recently used cache bounded by the size
+    in bytes of the values it holds
+
+    Values are stored with a version and only served
+    while the requested version matches
+    """
+
+    def __init__(self, max_size=0):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key, version):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry.version != version:
+                self.misses += 1
+
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+
+            return entry.value
+
+    def set(self, key, version, value):
+        size = get_size(value)
+
+        with self.lock:
+            self._pop(key)
+
+            if size > self.max_size:
+                return
+
+            self.entries[key] = CacheEntry(version, value, size)
+            self.size += size
+
+            while self.size > self.max_size:
+                _, entry = self.entries.popitem(last=False)
+                self.size -= entry.size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self.lock:
+            self._pop(key)
+
+    def _pop(self, key):
+        if entry := self.entries.pop(key, None):
+            self.size -= entry.size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    @property
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "size": self.size,
+            "max_size": self.max_size
+        }
@@ -0,0 +1,151 @@
+import logging
+import struct
+import zlib
+
+from threading import local
+
+import lz4.frame
+import zstandard
+
+from .exceptions import UnknownCodec
+
+logger = logging.getLogger(__name__)
+
+
+# Compressed blobs are made of frames, each one being a codec tag
+# followed by the compressed payload length and the payload itself.
+# Tags have their high bit set so they can't be mistaken for
+# a serializer format byte.
+FRAME = struct.Struct("<BI")
+FRAME_FLAG = 0x80
+
+
+class ZlibCodec(object):
+    name = "zlib"
+    id = 1
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+
+class ZstdCodec(object):
+    """
+    Zstandard contexts can't be shared between threads,
+    each thread gets its own
+    """
+    name = "zstd"
+    id = 2
+
+    def __init__(self, level=3):
+        self.level = level
+        self.contexts = local()
+
+    @property
+    def compressor(self):
+        if not hasattr(self.contexts, "compressor"):
+            self.contexts.compressor = zstandard.ZstdCompressor(level=self.level)
+
+        return self.contexts.compressor
+
+    @property
+    def decompressor(self):
+        if not hasattr(self.contexts, "decompressor"):
+            self.contexts.decompressor = zstandard.ZstdDecompressor()
+
+        return self.contexts.decompressor
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def decompress(self, data):
+        return self.decompressor.decompress(data)
+
+
+class Lz4Codec(object):
+    name = "lz4"
+    id = 3
+
+    def compress(self, data):
+        return lz4.frame.compress(data)
+
+    def decompress(self, data):
+        return lz4.frame.decompress(data)
+
+
+CODECS = {
+    codec.name: codec
+    for codec in (ZlibCodec(), ZstdCodec(), Lz4Codec())
+}
+CODECS_BY_ID = {codec.id: codec for codec in CODECS.values()}
+
+
+def get_codec(name):
+    """
+    Return the codec registered under name, None for no compression
+    """
+    if not name or name == "none":
+        return None
+
+    if not (codec := CODECS.get(name)):
+        logger.error(f"Unknown timeserie codec {name}")
+        raise UnknownCodec(name)
+
+    return codec
+
+
+def is_framed(blob):
+    return bool(blob) and bool(blob[0] & FRAME_FLAG)
+
+
+def encode(data, codec):
+    """
+    Compress data in a single frame, return data as is without codec
+    """
+    if codec is None:
+        return data
+
+    payload = codec.compress(data)
+
+    return FRAME.pack(FRAME_FLAG | codec.id, len(payload)) + payload
+
+
+def iter_frames(blob):
+    offset = 0
+
+    while offset < len(blob):
+        tag, length = FRAME.unpack_from(blob, offset)
+        offset += FRAME.size
+
+        if not (codec := CODECS_BY_ID.get(tag & ~FRAME_FLAG)):
+            logger.error(f"Unknown timeserie codec tag {tag}")
+            raise UnknownCodec(tag)
+
+        yield codec, blob[offset:offset + length]
+        offset += length
+
+
+def decode(blob):
+    """
+    Decompress and join all the frames of a blob,
+    return blobs without frames as is
+    """
+    if not is_framed(blob):
+        return blob
+
+    return b"".join(codec.decompress(payload) for codec, payload in iter_frames(blob))
+
+
+def get_blob_codec(blob):
+    """
+    Name of the codec of the first frame of a blob
+    """
+    if not is_framed(blob):
+        return "none"
+
+    return CODECS_BY_ID[blob[0] & ~FRAME_FLAG].name
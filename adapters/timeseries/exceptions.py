@@ -0,0 +1,18 @@
+class TimeserieException(Exception):
+    pass
+
+
+class UnknownFormat(TimeserieException):
+    pass
+
+
+class UnknownCodec(TimeserieException):
+    pass
+
+
+class UnknownBackend(TimeserieException):
+    pass
+
+
+class SerieRebased(TimeserieException):
+    pass
@@ -0,0 +1,152 @@
+import logging
+import os
+
+from tempfile import NamedTemporaryFile
+
+import numpy as np
+
+from . import metadata as metadata_serializer
+from . import serializers
+from .storage import TimeserieStorage, get_range_positions
+
+logger = logging.getLogger(__name__)
+
+
+# Enough bytes to hold a records header
+PEEK_SIZE = 1024
+
+
+class FileTimeserieStorage(TimeserieStorage):
+    """
+    Series are stored in a directory as uncompressed records files
+    "<label>.bin", mapped in memory when read so processes on the same
+    host share the page cache, along with "<label>.json" metadata files
+    holding the serie version, kept as a tombstone once deleted
+
+    Files are replaced atomically on writes, appended rows are written
+    at the end of the records file before the metadata is updated
+    """
+
+    def __init__(self, path, cache_size=0):
+        super().__init__(cache_size=cache_size)
+
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _get_path(self, label, extension):
+        return os.path.join(self.path, f"{label}.{extension}")
+
+    def _write(self, path, data):
+        with NamedTemporaryFile(dir=self.path, delete=False) as tmp_file:
+            tmp_file.write(data)
+
+        os.replace(tmp_file.name, path)
+
+    def _read_metadata(self, label):
+        """
+        Read the metadata file, the tombstone of a deleted serie included
+        """
+        try:
+            with open(self._get_path(label, "json"), "rb") as metadata_file:
+                return metadata_serializer.loads(metadata_file.read())
+        except FileNotFoundError:
+            return None
+
+    def get_metadata(self, label):
+        if (metadata := self._read_metadata(label)) and not metadata.get("deleted"):
+            return metadata
+
+    def _set_metadata(self, label, metadata, previous=None):
+        metadata["version"] = (previous or {}).get("version", 0) + 1
+
+        self._write(self._get_path(label, "json"), metadata_serializer.dumps(metadata).encode())
+
+    def get_version(self, label):
+        if metadata := self._read_metadata(label):
+            return metadata.get("version")
+
+    def get_records(self, label):
+        """
+        Map the stored records in memory, return the columns and a read only
+        structured array with an "index" field of int64 nanoseconds timestamps
+        and a "c<i>" field per column, None if the serie is missing
+        """
+        path = self._get_path(label, "bin")
+
+        try:
+            with open(path, "rb") as records_file:
+                head = records_file.read(PEEK_SIZE)
+        except FileNotFoundError:
+            return None
+
+        serializer = serializers.records_serializer
+        columns, offset = serializer.parse_header(head)
+        dtype = serializer.get_dtype(len(columns))
+
+        # Leave out a record being appended
+        count = (os.path.getsize(path) - offset) // dtype.itemsize
+
+        if not count:
+            return columns, np.empty(0, dtype=dtype)
+
+        return columns, np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+    def _read(self, label):
+        if (records := self.get_records(label)) is None:
+            return None
+
+        return serializers.records_serializer.build_dataframe(*records)
+
+    def _read_range(self, label, start=None, end=None):
+        """
+        Only the pages of the mapped rows in the range are read
+        """
+        if (records := self.get_records(label)) is None:
+            return None
+
+        columns, records = records
+        first, last = get_range_positions(records["index"], start, end)
+
+        return serializers.records_serializer.build_dataframe(columns, records[first:last])
+
+    def set(self, label, dataframe, source=None):
+        data = serializers.dumps(dataframe)
+        metadata = metadata_serializer.build_metadata(dataframe, data, source=source)
+        metadata["codec"] = self.codec_name
+
+        self._write(self._get_path(label, "bin"), data)
+        self._set_metadata(label, metadata, previous=self._read_metadata(label))
+
+    def _append(self, label, dataframe, metadata, source=None):
+        data = serializers.records_serializer.dump_records(dataframe, columns=metadata["columns"])
+
+        with open(self._get_path(label, "bin"), "ab") as records_file:
+            records_file.write(data)
+
+        self._set_metadata(
+            label,
+            metadata_serializer.update_metadata(dict(metadata), dataframe, data=data, source=source),
+            previous=metadata
+        )
+
+    def delete(self, label):
+        """
+        Delete the records file and replace the metadata by a tombstone
+        keeping the version, so the series cached by other processes are
+        not served again if the label is rewritten
+        """
+        self.cache.delete(label)
+
+        deleted = 0
+
+        try:
+            os.remove(self._get_path(label, "bin"))
+            deleted += 1
+        except FileNotFoundError:
+            pass
+
+        if (metadata := self._read_metadata(label)) is not None:
+            deleted += not metadata.get("deleted")
+            self._set_metadata(label, {"deleted": True}, previous=metadata)
+
+        return deleted
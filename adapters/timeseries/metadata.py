@@ -0,0 +1,63 @@
+import json
+import zlib
+
+import pandas as pd
+
+
+def build_metadata(dataframe, data, columns=None, source=None):
+    """
+    Describe a stored serie, data being its stored blob
+    """
+    metadata = {
+        "columns": [str(column) for column in (columns if columns is not None else dataframe.columns)],
+        "first_date": None,
+        "last_date": None,
+        "rows": 0,
+        "last_close": None,
+        "source": source,
+        "size": len(data),
+        "checksum": zlib.crc32(data)
+    }
+
+    return update_metadata(metadata, dataframe)
+
+
+def update_metadata(metadata, dataframe, data=None, source=None):
+    """
+    Update the metadata of a serie with appended rows,
+    data being the bytes appended to the stored blob
+    """
+    if not dataframe.empty:
+        if not dataframe.index.is_monotonic_increasing:
+            dataframe = dataframe.sort_index()
+
+        metadata["first_date"] = metadata["first_date"] or dataframe.index[0].isoformat()
+        metadata["last_date"] = dataframe.index[-1].isoformat()
+
+        if "close" in dataframe.columns:
+            metadata["last_close"] = float(dataframe["close"].iloc[-1])
+
+    if data is not None:
+        metadata["rows"] += len(dataframe)
+        metadata["size"] += len(data)
+        metadata["checksum"] = zlib.crc32(data, metadata["checksum"])
+    else:
+        metadata["rows"] = len(dataframe)
+
+    if source:
+        metadata["source"] = source
+
+    return metadata
+
+
+def get_last_date(metadata):
+    if metadata and metadata.get("last_date"):
+        return pd.Timestamp(metadata["last_date"])
+
+
+def dumps(metadata):
+    return json.dumps(metadata)
+
+
+def loads(data):
+    return json.loads(data) if data else None
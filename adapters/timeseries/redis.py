@@ -0,0 +1,471 @@
+import logging
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from redis.exceptions import WatchError
+
+from adapters.utils import chunked
+
+from . import codecs
+from . import metadata as metadata_serializer
+from . import serializers
+from .storage import TimeserieStorage
+
+logger = logging.getLogger(__name__)
+
+
+# Enough bytes to hold a records header or a single record
+PEEK_SIZE = 1024
+
+# Keys fetched by a single MGET
+MGET_SIZE = 1000
+
+# Attempts of an append when the serie is written meanwhile
+APPEND_RETRIES = 5
+
+Tail = namedtuple("Tail", ["columns", "last_index"])
+
+
+def split_years(dataframe):
+    """
+    Yield the year and the rows of each year of a sorted dataframe
+    """
+    if dataframe.empty:
+        return
+
+    years = dataframe.index.year
+    boundaries = [0, *(np.flatnonzero(np.diff(years)) + 1), len(dataframe)]
+
+    for first, last in zip(boundaries[:-1], boundaries[1:]):
+        yield int(years[first]), dataframe.iloc[first:last]
+
+
+class RedisTimeserieStorage(TimeserieStorage):
+    """
+    Series are stored in yearly chunks under "<label>:chunk:<year>",
+    each chunk being a records blob, along with a metadata record under
+    "<label>:meta" listing the chunks and a version counter under
+    "<label>:version", all updated by every write in the same transaction
+
+    Series written before chunking are stored as a single blob under
+    their label, they are chunked when first read or appended to
+    """
+
+    def __init__(self, redis, cache_size=0, codec=None):
+        super().__init__(cache_size=cache_size)
+
+        self.redis = redis
+        self.codec = codecs.get_codec(codec)
+
+    @property
+    def codec_name(self):
+        return self.codec.name if self.codec else "none"
+
+    @staticmethod
+    def get_version_label(label):
+        return f"{label}:version"
+
+    def get_version(self, label):
+        if version := self.redis.get(self.get_version_label(label)):
+            return int(version)
+
+    @staticmethod
+    def get_metadata_label(label):
+        return f"{label}:meta"
+
+    @staticmethod
+    def get_chunk_label(label, year):
+        return f"{label}:chunk:{year}"
+
+    def get_chunk_labels(self, label, metadata, start=None, end=None):
+        """
+        Labels of the chunks of a serie overlapping the range
+        """
+        first_year = pd.Timestamp(start).year if start is not None else None
+        last_year = pd.Timestamp(end).year if end is not None else None
+
+        return [
+            self.get_chunk_label(label, year)
+            for year in metadata["chunks"]
+            if (first_year is None or year >= first_year) and (last_year is None or year <= last_year)
+        ]
+
+    def get_metadata(self, label):
+        return metadata_serializer.loads(self.redis.get(self.get_metadata_label(label)))
+
+    def get_metadatas(self, labels):
+        """
+        Get the metadata of several series with a single MGET,
+        missing metadata are left out of the returned dict
+        """
+        metadatas = self._mget([self.get_metadata_label(label) for label in labels])
+
+        return {
+            label: metadata_serializer.loads(metadata)
+            for label, metadata in zip(labels, metadatas)
+            if metadata
+        }
+
+    def get_versions(self, labels):
+        versions = self._mget([self.get_version_label(label) for label in labels])
+
+        return {
+            label: int(version) if version else None
+            for label, version in zip(labels, versions)
+        }
+
+    def _mget(self, keys):
+        """
+        MGET in batches sent in a single round trip
+        """
+        if len(keys) <= MGET_SIZE:
+            return self.redis.mget(keys) if keys else []
+
+        with self.redis.pipeline(transaction=False) as pipeline:
+            for batch in chunked(keys, MGET_SIZE):
+                pipeline.mget(batch)
+
+        return [value for values in pipeline.results for value in values]
+
+    def _read(self, label):
+        return self._read_range(label)
+
+    def _read_range(self, label, start=None, end=None):
+        metadata = self.get_metadata(label)
+
+        if metadata is None or "chunks" not in metadata:
+            if blob := self.redis.get(label):
+                return self._load_blob(label, blob)
+
+            return None
+
+        return self._load_chunks(
+            metadata,
+            self._mget(self.get_chunk_labels(label, metadata, start=start, end=end))
+        )
+
+    def get_many(self, labels, workers=None, start=None, end=None):
+        """
+        Get several series at once, with a single round trip for the
+        metadata of the series missing from the cache and another one
+        for their chunks, only the chunks overlapping the start and end
+        dates being fetched if given
+
+        Decoding is spread over a thread pool if workers is set,
+        missing series are left out of the returned dict
+        """
+        ranged = start is not None or end is not None
+        dataframes, versions = self._get_cached(labels, start=start, end=end)
+
+        missing = [label for label in labels if label not in dataframes]
+
+        if not missing:
+            return dataframes
+
+        metadatas = self.get_metadatas(missing)
+        keys = {label: self._get_keys(label, metadatas.get(label), start=start, end=end) for label in missing}
+        all_keys = [key for label_keys in keys.values() for key in label_keys]
+        blobs = dict(zip(all_keys, self._mget(all_keys)))
+
+        def load(label):
+            return self._load(label, metadatas.get(label), [blobs[key] for key in keys[label]])
+
+        if workers:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                loaded = executor.map(load, missing)
+        else:
+            loaded = map(load, missing)
+
+        for label, dataframe in zip(missing, loaded):
+            if dataframe is None:
+                continue
+
+            # Partially read series are not cached
+            if ranged:
+                dataframe = dataframe.loc[start:end]
+            elif self.cache.enabled:
+                self.cache.set(label, versions.get(label), dataframe.copy())
+
+            dataframes[label] = dataframe
+
+        return dataframes
+
+    def _get_cached(self, labels, start=None, end=None):
+        """
+        Cached series with the versions of all the series
+        """
+        dataframes = {}
+        versions = {}
+
+        if self.cache.enabled:
+            versions = self.get_versions(labels)
+
+            for label, version in versions.items():
+                if (dataframe := self.cache.get(label, version)) is not None:
+                    dataframes[label] = dataframe.loc[start:end].copy()
+
+        return dataframes, versions
+
+    def _get_keys(self, label, metadata, start=None, end=None):
+        """
+        Keys holding a serie, its chunks overlapping the range or its single blob
+        """
+        if metadata and "chunks" in metadata:
+            return self.get_chunk_labels(label, metadata, start=start, end=end)
+
+        return [label]
+
+    def _load(self, label, metadata, blobs):
+        if metadata and "chunks" in metadata:
+            return self._load_chunks(metadata, blobs)
+        elif blobs and blobs[0]:
+            return self._load_blob(label, blobs[0])
+
+    @staticmethod
+    def _load_chunks(metadata, blobs):
+        serializer = serializers.records_serializer
+        records = [
+            serializer.loads_records(codecs.decode(blob))[1]
+            for blob in blobs
+            if blob
+        ]
+
+        if records:
+            records = np.concatenate(records)
+        else:
+            records = np.empty(0, dtype=serializer.get_dtype(len(metadata["columns"])))
+
+        return serializer.build_dataframe(metadata["columns"], records)
+
+    def _load_blob(self, label, blob):
+        """
+        Load a serie stored as a single blob and chunk it
+        """
+        dataframe = serializers.loads(codecs.decode(blob))
+
+        self.set(label, dataframe)
+
+        return dataframe
+
+    def _write(self, pipeline, label, dataframe, source=None, previous=None):
+        """
+        Queue the writes of the chunks and the metadata of a serie,
+        return the metadata and the raw size of the chunks
+        """
+        if not dataframe.index.is_monotonic_increasing:
+            dataframe = dataframe.sort_index()
+
+        previous = previous or {}
+        columns = list(dataframe.columns)
+        chunks = {}
+        raw_size = 0
+
+        for year, rows in split_years(dataframe):
+            data = serializers.records_serializer.dumps(rows, columns=columns)
+            chunks[year] = codecs.encode(data, self.codec)
+            raw_size += len(data)
+
+        metadata = metadata_serializer.build_metadata(
+            dataframe,
+            b"".join(chunks.values()),
+            source=source or previous.get("source")
+        )
+        metadata["codec"] = self.codec_name
+        metadata["chunks"] = list(chunks)
+
+        stale_years = set(previous.get("chunks", ())) - set(chunks)
+
+        pipeline.unlink(label, *[self.get_chunk_label(label, year) for year in stale_years])
+
+        for year, blob in chunks.items():
+            pipeline.set(self.get_chunk_label(label, year), blob)
+
+        pipeline.set(self.get_metadata_label(label), metadata_serializer.dumps(metadata))
+
+        return metadata, raw_size
+
+    def set(self, label, dataframe, source=None):
+        previous = self.get_metadata(label)
+
+        with self.redis.pipeline() as pipeline:
+            self._write(pipeline, label, dataframe, source=source, previous=previous)
+            pipeline.incr(self.get_version_label(label))
+
+    def get_tail(self, label):
+        """
+        Read the stored columns and the last stored date of a serie
+        stored as a single blob, without fetching the whole blob
+
+        Return None if the serie is missing, compressed
+        or not stored as records
+        """
+        head = self.redis.getrange(label, 0, PEEK_SIZE - 1)
+
+        if not head or codecs.is_framed(head) or serializers.is_legacy(head):
+            return None
+
+        serializer = serializers.records_serializer
+        columns, offset = serializer.parse_header(head)
+        dtype = serializer.get_dtype(len(columns))
+
+        if len(head) < PEEK_SIZE and len(head) - offset < dtype.itemsize:
+            return Tail(columns, None)
+
+        tail = self.redis.getrange(label, -dtype.itemsize, -1)
+        last_index = serializer.load_records(tail, columns)["index"][-1]
+
+        return Tail(columns, pd.Timestamp(last_index))
+
+    def get_last_index(self, label):
+        if not self.get_metadata(label) and (tail := self.get_tail(label)):
+            return tail.last_index
+
+        return super().get_last_index(label)
+
+    def _can_append(self, metadata, dataframe):
+        return super()._can_append(metadata, dataframe) and "chunks" in metadata
+
+    def append(self, label, dataframe, source=None):
+        """
+        Retried from the stored metadata if the serie is written
+        meanwhile, so concurrent writers don't append the same rows
+        """
+        for attempt in range(1, APPEND_RETRIES + 1):
+            try:
+                return super().append(label, dataframe, source=source)
+            except WatchError:
+                if attempt == APPEND_RETRIES:
+                    raise
+
+                logger.info(f"Serie {label} written during append, retrying")
+
+    def _append(self, label, dataframe, metadata, source=None):
+        """
+        Rows of the last stored year are appended to its chunk,
+        the following years get new chunks
+
+        Raise WatchError if the metadata the rows were selected from
+        is no longer the stored one, or if the serie is written before
+        the transaction is executed
+        """
+        columns = metadata["columns"]
+        codec = codecs.get_codec(metadata.get("codec"))
+        last_year = metadata["chunks"][-1] if metadata["chunks"] else None
+        metadata_label = self.get_metadata_label(label)
+
+        with self.redis.pipeline() as pipeline:
+            pipeline.watch(
+                metadata_label,
+                self.get_version_label(label),
+                *([self.get_chunk_label(label, last_year)] if last_year is not None else [])
+            )
+
+            if metadata_serializer.loads(pipeline.get(metadata_label)) != metadata:
+                raise WatchError(f"Serie {label} written meanwhile")
+
+            pipeline.multi()
+
+            for year, rows in split_years(dataframe):
+                chunk_label = self.get_chunk_label(label, year)
+
+                if year == last_year:
+                    data = serializers.records_serializer.dump_records(rows, columns=columns)
+                    blob = codecs.encode(data, codec)
+                    pipeline.append(chunk_label, blob)
+                else:
+                    data = serializers.records_serializer.dumps(rows, columns=columns)
+                    blob = codecs.encode(data, codec)
+                    pipeline.set(chunk_label, blob)
+                    metadata["chunks"].append(year)
+
+                metadata = metadata_serializer.update_metadata(metadata, rows, data=blob, source=source)
+
+            pipeline.set(metadata_label, metadata_serializer.dumps(metadata))
+            pipeline.incr(self.get_version_label(label))
+
+    def _is_compressed(self, blob):
+        """
+        Whether the blob is a single frame of the current codec
+        """
+        if self.codec is None:
+            return not codecs.is_framed(blob)
+
+        return (
+            codecs.get_blob_codec(blob) == self.codec.name and
+            len(list(codecs.iter_frames(blob))) == 1
+        )
+
+    def recompress(self, labels):
+        """
+        Rewrite the given series with the current codec, each chunk in
+        a single frame, chunking the series stored as a single blob
+
+        The whole batch is left untouched if one of them is written
+        meanwhile, every write updating the metadata of its serie
+
+        Return the count of rewritten series with their raw, previous
+        and new sizes, None if the batch has been skipped
+        """
+        stats = super().recompress(labels)
+        metadata_labels = [self.get_metadata_label(label) for label in labels]
+
+        try:
+            with self.redis.pipeline() as pipeline:
+                pipeline.watch(*labels, *metadata_labels)
+
+                metadatas = dict(zip(labels, map(metadata_serializer.loads, pipeline.mget(metadata_labels))))
+                keys = {label: self._get_keys(label, metadata) for label, metadata in metadatas.items()}
+                all_keys = [key for label_keys in keys.values() for key in label_keys]
+                blobs = dict(zip(all_keys, pipeline.mget(all_keys))) if all_keys else {}
+
+                pipeline.multi()
+
+                for label, metadata in metadatas.items():
+                    label_blobs = [blobs[key] for key in keys[label] if blobs[key]]
+
+                    if metadata and "chunks" in metadata:
+                        if all(map(self._is_compressed, label_blobs)):
+                            continue
+
+                        dataframe = self._load_chunks(metadata, label_blobs)
+                    elif label_blobs:
+                        dataframe = serializers.loads(codecs.decode(label_blobs[0]))
+                    else:
+                        continue
+
+                    metadata, raw_size = self._write(pipeline, label, dataframe, previous=metadata)
+                    pipeline.incr(self.get_version_label(label))
+
+                    stats["series"] += 1
+                    stats["raw_size"] += raw_size
+                    stats["previous_size"] += sum(map(len, label_blobs))
+                    stats["size"] += metadata["size"]
+        except WatchError:
+            logger.warning(f"Series written during recompression, skipping {len(labels)} series")
+
+            return None
+
+        return stats
+
+    def delete(self, label):
+        """
+        Delete the serie and bump its version, so the series cached by
+        other processes are not served again if the label is rewritten
+        """
+        self.cache.delete(label)
+
+        metadata = self.get_metadata(label) or {}
+
+        with self.redis.pipeline() as pipeline:
+            pipeline.unlink(
+                label,
+                self.get_metadata_label(label),
+                *[self.get_chunk_label(label, year) for year in metadata.get("chunks", ())]
+            )
+            pipeline.incr(self.get_version_label(label))
+
+        return pipeline.results[0]
@@ -0,0 +1,149 @@
+import logging
+import struct
+
+from io import StringIO
+
+import numpy as np
+import pandas as pd
+
+from .exceptions import UnknownFormat
+
+logger = logging.getLogger(__name__)
+
+
+# The first byte of a stored blob tells how it has been serialized,
+# legacy blobs written with DataFrame.to_json always start with "{"
+JSON_FORMAT = ord("{")
+RECORDS_FORMAT = 0x01
+
+# format, flags, column count
+HEADER = struct.Struct("<BBH")
+
+
+class JsonSerializer(object):
+    format = JSON_FORMAT
+
+    def dumps(self, dataframe):
+        return dataframe.to_json().encode()
+
+    def loads(self, data):
+        dataframe = pd.read_json(StringIO(bytes(data).decode()), convert_axes=False)
+        dataframe.index = pd.to_datetime(dataframe.index.astype("int64"), unit="ms")
+
+        return dataframe.sort_index()
+
+
+class RecordsSerializer(object):
+    """
+    Fixed width binary records, a small header holding the column names
+    followed by one (int64 nanoseconds timestamp, float64 * columns) record
+    per row, sorted by timestamp.
+
+    Rows are laid out one after the other so new rows can be appended
+    to a stored blob without rewriting it.
+    """
+    format = RECORDS_FORMAT
+
+    @staticmethod
+    def get_dtype(column_count):
+        return np.dtype(
+            [("index", "<i8")] +
+            [(f"c{i}", "<f8") for i in range(column_count)]
+        )
+
+    def build_header(self, columns):
+        header = HEADER.pack(self.format, 0, len(columns))
+
+        for column in columns:
+            name = str(column).encode()
+            header += struct.pack("<B", len(name)) + name
+
+        return header
+
+    def parse_header(self, data):
+        _, _, column_count = HEADER.unpack_from(data)
+        offset = HEADER.size
+        columns = []
+
+        for _ in range(column_count):
+            length = data[offset]
+            offset += 1
+            columns.append(bytes(data[offset:offset + length]).decode())
+            offset += length
+
+        return columns, offset
+
+    def dump_records(self, dataframe, columns=None):
+        """
+        Serialize the dataframe rows without header, columns
+        are taken in the given order when specified
+        """
+        columns = list(columns if columns is not None else dataframe.columns)
+
+        if not dataframe.index.is_monotonic_increasing:
+            dataframe = dataframe.sort_index()
+
+        records = np.empty(len(dataframe), dtype=self.get_dtype(len(columns)))
+        records["index"] = dataframe.index.values.astype("datetime64[ns]").view("<i8")
+
+        for i, column in enumerate(columns):
+            records[f"c{i}"] = dataframe[column].to_numpy(dtype="<f8")
+
+        return records.tobytes()
+
+    def load_records(self, data, columns, offset=0):
+        return np.frombuffer(data, dtype=self.get_dtype(len(columns)), offset=offset)
+
+    def dumps(self, dataframe, columns=None):
+        columns = list(columns if columns is not None else dataframe.columns)
+
+        return self.build_header(columns) + self.dump_records(dataframe, columns=columns)
+
+    def loads_records(self, data):
+        """
+        Return the columns and the records of a blob
+        """
+        columns, offset = self.parse_header(data)
+
+        return columns, self.load_records(data, columns, offset=offset)
+
+    @staticmethod
+    def build_dataframe(columns, records):
+        return pd.DataFrame(
+            {column: records[f"c{i}"] for i, column in enumerate(columns)},
+            index=pd.DatetimeIndex(records["index"].view("datetime64[ns]"))
+        )
+
+    def loads(self, data):
+        return self.build_dataframe(*self.loads_records(data))
+
+
+json_serializer = JsonSerializer()
+records_serializer = RecordsSerializer()
+
+SERIALIZERS = {
+    serializer.format: serializer
+    for serializer in (json_serializer, records_serializer)
+}
+
+DEFAULT_FORMAT = RECORDS_FORMAT
+
+
+def get_serializer(data):
+    if not (serializer := SERIALIZERS.get(data[0])):
+        logger.error(f"Unknown timeserie format {data[0]}")
+        raise UnknownFormat(data[0])
+
+    return serializer
+
+
+def is_legacy(data):
+    return data[0] != DEFAULT_FORMAT
+
+
+def dumps(dataframe, format=DEFAULT_FORMAT):
+    return SERIALIZERS[format].dumps(dataframe)
+
+
+def loads(data):
+    return get_serializer(data).loads(data)
@@ -0,0 +1,211 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from . import metadata as metadata_serializer
+from .cache import LRUCache
+from .exceptions import SerieRebased
+
+logger = logging.getLogger(__name__)
+
+
+# Relative difference of the overlapping close tolerated on append
+REBASE_TOLERANCE = 1e-6
+
+
+def get_range_positions(dates, start=None, end=None):
+    """
+    Positions delimiting the sorted int64 nanoseconds dates
+    between start and end included
+    """
+    first = dates.searchsorted(pd.Timestamp(start).value) if start is not None else 0
+    last = dates.searchsorted(pd.Timestamp(end).value, side="right") if end is not None else len(dates)
+
+    return first, last
+
+
+class TimeserieStorage(object):
+    """
+    Base of the timeserie storage backends, series are stored under
+    their label along with a metadata record and a version counter
+    updated by every write
+
+    Readers get the version before the serie, so a cached serie
+    can't outlive a newer version
+    """
+    codec_name = "none"
+
+    def __init__(self, cache_size=0):
+        self.cache = LRUCache(max_size=cache_size)
+
+    def get_version(self, label):
+        raise NotImplementedError()
+
+    def get_versions(self, labels):
+        return {label: self.get_version(label) for label in labels}
+
+    def get_metadata(self, label):
+        raise NotImplementedError()
+
+    def get_metadatas(self, labels):
+        """
+        Get the metadata of several series,
+        missing metadata are left out of the returned dict
+        """
+        return {
+            label: metadata
+            for label in labels
+            if (metadata := self.get_metadata(label))
+        }
+
+    def _read(self, label):
+        """
+        Read the stored serie, None if missing
+        """
+        raise NotImplementedError()
+
+    def get(self, label):
+        version = None
+
+        if self.cache.enabled:
+            version = self.get_version(label)
+
+            if (dataframe := self.cache.get(label, version)) is not None:
+                return dataframe.copy()
+
+        if (dataframe := self._read(label)) is None:
+            return None
+
+        if self.cache.enabled:
+            self.cache.set(label, version, dataframe.copy())
+
+        return dataframe
+
+    def _read_range(self, label, start=None, end=None):
+        """
+        Read the stored rows covering at least the range, None if missing
+        """
+        return self._read(label)
+
+    def get_range(self, label, start=None, end=None):
+        """
+        Get the rows of a serie between the start and end dates included
+        """
+        if start is None and end is None:
+            return self.get(label)
+
+        dataframe = None
+
+        if self.cache.enabled:
+            dataframe = self.cache.get(label, self.get_version(label))
+
+        if dataframe is None and (dataframe := self._read_range(label, start=start, end=end)) is None:
+            return None
+
+        return dataframe.loc[start:end].copy()
+
+    def get_many(self, labels, workers=None, start=None, end=None):
+        """
+        Get several series at once, only their rows between the start
+        and end dates if given, missing series are left out of the returned dict
+        """
+        return {
+            label: dataframe
+            for label in labels
+            if (dataframe := self.get_range(label, start=start, end=end)) is not None
+        }
+
+    def set(self, label, dataframe, source=None):
+        raise NotImplementedError()
+
+    def get_last_index(self, label):
+        if metadata := self.get_metadata(label):
+            return metadata_serializer.get_last_date(metadata)
+
+        dataframe = self.get(label)
+
+        if dataframe is not None and not dataframe.empty:
+            return dataframe.index[-1]
+
+    def _append(self, label, dataframe, metadata, source=None):
+        """
+        Append sorted rows newer than the last stored date
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def check_overlap(label, metadata, dataframe, last_index):
+        """
+        Raise SerieRebased if the close of the last stored date differs
+        from the new one, adjusted closes being rebased by the providers
+        after dividends and splits
+        """
+        if "close" not in dataframe.columns or metadata.get("last_close") is None:
+            return
+
+        overlap = dataframe.loc[dataframe.index == last_index, "close"]
+
+        if not len(overlap) or np.isclose(overlap.iloc[-1], metadata["last_close"], rtol=REBASE_TOLERANCE, atol=0):
+            return
+
+        raise SerieRebased(f"{label} close of {last_index.date()} is now {overlap.iloc[-1]}, was {metadata['last_close']}")
+
+    def append(self, label, dataframe, source=None):
+        """
+        Append the rows newer than the last stored date,
+        overlapping rows are left untouched
+
+        Raise SerieRebased if the row of the last stored date is given
+        with another close, the whole serie has to be stored again
+
+        Return the number of appended rows
+        """
+        metadata = self.get_metadata(label)
+
+        if not self._can_append(metadata, dataframe):
+            return self._merge(label, dataframe, source=source)
+
+        if (last_index := metadata_serializer.get_last_date(metadata)) is not None:
+            self.check_overlap(label, metadata, dataframe, last_index)
+
+            dataframe = dataframe[dataframe.index > last_index]
+
+        if dataframe.empty:
+            return 0
+
+        self._append(label, dataframe.sort_index(), metadata, source=source)
+
+        return len(dataframe)
+
+    def _can_append(self, metadata, dataframe):
+        return metadata is not None and set(metadata["columns"]) == set(map(str, dataframe.columns))
+
+    def _merge(self, label, dataframe, source=None):
+        """
+        Fallback for series that can't be appended in place,
+        rewrite the whole serie
+        """
+        stored = self.get(label)
+
+        if stored is not None and not stored.empty:
+            dataframe = dataframe[dataframe.index > stored.index[-1]]
+
+            if dataframe.empty:
+                return 0
+
+            dataframe = pd.concat([stored, dataframe.sort_index()])
+
+        self.set(label, dataframe, source=source)
+
+        return len(dataframe) if stored is None else len(dataframe) - len(stored)
+
+    def recompress(self, labels):
+        """
+        Rewrite the given series with the current codec,
+        return the count of rewritten series with their sizes
+        """
+        return {"series": 0, "raw_size": 0, "previous_size": 0, "size": 0}
+
+    def delete(self, label):
+        raise NotImplementedError()
@@ -1,5 +1,13 @@
 from datetime import datetime
+from itertools import islice
 
 
 def get_timestamp(timestamp):
     return timestamp.strftime("%s") if isinstance(timestamp, datetime) else timestamp
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,142 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from adapters import timeseries
+from adapters.timeseries.metadata import get_last_date
+
+from .matrix import align
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_METHODS = ("cap", "equal")
+
+# Component rows read before the last stored date, so the prices
+# of the components not traded on that date can be forward filled
+LOOKBACK = pd.Timedelta(days=31)
+
+TRADING_DAYS = 252
+
+
+def compute_index_returns(prices, method="cap", shares=None):
+    """
+    Daily returns of an index of the dates x components matrix of forward
+    filled prices, the components being weighted at the previous close,
+    by their capitalization or equally
+
+    Components enter the index the day after their first price, the
+    returns being chained there is no divisor to adjust
+    """
+    if method not in INDEX_METHODS:
+        raise ValueError(f"Unknown index method {method}, must be one of {INDEX_METHODS}")
+
+    growth = np.ones(len(prices))
+
+    if len(prices) < 2:
+        return growth - 1
+
+    previous, current = prices[:-1], prices[1:]
+    listed = np.isfinite(previous) & np.isfinite(current)
+
+    if method == "cap":
+        previous = np.where(listed, previous * shares, 0.0)
+        current = np.where(listed, current * shares, 0.0)
+        totals = previous.sum(axis=1)
+
+        np.divide(current.sum(axis=1), totals, out=growth[1:], where=totals > 0)
+    else:
+        ratios = np.divide(current, previous, out=np.zeros_like(current), where=listed)
+        counts = listed.sum(axis=1)
+
+        np.divide(ratios.sum(axis=1), counts, out=growth[1:], where=counts > 0)
+
+    return growth - 1
+
+
+def get_shares(assets, asset_ids):
+    """
+    Shares outstanding scraped along the components, by asset id order
+    """
+    shares = {asset.id: (asset.extra_data or {}).get("shares") or 0 for asset in assets}
+
+    return np.array([shares.get(asset_id, 0) for asset_id in asset_ids], dtype="float64")
+
+
+def build_synthetic_index(index, method="cap", full=False, base=None):
+    """
+    Level serie of the index reconstructed from its components,
+    appended from the last stored date, rebuilt from the start if full,
+    return the count of stored rows
+
+    A rebuilt serie starts at the official index level of its first
+    date if known, at base or 100 otherwise
+    """
+    label = index.get_synthetic_label(method)
+    components = index.components.all()
+    metadata = None if full else timeseries.get_metadata(label)
+
+    if (last_index := get_last_date(metadata)) is not None:
+        dataframes = components.dataframes(start=last_index - LOOKBACK)
+    else:
+        dataframes = components.dataframes()
+
+    matrix = align({
+        asset_id: dataframe["close"]
+        for asset_id, dataframe in dataframes.items()
+        if not dataframe.empty
+    })
+
+    if last_index is not None:
+        matrix = matrix.slice(start=last_index)
+
+        if len(matrix) < 2 or matrix.dates[0] != last_index:
+            return 0
+
+        base = metadata["last_close"]
+    elif not len(matrix):
+        return 0
+    elif base is None:
+        base = get_official_level(index, matrix.dates[0]) or 100.0
+
+    returns = compute_index_returns(matrix.values, method=method, shares=get_shares(components, matrix.asset_ids))
+    dataframe = pd.DataFrame({"close": base * np.cumprod(1 + returns)}, index=matrix.dates)
+
+    if last_index is not None:
+        return timeseries.append(label, dataframe.iloc[1:])
+
+    timeseries.set(label, dataframe)
+
+    return len(dataframe)
+
+
+def get_official_level(index, date):
+    if index.asset_id is None:
+        return None
+
+    official = index.asset.get_dataframe(end=date)
+
+    if official is not None and not official.empty:
+        return float(official["close"].iloc[-1])
+
+
+def get_tracking_error(synthetic, official):
+    """
+    Annualized tracking error of the synthetic index returns against
+    the official ones, on the dates both are known
+    """
+    levels = pd.concat([synthetic["close"], official["close"]], axis=1, join="inner").dropna()
+    returns = levels.pct_change().iloc[1:].to_numpy()
+
+    if len(returns) < 2:
+        return None
+
+    difference = returns[:, 0] - returns[:, 1]
+
+    return {
+        "dates": len(levels),
+        "tracking_error": float(difference.std(ddof=1) * np.sqrt(TRADING_DAYS)),
+        "mean_difference": float(difference.mean() * TRADING_DAYS),
+        "correlation": float(np.corrcoef(returns[:, 0], returns[:, 1])[0, 1])
+    }
@@ -0,0 +1,138 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from adapters import timeseries
+from adapters.timeseries.cache import LRUCache
+from analyst.settings import PRICE_MATRIX_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+FILL_POLICIES = (None, "ffill", "bfill", "zero")
+
+matrix_cache = LRUCache(max_size=PRICE_MATRIX_CACHE_SIZE)
+
+
+class PriceMatrix(object):
+    """
+    Dense dates x assets matrix of prices, values are read only
+    as matrices are shared through the cache
+    """
+
+    def __init__(self, dates, asset_ids, values):
+        self.dates = dates
+        self.asset_ids = list(asset_ids)
+        self.values = values
+        self.values.flags.writeable = False
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.dates.nbytes
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def get_column(self, asset_id):
+        return self.values[:, self.asset_ids.index(asset_id)]
+
+    def slice(self, start=None, end=None):
+        """
+        View of the matrix between the start and end dates included
+        """
+        first = self.dates.searchsorted(pd.Timestamp(start)) if start is not None else 0
+        last = self.dates.searchsorted(pd.Timestamp(end), side="right") if end is not None else len(self)
+
+        return PriceMatrix(self.dates[first:last], self.asset_ids, self.values[first:last])
+
+    def to_dataframe(self):
+        return pd.DataFrame(self.values, index=self.dates, columns=self.asset_ids)
+
+
+def fill_forward(values):
+    """
+    Replace the NaN values with the last valid value of their column
+    """
+    rows = np.arange(len(values))[:, None]
+    positions = np.where(np.isnan(values), 0, rows)
+    np.maximum.accumulate(positions, axis=0, out=positions)
+
+    return values[positions, np.arange(values.shape[1])]
+
+
+def fill_values(values, fill=None):
+    if fill == "ffill":
+        return fill_forward(values)
+    elif fill == "bfill":
+        return fill_forward(values[::-1])[::-1]
+    elif fill == "zero":
+        return np.nan_to_num(values, nan=0.0)
+    elif fill is not None:
+        raise ValueError(f"Unknown fill policy {fill}, must be one of {FILL_POLICIES}")
+
+    return values
+
+
+def unique_sorted(values):
+    values = np.sort(values)
+
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def align(series, fill="ffill", dtype="float64"):
+    """
+    Align the given {asset_id: pd.Series} on the union of their dates
+    in a single pass, each serie being placed with a binary search
+    """
+    asset_ids = list(series)
+    dates = [
+        s.index.values.astype("datetime64[ns]").view("int64")
+        for s in series.values()
+    ]
+    all_dates = unique_sorted(np.concatenate(dates)) if dates else np.empty(0, dtype="int64")
+
+    values = np.full((len(all_dates), len(asset_ids)), np.nan, dtype=dtype)
+
+    for i, (serie_dates, serie) in enumerate(zip(dates, series.values())):
+        values[np.searchsorted(all_dates, serie_dates), i] = serie.to_numpy(dtype=dtype)
+
+    return PriceMatrix(
+        pd.DatetimeIndex(all_dates.view("datetime64[ns]")),
+        asset_ids,
+        fill_values(values, fill=fill)
+    )
+
+
+def build_price_matrix(assets, column="close", fill="ffill", dtype="float64"):
+    """
+    Build the price matrix of an asset queryset, cached as long
+    as the members and their series versions are the same
+    """
+    asset_ids = sorted(assets.values_list("id", flat=True))
+    labels = [assets.model.get_timeserie_label(asset_id) for asset_id in asset_ids]
+
+    key = (tuple(asset_ids), column, fill, np.dtype(dtype).name)
+    version = tuple(timeseries.get_versions(labels)[label] for label in labels)
+
+    if (matrix := matrix_cache.get(key, version)) is not None:
+        return matrix
+
+    dataframes = assets.dataframes()
+    matrix = align(
+        {
+            asset_id: dataframes[asset_id][column]
+            for asset_id in asset_ids
+            if asset_id in dataframes
+        },
+        fill=fill,
+        dtype=dtype
+    )
+
+    matrix_cache.set(key, version, matrix)
+
+    return matrix
@@ -0,0 +1,123 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from adapters import timeseries
+from adapters.timeseries.cache import LRUCache
+from analyst.settings import NAV_CACHE_SIZE
+
+from .matrix import build_price_matrix
+
+logger = logging.getLogger(__name__)
+
+
+# Rebalancing frequencies, as pandas period aliases, None to buy and hold
+REBALANCE_FREQUENCIES = {
+    None: None,
+    "daily": "D",
+    "weekly": "W",
+    "monthly": "M",
+    "quarterly": "Q",
+    "yearly": "Y",
+}
+
+nav_cache = LRUCache(max_size=NAV_CACHE_SIZE)
+
+
+def get_rebalance_mask(dates, rebalance=None):
+    """
+    Dates the weights are reset at, the first date of each period
+    of the rebalancing frequency, only the first date to buy and hold
+    """
+    if rebalance not in REBALANCE_FREQUENCIES:
+        raise ValueError(f"Unknown rebalancing {rebalance}, must be one of {list(REBALANCE_FREQUENCIES)}")
+
+    mask = np.zeros(len(dates), dtype=bool)
+
+    if not len(dates):
+        return mask
+
+    if frequency := REBALANCE_FREQUENCIES[rebalance]:
+        periods = pd.DatetimeIndex(dates).to_period(frequency).asi8
+        mask[1:] = periods[1:] != periods[:-1]
+
+    mask[0] = True
+
+    return mask
+
+
+def normalize_weights(weights, available):
+    """
+    Weights of the periods, restricted to the priced assets
+    and summing to one
+    """
+    weights = np.where(available, weights, 0.0)
+    totals = weights.sum(axis=1, keepdims=True)
+
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
+
+def compute_nav(prices, weights, rebalance, initial=100.0):
+    """
+    Net asset value of a dates x assets matrix of forward filled prices,
+    NaN before the assets are listed, the holdings being reset to the
+    weights at the closes of the rebalance dates and of the dates an
+    asset gets its first price
+
+    Within a period starting at s, nav(t) = nav(s) * sum(w * p(t) / p(s)),
+    computed for all the dates at once with the start navs chained by
+    a cumulative product
+    """
+    if not len(prices):
+        return np.empty(0)
+
+    listed = np.isfinite(prices)
+    rebalance = rebalance.copy()
+    rebalance[1:] |= (listed[1:] & ~listed[:-1]).any(axis=1)
+
+    starts = np.flatnonzero(rebalance)
+    period = np.cumsum(rebalance) - 1
+
+    # Dates are valued with the holdings of the previous close
+    anchor = period - rebalance
+    anchor[0] = 0
+
+    start_prices = prices[starts]
+    period_weights = normalize_weights(np.broadcast_to(weights, start_prices.shape), listed[starts])
+    units = np.divide(period_weights, start_prices, out=np.zeros_like(period_weights), where=period_weights > 0)
+
+    growth = np.einsum("tn,tn->t", np.where(listed, prices, 0.0), units[anchor])
+    start_navs = initial * np.concatenate(([1.0], np.cumprod(growth[starts[1:]])))
+
+    return start_navs[anchor] * growth
+
+
+def value_portfolio(assets, weights=None, rebalance=None, initial=100.0):
+    """
+    Daily nav and returns of the assets held with the {asset_id: weight}
+    weights, equally weighted if not given, cached as long as the weights,
+    the rebalancing and the assets series versions are the same
+    """
+    asset_ids = sorted(assets.values_list("id", flat=True))
+
+    if weights:
+        asset_ids = [asset_id for asset_id in asset_ids if weights.get(asset_id)]
+
+    labels = [assets.model.get_timeserie_label(asset_id) for asset_id in asset_ids]
+    key = (tuple((asset_id, weights[asset_id] if weights else 1.0) for asset_id in asset_ids), rebalance, initial)
+    version = tuple(timeseries.get_versions(labels)[label] for label in labels)
+
+    if (valuation := nav_cache.get(key, version)) is not None:
+        return valuation.copy()
+
+    matrix = build_price_matrix(assets.filter(id__in=asset_ids))
+    target = np.array([weights[asset_id] if weights else 1.0 for asset_id in matrix.asset_ids], dtype="float64")
+    nav = compute_nav(matrix.values, target, get_rebalance_mask(matrix.dates, rebalance), initial=initial)
+
+    valuation = pd.DataFrame({"nav": nav}, index=matrix.dates)
+    valuation["return"] = valuation["nav"].pct_change().fillna(0.0)
+
+    nav_cache.set(key, version, valuation.copy())
+
+    return valuation
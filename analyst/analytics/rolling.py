@@ -0,0 +1,294 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from adapters import timeseries
+from adapters.timeseries.metadata import get_last_date
+
+logger = logging.getLogger(__name__)
+
+
+VOLATILITY_WINDOW = 20
+MOVING_AVERAGE_WINDOWS = (50, 200)
+BETA_WINDOW = 60
+
+ANALYTICS_COLUMNS = [
+    "return",
+    "volatility",
+    *[f"ma_{window}" for window in MOVING_AVERAGE_WINDOWS],
+    "drawdown",
+    "beta"
+]
+
+# Rows covering the longest window ending on a new row
+TAIL_ROWS = max(VOLATILITY_WINDOW + 1, BETA_WINDOW + 1, *MOVING_AVERAGE_WINDOWS)
+
+# Days of prices read before the last computed date, covering TAIL_ROWS rows
+LOOKBACK = pd.Timedelta(days=TAIL_ROWS * 2)
+
+# Benchmarks this late are waited for rather than forward filled
+BENCHMARK_DELAY = pd.Timedelta(days=7)
+
+TRADING_DAYS = 252
+
+
+def rolling_sum(values, window):
+    """
+    Sums of the last window rows of each column, from cumulative sums,
+    NaN unless the window holds window valid values
+    """
+    valid = np.isfinite(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+
+    sums[window:] -= sums[:-window].copy()
+    counts[window:] -= counts[:-window].copy()
+    sums[counts < window] = np.nan
+
+    return sums
+
+
+def get_returns(prices):
+    returns = np.full_like(prices, np.nan)
+    returns[1:] = prices[1:] / prices[:-1] - 1
+
+    return returns
+
+
+def compute_indicators(prices, benchmark=None, peaks=None):
+    """
+    Indicators of a matrix of prices whose columns hold the successive
+    observations of assets, so windows are counted in observations,
+    benchmark being the prices of their parent index on the same rows
+    and peaks their highest prices before the first row
+    """
+    returns = get_returns(prices)
+    indicators = {"return": returns}
+
+    n = VOLATILITY_WINDOW
+    sums = rolling_sum(returns, n)
+    variances = (rolling_sum(returns ** 2, n) - sums ** 2 / n) / (n - 1)
+    indicators["volatility"] = np.sqrt(np.maximum(variances, 0.0) * TRADING_DAYS)
+
+    for window in MOVING_AVERAGE_WINDOWS:
+        indicators[f"ma_{window}"] = rolling_sum(prices, window) / window
+
+    highest = prices if peaks is None else np.vstack([peaks[None, :], prices])
+    indicators["drawdown"] = prices / np.fmax.accumulate(highest, axis=0)[-len(prices):] - 1
+
+    indicators["beta"] = np.full_like(prices, np.nan)
+
+    if benchmark is not None:
+        benchmark_returns = get_returns(benchmark)
+        valid = np.isfinite(returns) & np.isfinite(benchmark_returns)
+        x = np.where(valid, returns, np.nan)
+        y = np.where(valid, benchmark_returns, np.nan)
+
+        n = BETA_WINDOW
+        sum_x, sum_y = rolling_sum(x, n), rolling_sum(y, n)
+        covariances = rolling_sum(x * y, n) - sum_x * sum_y / n
+        variances = rolling_sum(y ** 2, n) - sum_y ** 2 / n
+
+        np.divide(covariances, variances, out=indicators["beta"], where=variances > 0)
+
+    return indicators
+
+
+def stack(columns):
+    """
+    Matrix of the 1d arrays aligned on their last values,
+    padded with NaN at the top
+    """
+    values = np.full((max(map(len, columns), default=0), len(columns)), np.nan)
+
+    for i, column in enumerate(columns):
+        values[len(values) - len(column):, i] = column
+
+    return values
+
+
+def get_tail(prices, benchmark=None, last_index=None):
+    """
+    Prices rows the indicators of the rows after last_index depend on,
+    up to the benchmark last date if it is a few days late
+    """
+    if benchmark is not None and not benchmark.empty and prices.index[-1] - benchmark.index[-1] <= BENCHMARK_DELAY:
+        prices = prices.loc[:benchmark.index[-1]]
+
+    if last_index is not None:
+        prices = prices.iloc[max(0, prices.index.searchsorted(last_index, side="right") - TAIL_ROWS):]
+
+    return prices
+
+
+def get_last_indexes(model, asset_ids, benchmarks, benchmarks_since=None):
+    """
+    Last computed date of the assets whose analytics are behind their
+    serie, None for the ones without analytics, up to date assets being
+    left out
+
+    benchmarks_since maps the benchmarks just appended to with their
+    previous last date, the rows of their components computed after it
+    used a forward filled benchmark and are computed again
+    """
+    benchmarks_since = benchmarks_since or {}
+    labels = {asset_id: model.get_timeserie_label(asset_id) for asset_id in asset_ids}
+    analytics_labels = {asset_id: model.get_analytics_label(asset_id) for asset_id in asset_ids}
+    metadatas = timeseries.get_metadatas([*labels.values(), *analytics_labels.values()])
+
+    last_indexes = {}
+
+    for asset_id in asset_ids:
+        if (last_date := get_last_date(metadatas.get(labels[asset_id]))) is None:
+            continue
+
+        computed = get_last_date(metadatas.get(analytics_labels[asset_id]))
+        since = benchmarks_since.get(benchmarks.get(asset_id))
+
+        if computed is not None and since is not None and computed > since:
+            last_indexes[asset_id] = since
+        elif computed is None or computed < last_date:
+            last_indexes[asset_id] = computed
+
+    return last_indexes
+
+
+def update_analytics(assets, full=False, benchmarks_since=None):
+    """
+    Compute the indicators of the rows of the assets series newer than
+    their stored analytics, from the trailing rows of the longest window,
+    all of them if full, return the count of stored rows
+
+    See get_last_indexes for benchmarks_since
+    """
+    model = assets.model
+    asset_ids = sorted(assets.values_list("id", flat=True))
+    benchmarks = assets.benchmarks()
+
+    if full:
+        last_indexes = dict.fromkeys(asset_ids)
+    else:
+        last_indexes = get_last_indexes(model, asset_ids, benchmarks, benchmarks_since=benchmarks_since)
+
+    rebuilt = [asset_id for asset_id, last_index in last_indexes.items() if last_index is None]
+    updated = [asset_id for asset_id, last_index in last_indexes.items() if last_index is not None]
+
+    start = min(map(last_indexes.get, updated), default=None)
+    rows = 0
+
+    if updated:
+        rows += compute_analytics(model, updated, benchmarks, last_indexes=last_indexes, start=start)
+
+    if rebuilt:
+        rows += compute_analytics(model, rebuilt, benchmarks)
+
+    return rows
+
+
+def load_tails(model, asset_ids, benchmarks, last_indexes, start=None):
+    """
+    Prices rows to compute the indicators of each asset from, with the
+    benchmark prices on the same dates, the highest prices before them
+    and the stored analytics after start
+    """
+    read_start = start - LOOKBACK if start is not None else None
+
+    series = timeseries.get_many(
+        [model.get_timeserie_label(asset_id) for asset_id in {*asset_ids, *benchmarks.values()}],
+        start=read_start
+    )
+    stored = {}
+
+    if start is not None:
+        stored = timeseries.get_many([model.get_analytics_label(asset_id) for asset_id in asset_ids], start=start)
+
+    tails, tail_benchmarks, peaks = {}, {}, {}
+
+    for asset_id in asset_ids:
+        prices = series.get(model.get_timeserie_label(asset_id))
+        benchmark = series.get(model.get_timeserie_label(benchmarks[asset_id])) if asset_id in benchmarks else None
+        last_index = last_indexes.get(asset_id)
+
+        if prices is None or prices.empty:
+            continue
+
+        tail = get_tail(prices["close"], benchmark=benchmark, last_index=last_index)
+
+        if last_index is not None:
+            analytics = stored.get(model.get_analytics_label(asset_id))
+
+            if tail.empty or tail.index[-1] <= last_index or analytics is None or analytics.empty:
+                continue
+
+            # Highest price so far, from the drawdown of the last computed date
+            peaks[asset_id] = tail.loc[:last_index].iloc[-1] / (1 + analytics.loc[:last_index, "drawdown"].iloc[-1])
+
+        tails[asset_id] = tail
+
+        if benchmark is not None:
+            tail_benchmarks[asset_id] = benchmark["close"].reindex(tail.index, method="ffill").to_numpy()
+
+    return tails, tail_benchmarks, peaks, stored
+
+
+def store_analytics(model, asset_id, dataframe, last_index=None, stored=None):
+    """
+    Store the indicators computed after last_index, replacing the
+    stored ones after it, return the count of stored rows
+    """
+    label = model.get_analytics_label(asset_id)
+
+    if last_index is None:
+        timeseries.set(label, dataframe)
+
+        return len(dataframe)
+
+    dataframe = dataframe.loc[dataframe.index > last_index]
+
+    if stored is not None and not stored.empty and stored.index[-1] > last_index:
+        previous = timeseries.get_range(label, end=last_index)
+        timeseries.set(label, pd.concat([previous, dataframe]))
+
+        return len(dataframe)
+
+    return timeseries.append(label, dataframe)
+
+
+def compute_analytics(model, asset_ids, benchmarks, last_indexes=None, start=None):
+    """
+    Compute and store the indicators of the assets at once, after their
+    last computed date if last_indexes are given
+    """
+    last_indexes = last_indexes or {}
+    tails, tail_benchmarks, peaks, stored = load_tails(model, asset_ids, benchmarks, last_indexes, start=start)
+
+    if not tails:
+        return 0
+
+    indicators = compute_indicators(
+        stack([tail.to_numpy() for tail in tails.values()]),
+        benchmark=stack([
+            tail_benchmarks.get(asset_id, np.full(len(tail), np.nan))
+            for asset_id, tail in tails.items()
+        ]),
+        peaks=np.array([peaks.get(asset_id, np.nan) for asset_id in tails]) if peaks else None
+    )
+
+    rows = 0
+
+    for i, (asset_id, tail) in enumerate(tails.items()):
+        dataframe = pd.DataFrame(
+            {column: indicators[column][-len(tail):, i] for column in ANALYTICS_COLUMNS},
+            index=tail.index
+        )
+
+        rows += store_analytics(
+            model,
+            asset_id,
+            dataframe,
+            last_index=last_indexes.get(asset_id),
+            stored=stored.get(model.get_analytics_label(asset_id))
+        )
+
+    return rows
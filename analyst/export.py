@@ -0,0 +1,212 @@
+import io
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from adapters import timeseries
+
+from .models import Asset
+
+logger = logging.getLogger(__name__)
+
+
+# Series read from the storage in a single round trip
+EXPORT_BATCH_SIZE = 200
+
+EXPORT_FORMATS = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class UnknownExportFormat(Exception):
+    pass
+
+
+class UnknownExportColumns(Exception):
+    pass
+
+
+class StreamSink(io.RawIOBase):
+    """
+    Writable file collecting the bytes written since the last pop,
+    its position keeps growing for the writers keeping offsets
+    """
+
+    def __init__(self):
+        super().__init__()
+
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+
+        return data
+
+
+def filter_assets(assets=None, kind=None, country=None, index=None):
+    """
+    Filter the assets in database before any serie is loaded,
+    index being the id or the name of an Index they are components of
+    """
+    assets = Asset.objects.all() if assets is None else assets
+
+    if kind:
+        assets = assets.filter(kind=kind)
+
+    if country:
+        assets = assets.filter(country=country)
+
+    if index:
+        if str(index).isdigit():
+            assets = assets.filter(index__id=index)
+        else:
+            assets = assets.filter(index__name=index)
+
+    return assets.order_by("id")
+
+
+def get_unknown_columns(assets, columns):
+    """
+    Columns stored in none of the series of the assets, from their
+    metadata, none if no serie is stored
+    """
+    if not (metadatas := assets.metadatas()):
+        return []
+
+    stored = {column for metadata in metadatas.values() for column in metadata.get("columns", ())}
+
+    return [column for column in columns if column not in stored]
+
+
+def load_batch(asset_ids, start=None, end=None, columns=("close",)):
+    """
+    Long dataframe of asset_id, date and columns rows of the series,
+    only the chunks overlapping the start and end dates being read
+    """
+    labels = [Asset.get_timeserie_label(asset_id) for asset_id in asset_ids]
+    dataframes = timeseries.get_many(labels, start=start, end=end)
+
+    ids, dates, values = [], [], []
+
+    for asset_id, label in zip(asset_ids, labels):
+        if (dataframe := dataframes.get(label)) is None or dataframe.empty:
+            continue
+
+        ids.append(np.full(len(dataframe), asset_id, dtype="int64"))
+        dates.append(dataframe.index.values.astype("datetime64[ns]"))
+        values.append(dataframe.reindex(columns=list(columns)).to_numpy(dtype="float64"))
+
+    if not ids:
+        return pd.DataFrame(columns=["asset_id", "date", *columns])
+
+    values = np.concatenate(values)
+
+    return pd.DataFrame({
+        "asset_id": np.concatenate(ids),
+        "date": np.concatenate(dates),
+        **{column: values[:, i] for i, column in enumerate(columns)}
+    })
+
+
+def iter_batches(asset_ids, batch_size, **kwargs):
+    """
+    Yield the long dataframes of the series by batches, the next batch
+    being read from the storage while the current one is written
+    """
+    batches = [asset_ids[i:i + batch_size] for i in range(0, len(asset_ids), batch_size)]
+
+    if not batches:
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(load_batch, batches[0], **kwargs)
+
+        for next_batch in batches[1:]:
+            batch = future.result()
+            future = executor.submit(load_batch, next_batch, **kwargs)
+
+            yield batch
+
+        yield future.result()
+
+
+def write_csv(batches, columns):
+    yield (",".join(["asset_id", "date", *columns]) + "\n").encode()
+
+    for batch in batches:
+        if not batch.empty:
+            yield batch.to_csv(index=False, header=False, date_format="%Y-%m-%d").encode()
+
+
+def write_arrow(batches, columns, parquet=False):
+    """
+    Write the batches as an Arrow IPC stream or as the row groups
+    of a Parquet file, yielding the bytes written after each one
+    """
+    schema = pa.schema([
+        ("asset_id", pa.int64()),
+        ("date", pa.timestamp("ns")),
+        *[(column, pa.float64()) for column in columns]
+    ])
+    sink = StreamSink()
+    writer = pq.ParquetWriter(sink, schema) if parquet else pa.ipc.new_stream(sink, schema)
+
+    for batch in batches:
+        if not batch.empty:
+            writer.write_table(pa.Table.from_pandas(batch, schema=schema, preserve_index=False))
+
+            yield sink.pop()
+
+    writer.close()
+
+    yield sink.pop()
+
+
+def export_timeseries(assets, output="arrow", start=None, end=None, columns=("close",), batch_size=None):
+    """
+    Yield the bytes of the series of the assets as a single Arrow IPC
+    stream, CSV or Parquet file of asset_id, date and columns rows,
+    the series being read and written by batches
+
+    Raise UnknownExportColumns if a column is stored in none of the series
+    """
+    if output not in EXPORT_FORMATS:
+        raise UnknownExportFormat(output)
+
+    columns = list(columns)
+
+    if unknown := get_unknown_columns(assets, columns):
+        raise UnknownExportColumns(", ".join(unknown))
+    batches = iter_batches(
+        list(assets.values_list("id", flat=True)),
+        batch_size or EXPORT_BATCH_SIZE,
+        start=start,
+        end=end,
+        columns=columns
+    )
+
+    if output == "csv":
+        return write_csv(batches, columns)
+
+    return write_arrow(batches, columns, parquet=output == "parquet")
@@ -0,0 +1,113 @@
+import json
+import logging
+
+from collections import Counter
+from datetime import datetime
+from time import time
+
+from adapters import redis
+
+logger = logging.getLogger(__name__)
+
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+# Jobs are kept a month
+JOB_TTL = 30 * 24 * 3600
+
+
+class RefreshJob(object):
+    """
+    Refresh run persisted in Redis, the state of each asset task
+    being stored in a hash as soon as it is finished, so a stopped
+    run can be resumed and its failed tasks retried
+    """
+    prefix = "refresh_job"
+
+    def __init__(self, job_id):
+        self.id = job_id
+
+    def __str__(self):
+        return f"<RefreshJob {self.id}>"
+
+    @classmethod
+    def get_tasks_label(cls, job_id):
+        return f"{cls.prefix}:{job_id}:tasks"
+
+    @classmethod
+    def get_last_label(cls):
+        return f"{cls.prefix}:last"
+
+    @classmethod
+    def create(cls, asset_ids):
+        job = cls(datetime.now().strftime("%Y%m%d%H%M%S%f"))
+        label = cls.get_tasks_label(job.id)
+
+        with redis.pipeline() as pipeline:
+            if asset_ids:
+                pipeline.hset(label, {
+                    asset_id: json.dumps({"status": PENDING})
+                    for asset_id in asset_ids
+                })
+                pipeline.expire(label, JOB_TTL)
+
+            pipeline.set(cls.get_last_label(), job.id, ex=JOB_TTL)
+
+        return job
+
+    @classmethod
+    def get(cls, job_id):
+        if redis.hgetall(cls.get_tasks_label(job_id)):
+            return cls(job_id)
+
+    @classmethod
+    def get_last(cls):
+        if job_id := redis.get(cls.get_last_label()):
+            return cls.get(job_id.decode())
+
+    def get_tasks(self):
+        return {
+            int(asset_id): json.loads(task)
+            for asset_id, task in redis.hgetall(self.get_tasks_label(self.id)).items()
+        }
+
+    def get_asset_ids(self, status):
+        return [
+            asset_id
+            for asset_id, task in self.get_tasks().items()
+            if task["status"] == status
+        ]
+
+    def finish(self, asset_id, status, reason=None, started_at=None):
+        now = time()
+        task = {
+            "status": status,
+            "reason": reason,
+            "started_at": started_at,
+            "finished_at": now,
+            "duration": now - started_at if started_at else None
+        }
+
+        redis.hset(self.get_tasks_label(self.id), {asset_id: json.dumps(task)})
+
+    def retry_failed(self):
+        """
+        Set the failed tasks back to pending, return their asset ids
+        """
+        asset_ids = self.get_asset_ids(FAILED)
+
+        if asset_ids:
+            redis.hset(self.get_tasks_label(self.id), {
+                asset_id: json.dumps({"status": PENDING})
+                for asset_id in asset_ids
+            })
+
+        return asset_ids
+
+    def get_summary(self):
+        counts = Counter(task["status"] for task in self.get_tasks().values())
+
+        return {status: counts[status] for status in (DONE, FAILED, SKIPPED, PENDING)}
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from analyst.analytics.indices import INDEX_METHODS
+from analyst.models import Index
+
+
+class Command(BaseCommand):
+    help = 'Reconstruct the indices from their components and report their tracking error'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--method', choices=INDEX_METHODS, action='append', help='Weighting, all by default')
+        parser.add_argument('--full', action='store_true', help='Rebuild the series from the start')
+
+    def handle(self, *args, **options):
+        for index in Index.objects.select_related("asset"):
+            for method in options["method"] or INDEX_METHODS:
+                rows = index.build_synthetic(method=method, full=options["full"])
+                tracking = index.get_tracking_error(method)
+
+                print(
+                    f"Index rebuilt        : {index.name} ({method}), {rows} rows stored"
+                    + (f", tracking error {tracking['tracking_error']:.2%}" if tracking else "")
+                )
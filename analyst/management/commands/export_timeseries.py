@@ -0,0 +1,44 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analyst.export import (EXPORT_FORMATS, UnknownExportColumns,
+                            export_timeseries, filter_assets)
+
+
+class Command(BaseCommand):
+    help = 'Export the series of the filtered assets in a single file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to write, - for the standard output')
+        parser.add_argument('--output', choices=list(EXPORT_FORMATS), default='arrow', help='File format')
+        parser.add_argument('--kind', help='Asset kind, I, S, F or C')
+        parser.add_argument('--country', help='Asset country')
+        parser.add_argument('--index', help='Id or name of the index the assets are components of')
+        parser.add_argument('--start', help='First date exported')
+        parser.add_argument('--end', help='Last date exported')
+        parser.add_argument('--columns', default='close', help='Comma separated columns exported')
+
+    def handle(self, *args, **options):
+        assets = filter_assets(kind=options["kind"], country=options["country"], index=options["index"])
+        try:
+            chunks = export_timeseries(
+                assets,
+                output=options["output"],
+                start=options["start"],
+                end=options["end"],
+                columns=list(dict.fromkeys(column for column in options["columns"].split(",") if column))
+            )
+        except UnknownExportColumns as exc:
+            raise CommandError(f"Unknown columns: {exc}")
+
+        if options["path"] == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            return
+
+        with open(options["path"], "wb") as fd:
+            for chunk in chunks:
+                fd.write(chunk)
+
+        print(f"Series exported      : {assets.count()} assets to {options['path']}")
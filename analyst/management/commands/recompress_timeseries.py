@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from adapters import timeseries
+from adapters.utils import chunked
+from analyst.models import Asset
+
+
+class Command(BaseCommand):
+    help = 'Rewrite the stored timeseries with the configured codec'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        totals = {"series": 0, "raw_size": 0, "previous_size": 0, "size": 0}
+        skipped = 0
+
+        asset_ids = Asset.objects.values_list("id", flat=True)
+
+        for batch in chunked(asset_ids.iterator(), options["batch_size"]):
+            labels = [Asset.get_timeserie_label(asset_id) for asset_id in batch]
+
+            if (stats := timeseries.recompress(labels)) is None:
+                skipped += len(labels)
+                continue
+
+            for key, value in stats.items():
+                totals[key] += value
+
+            print(f"Recompressed {stats['series']}/{len(labels)} series")
+
+        ratio = totals["raw_size"] / totals["size"] if totals["size"] else 0
+
+        print(
+            f"{totals['series']} series recompressed with {timeseries.codec_name}: "
+            f"{totals['previous_size']} -> {totals['size']} bytes "
+            f"(raw {totals['raw_size']} bytes, ratio {ratio:.2f})"
+        )
+
+        if skipped:
+            print(f"{skipped} series written meanwhile, run again to recompress them")
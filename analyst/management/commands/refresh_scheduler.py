@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from analyst.scheduler import RefreshScheduler
+
+
+class Command(BaseCommand):
+    help = 'Refresh the assets values continuously, the most stale first, until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-in-flight', type=int, default=8, help='Refreshes running at once')
+        parser.add_argument('--delay', type=int, default=1800, help='Seconds after the market close to refresh')
+        parser.add_argument('--retry-delay', type=int, default=900, help='Seconds before retrying a refresh')
+        parser.add_argument('--report-interval', type=int, default=60, help='Seconds between stats reports')
+
+    def handle(self, *args, **options):
+        RefreshScheduler(
+            max_in_flight=options["max_in_flight"],
+            delay=options["delay"],
+            retry_delay=options["retry_delay"],
+            report_interval=options["report_interval"]
+        ).run()
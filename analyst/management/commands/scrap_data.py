@@ -6,5 +6,14 @@ from analyst.scrapper import scrap_values
 class Command(BaseCommand):
     help = 'Scrap data to populate db with the right dataframes'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--resume', action='store_true', help='Resume the pending tasks of the last job')
+        parser.add_argument('--retry-failed', action='store_true', help='Retry the failed tasks of the last job')
+        parser.add_argument('--job', dest='job_id', help='Job to resume or retry instead of the last one')
+
     def handle(self, *args, **options):
-        scrap_values()
+        scrap_values(
+            resume=options["resume"],
+            retry_failed=options["retry_failed"],
+            job_id=options["job_id"]
+        )
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 
+from adapters import investing
 from analyst.scrapper import scrap_investing
 
 
@@ -8,6 +9,15 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('--show-indices', action='store_true')
+        parser.add_argument('--crawl', action='store_true', help='Fetch the index components concurrently')
 
     def handle(self, *args, **options):
         scrap_investing(**options)
+
+        if investing.cache:
+            stats = investing.cache.stats
+
+            print(
+                f"Response cache: {stats['hits']} hits, "
+                f"{stats['revalidations']} revalidated, {stats['misses']} fetched"
+            )
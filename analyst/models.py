@@ -1,14 +1,23 @@
-from datetime import datetime
+import logging
 
-import pandas as pd
+from datetime import datetime
 
 from django.db import models
 
-from adapters import redis
+from adapters import timeseries
+from analyst.analytics.indices import build_synthetic_index, get_tracking_error
+from analyst.analytics.matrix import build_price_matrix
+from analyst.analytics.portfolio import value_portfolio
+from analyst.analytics.rolling import update_analytics
+
+logger = logging.getLogger(__name__)
 
 
 class UpdateMixin:
-    def update_values(self, **new_values):
+    def set_values(self, **new_values):
+        """
+        Set the changed values without saving, return whether any changed
+        """
         updated = False
 
         for k, v in new_values.items():
@@ -16,17 +25,92 @@ class UpdateMixin:
                 setattr(self, k, v)
                 updated = True
 
+        return updated
+
+    def update_values(self, **new_values):
+        updated = self.set_values(**new_values)
+
         if updated:
             self.save()
 
         return updated
 
 
+class AssetQuerySet(models.QuerySet):
+    def _get_timeserie_labels(self):
+        return {
+            asset_id: self.model.get_timeserie_label(asset_id)
+            for asset_id in self.values_list("id", flat=True)
+        }
+
+    def dataframes(self, workers=None, start=None, end=None):
+        """
+        Load the dataframes of all the assets at once, only their rows
+        between the start and end dates if given,
+        return a dict of dataframes by asset id
+        """
+        labels = self._get_timeserie_labels()
+        dataframes = timeseries.get_many(list(labels.values()), workers=workers, start=start, end=end)
+
+        return {
+            asset_id: dataframes[label]
+            for asset_id, label in labels.items()
+            if label in dataframes
+        }
+
+    def price_matrix(self, **kwargs):
+        """
+        Aligned dates x assets price matrix of the queryset,
+        see analyst.analytics.matrix.build_price_matrix
+        """
+        return build_price_matrix(self, **kwargs)
+
+    def benchmarks(self):
+        """
+        Asset id of the first index each asset is a component of,
+        by asset id
+        """
+        benchmarks = {}
+
+        for asset_id, index_asset_id in (
+            Index.objects
+            .filter(components__in=self, asset__isnull=False)
+            .order_by("id")
+            .values_list("components", "asset_id")
+        ):
+            benchmarks.setdefault(asset_id, index_asset_id)
+
+        return benchmarks
+
+    def update_analytics(self, full=False, benchmarks_since=None):
+        """
+        Compute the indicators of the new rows of the assets series,
+        see analyst.analytics.rolling.update_analytics
+        """
+        return update_analytics(self, full=full, benchmarks_since=benchmarks_since)
+
+    def metadatas(self):
+        """
+        Load the timeserie metadata of all the assets at once,
+        return a dict of metadata by asset id
+        """
+        labels = self._get_timeserie_labels()
+        metadatas = timeseries.get_metadatas(list(labels.values()))
+
+        return {
+            asset_id: metadatas[label]
+            for asset_id, label in labels.items()
+            if label in metadatas
+        }
+
+
 class Asset(models.Model, UpdateMixin):
 
     class Meta:
         ordering = ['id']
 
+    objects = AssetQuerySet.as_manager()
+
     ASSET_TYPE = (
         ('I', 'Indice'),
         ('S', 'Stock'),
@@ -49,21 +133,91 @@ class Asset(models.Model, UpdateMixin):
 
     extra_data = models.JSONField(null=True, default=dict)
 
+    @staticmethod
+    def get_timeserie_label(asset_id):
+        return f"asset_{asset_id}"
+
     @property
     def timeserie_label(self):
-        return f"asset_{self.id}"
+        return self.get_timeserie_label(self.id)
 
     @property
     def dataframe(self):
-        if data := redis.get(self.timeserie_label):
-            return pd.read_json(data).sort_index()
+        return timeseries.get(self.timeserie_label)
+
+    def get_dataframe(self, start=None, end=None):
+        """
+        Get the rows between the start and end dates included,
+        only the stored chunks covering them are fetched
+        """
+        return timeseries.get_range(self.timeserie_label, start=start, end=end)
+
+    @property
+    def timeserie_metadata(self):
+        return timeseries.get_metadata(self.timeserie_label)
+
+    @property
+    def timeserie_version(self):
+        return timeseries.get_version(self.timeserie_label)
+
+    @staticmethod
+    def get_analytics_label(asset_id):
+        return f"asset_{asset_id}_analytics"
+
+    def get_analytics(self, start=None, end=None):
+        """
+        Indicators of the rows between the start and end dates included
+        """
+        return timeseries.get_range(self.get_analytics_label(self.id), start=start, end=end)
+
+    def update_analytics(self, full=False, since=None):
+        """
+        Compute the indicators of the new rows of the asset,
+        and of the components of the index it is the serie of,
+        since being its last date before the new rows
+        """
+        assets = Asset.objects.filter(models.Q(id=self.id) | models.Q(index__asset=self)).distinct()
+
+        return assets.update_analytics(full=full, benchmarks_since={self.id: since} if since is not None else None)
+
+    def refresh_analytics(self, full=False, since=None):
+        """
+        Update the analytics after a write of the serie, a failure being
+        logged without failing the write, the next update catches up
+        from the last computed date
+        """
+        try:
+            self.update_analytics(full=full, since=since)
+        except Exception:
+            logger.exception(f"Analytics update failed on {self}")
+
+            if full:
+                # Computed on the replaced serie, rebuilt on the next update
+                timeseries.delete(self.get_analytics_label(self.id))
+
+    def get_last_index(self):
+        return timeseries.get_last_index(self.timeserie_label)
 
     def store_dataframe(self, dataframe):
-        redis.set(self.timeserie_label, dataframe.to_json())
+        timeseries.set(self.timeserie_label, dataframe, source=self.data_source)
+
+        self.updated_at = datetime.now()
+        self.save()
+
+        self.refresh_analytics(full=True)
+
+    def append_dataframe(self, dataframe):
+        last_index = self.get_last_index()
+        appended = timeseries.append(self.timeserie_label, dataframe, source=self.data_source)
 
         self.updated_at = datetime.now()
         self.save()
 
+        # Analytics behind the serie are caught up even if nothing was appended
+        self.refresh_analytics(since=last_index)
+
+        return appended
+
     def __str__(self):
         return f"<Asset {self.name}>"
 
@@ -96,6 +250,34 @@ class Index(models.Model, UpdateMixin):
     def __str__(self):
         return f"<Index {self.name}>"
 
+    def get_synthetic_label(self, method="cap"):
+        return f"index_{self.id}_{method}"
+
+    def get_synthetic(self, method="cap"):
+        """
+        Stored level serie of the index reconstructed from its components
+        """
+        return timeseries.get(self.get_synthetic_label(method))
+
+    def build_synthetic(self, method="cap", full=False):
+        """
+        Append the new dates of the reconstructed index,
+        see analyst.analytics.indices.build_synthetic_index
+        """
+        return build_synthetic_index(self, method=method, full=full)
+
+    def get_tracking_error(self, method="cap"):
+        """
+        Tracking error of the reconstructed index against the official serie
+        """
+        synthetic = self.get_synthetic(method)
+        official = self.asset.dataframe if self.asset_id else None
+
+        if synthetic is None or official is None:
+            return None
+
+        return get_tracking_error(synthetic, official)
+
 
 class Portfolio(models.Model):
 
@@ -112,3 +294,17 @@ class Portfolio(models.Model):
 
     def __str__(self):
         return f"<Portfolio {self.name}>"
+
+    def get_weights(self):
+        """
+        Weights by asset id, None for equally weighted assets
+        """
+        if self.weights:
+            return {int(asset_id): float(weight) for asset_id, weight in self.weights.items()}
+
+    def valuation(self, rebalance=None, initial=100.0):
+        """
+        Daily nav and returns of the portfolio,
+        see analyst.analytics.portfolio.value_portfolio
+        """
+        return value_portfolio(self.assets.all(), weights=self.get_weights(), rebalance=rebalance, initial=initial)
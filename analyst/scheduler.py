@@ -0,0 +1,291 @@
+import heapq
+import json
+import logging
+import signal
+import threading
+
+from concurrent.futures import wait
+from datetime import datetime
+from datetime import time as day_time
+from time import time
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from django.db import close_old_connections
+
+from adapters import datareaders, redis
+from adapters.timeseries.metadata import get_last_date
+
+from .jobs import DONE, FAILED
+from .models import Asset
+from .scrapper import SkipRefresh, get_refresh, store_values
+
+logger = logging.getLogger(__name__)
+
+
+# Market close time zone, hour and minute by country
+MARKET_CLOSES = {
+    "Australia": ("Australia/Sydney", 16, 0),
+    "Canada": ("America/Toronto", 16, 0),
+    "Euro Zone": ("Europe/Paris", 17, 30),
+    "France": ("Europe/Paris", 17, 30),
+    "Germany": ("Europe/Berlin", 17, 30),
+    "Hong Kong": ("Asia/Hong_Kong", 16, 0),
+    "Japan": ("Asia/Tokyo", 15, 0),
+    "Switzerland": ("Europe/Zurich", 17, 30),
+    "United Kingdom": ("Europe/London", 16, 30),
+    "United States": ("America/New_York", 16, 0),
+}
+
+# Daily close of the currencies, cryptos and unknown markets
+DEFAULT_CLOSE = ("UTC", 22, 0)
+
+
+def get_market_close(country, day):
+    """
+    Timestamp of the market close of a country on the given day
+    """
+    zone, hour, minute = MARKET_CLOSES.get(country, DEFAULT_CLOSE)
+
+    return datetime.combine(day, day_time(hour, minute), tzinfo=ZoneInfo(zone)).timestamp()
+
+
+def get_due_at(asset, last_index, delay=0):
+    """
+    Timestamp the values following the last stored date are expected at,
+    delay seconds after the market close of the next trading day
+    """
+    if last_index is None:
+        return 0.0
+
+    if asset.kind == "C":
+        next_day = pd.Timestamp(last_index) + pd.offsets.Day(1)
+    else:
+        next_day = pd.Timestamp(last_index) + pd.offsets.BDay(1)
+
+    country = asset.country if asset.kind in ("S", "I") else None
+
+    return get_market_close(country, next_day.date()) + delay
+
+
+class RefreshScheduler(object):
+    """
+    Assets are kept in a heap ordered by the time their next values are
+    due, so the most stale ones come first, and their refreshes are
+    dispatched to the datareaders as they become due, each provider
+    within its own rate limit
+
+    The loop sleeps until the next due time or the end of a refresh,
+    stats are reported periodically under "scheduler:stats" in Redis
+    """
+    stats_label = "scheduler:stats"
+
+    def __init__(
+        self, max_in_flight=8, delay=1800, retry_delay=900,
+        max_retry_delay=86400, reload_interval=3600, report_interval=60
+    ):
+        self.max_in_flight = max_in_flight
+        self.delay = delay
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.reload_interval = reload_interval
+        self.report_interval = report_interval
+
+        # Heap of (due_at, asset_id), entries not matching scheduled are stale
+        self.queue = []
+        self.scheduled = {}
+        self.in_flight = {}
+        self.failures = {}
+        self.misses = {}
+        self.counters = {DONE: 0, FAILED: 0}
+
+        self.stopping = threading.Event()
+        self.wakeup = threading.Event()
+        self.loaded_at = None
+        self.reported_at = 0.0
+
+    def schedule(self, asset_id, due_at):
+        self.scheduled[asset_id] = due_at
+        heapq.heappush(self.queue, (due_at, asset_id))
+
+    def load(self, now):
+        """
+        Schedule the new assets from their last stored date,
+        forget the deleted ones
+        """
+        assets = Asset.objects.all()
+        metadatas = assets.metadatas()
+        in_flight = {asset.id for asset, *_ in self.in_flight.values()}
+        asset_ids = set()
+
+        for asset in assets:
+            asset_ids.add(asset.id)
+
+            if asset.id in self.scheduled or asset.id in in_flight:
+                continue
+
+            metadata = metadatas.get(asset.id)
+            last_index = get_last_date(metadata) if metadata else None
+
+            self.schedule(asset.id, get_due_at(asset, last_index, delay=self.delay))
+
+        for asset_id in set(self.scheduled) - asset_ids:
+            del self.scheduled[asset_id]
+
+        self.loaded_at = now
+
+    def pop_due(self, now):
+        """
+        Return the most stale due asset id with its due time, None if none is due
+        """
+        while self.queue and self.queue[0][0] <= now:
+            due_at, asset_id = heapq.heappop(self.queue)
+
+            if self.scheduled.get(asset_id) == due_at:
+                del self.scheduled[asset_id]
+
+                return asset_id, due_at
+
+        return None
+
+    def dispatch(self, now):
+        while len(self.in_flight) < self.max_in_flight and (due := self.pop_due(now)):
+            asset_id, due_at = due
+
+            if (asset := Asset.objects.filter(id=asset_id).first()) is None:
+                continue
+
+            try:
+                ticker, pending_ticker, last_index = get_refresh(asset, max_age=None)
+            except SkipRefresh:
+                self.schedule(asset_id, now + self.max_retry_delay)
+                continue
+
+            future = datareaders.submit(ticker, asset.kind, since=last_index, source=asset.data_source)
+            future.add_done_callback(lambda _: self.wakeup.set())
+
+            self.in_flight[future] = (asset, ticker, pending_ticker, last_index)
+
+    def handle_done(self, now):
+        for future in [future for future in self.in_flight if future.done()]:
+            asset, ticker, pending_ticker, last_index = self.in_flight.pop(future)
+
+            try:
+                source, df = future.result()
+                status, _ = store_values(asset, ticker, pending_ticker, last_index, source, df)
+            except Exception as exc:
+                print(f"Refresh failed       : {asset.name} ({exc})")
+                status = FAILED
+
+            self.counters[status] += 1
+            self.reschedule(asset, status, now, last_index=last_index)
+
+    def get_retry_delay(self, retries, asset_id):
+        """
+        Count a retry of the asset, return the delay doubling with each one
+        """
+        count = retries[asset_id] = retries.get(asset_id, 0) + 1
+
+        return min(self.retry_delay * 2 ** (count - 1), self.max_retry_delay)
+
+    def reschedule(self, asset, status, now, last_index=None):
+        """
+        Schedule the next values of a refreshed asset, retry the failures
+        and the values not published yet, on holidays or by a late provider,
+        with a growing delay
+        """
+        if status == FAILED:
+            self.schedule(asset.id, now + self.get_retry_delay(self.failures, asset.id))
+            return
+
+        self.failures.pop(asset.id, None)
+
+        if (stored_index := asset.get_last_index()) != last_index:
+            self.misses.pop(asset.id, None)
+
+        if (due_at := get_due_at(asset, stored_index, delay=self.delay)) > now:
+            self.schedule(asset.id, due_at)
+        elif stored_index == last_index:
+            self.schedule(asset.id, now + self.get_retry_delay(self.misses, asset.id))
+        else:
+            self.schedule(asset.id, now + self.retry_delay)
+
+    def get_stats(self, now):
+        due = [due_at for due_at, asset_id in self.queue if due_at <= now and self.scheduled.get(asset_id) == due_at]
+
+        return {
+            "scheduled": len(self.scheduled),
+            "due": len(due),
+            "in_flight": len(self.in_flight),
+            "lag": now - min(due) if due else 0.0,
+            "done": self.counters[DONE],
+            "failed": self.counters[FAILED],
+            "reported_at": now
+        }
+
+    def report(self, now):
+        stats = self.get_stats(now)
+
+        redis.set(self.stats_label, json.dumps(stats))
+        print(
+            f"Scheduler            : {stats['due']} due, {stats['scheduled']} scheduled, "
+            f"{stats['in_flight']} in flight, {stats['lag']:.0f}s lag, "
+            f"{stats['done']} done, {stats['failed']} failed"
+        )
+
+        self.reported_at = now
+
+    def get_timeout(self, now):
+        """
+        Seconds to sleep until the next due asset, reload or report
+        """
+        deadlines = [self.loaded_at + self.reload_interval, self.reported_at + self.report_interval]
+
+        if self.queue and len(self.in_flight) < self.max_in_flight:
+            deadlines.append(self.queue[0][0])
+
+        return max(0.0, min(deadlines) - now)
+
+    def stop(self, *args):
+        self.stopping.set()
+        self.wakeup.set()
+
+    def run_once(self):
+        """
+        Handle the finished refreshes and dispatch the due ones,
+        return the seconds to sleep
+        """
+        self.wakeup.clear()
+        close_old_connections()
+
+        now = time()
+
+        if self.loaded_at is None or now - self.loaded_at >= self.reload_interval:
+            self.load(now)
+
+        self.handle_done(now)
+        self.dispatch(now)
+
+        if now - self.reported_at >= self.report_interval:
+            self.report(now)
+
+        return self.get_timeout(now)
+
+    def run(self):
+        """
+        Run until stopped by SIGINT or SIGTERM, the refreshes
+        in flight are then stored before returning
+        """
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+        while not self.stopping.is_set():
+            self.wakeup.wait(self.run_once())
+
+        print(f"Scheduler            : stopping, {len(self.in_flight)} refreshes in flight")
+
+        wait(list(self.in_flight))
+        self.handle_done(time())
+        self.report(time())
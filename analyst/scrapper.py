@@ -1,14 +1,27 @@
+from concurrent.futures import as_completed
 from datetime import datetime, timedelta
+from time import time
 
-import pandas as pd
+from django.db import transaction
+from django.utils import timezone
 
 from adapters import datareaders, investing
+from adapters.timeseries.exceptions import SerieRebased
+from adapters.timeseries.metadata import get_last_date
 
+from .jobs import DONE, FAILED, PENDING, SKIPPED, RefreshJob
 from .models import Asset, Index
 from .utils.scrapper import check_prices_diff
 
+# Asset fields set from investing.com
+INVESTING_FIELDS = ["kind", "country", "init_source", "extra_data"]
 
-def scrap_investing(show_indices=False, **kwargs):  # noqa: C901
+
+class SkipRefresh(Exception):
+    pass
+
+
+def scrap_investing(show_indices=False, crawl=False, **kwargs):
     if show_indices:
         indices = investing.get_indices(bypass_filter=True)
 
@@ -20,154 +33,342 @@ def scrap_investing(show_indices=False, **kwargs):  # noqa: C901
     indices = investing.get_indices(**kwargs)
 
     for indice_name, indice_data in indices.items():
-        indice_url = indice_data.get("link")
-        indice_country = indice_data.get("country")
-
-        indice_asset = Asset.objects.filter(name=indice_name).first()
-        if indice_asset and indice_asset.up_to_date():
-            print(f"Index Asset {indice_name} already up to date")
-        else:
-            indice_asset_data = investing.get_asset(indice_data.get("link"))
-
-            indice_asset_attrs = {
-                "name": indice_name,
-                "kind": "I",
-                "country": indice_country,
-                "init_source": "investing.com",
-                "extra_data": indice_asset_data
-            }
-
-            if indice_asset:
-                if indice_asset.update_values(**indice_asset_attrs):
-                    print(f"Update Index Asset {indice_name}")
-                else:
-                    print(f"Index Asset {indice_name} already up to date")
-            else:
-                print(f"Create Index Asset {indice_name}")
-                indice_asset = Asset.objects.create(**indice_asset_attrs)
-
-        indice_attrs = {
+        scrap_indice(indice_name, indice_data, crawl=crawl)
+
+
+def get_components_data(indice_url, crawl=False):
+    """
+    Data of the components of an index by name, the details
+    of the assets up to date may be left out when crawling
+    """
+    if crawl:
+        # Details of the up to date assets aren't needed
+        up_to_date = set(
+            Asset.objects
+            .filter(updated_at__date=timezone.localdate())
+            .values_list("name", flat=True)
+        )
+        assets = investing.crawl_assets(indice_url, skip=up_to_date)
+    else:
+        assets = investing.get_assets(indice_url).values()
+
+    return {asset_data["name"]: asset_data for asset_data in assets}
+
+
+def scrap_indice(indice_name, indice_data, crawl=False):
+    """
+    Fetch an index and its components, then store them
+    in a single transaction with a constant number of queries
+    """
+    indice_country = indice_data.get("country")
+    components_data = get_components_data(indice_data.get("link"), crawl=crawl)
+
+    existing = {
+        asset.name: asset
+        for asset in Asset.objects.filter(name__in=[indice_name, *components_data])
+    }
+    assets_attrs = {}
+
+    indice_asset = existing.get(indice_name)
+    if indice_asset and indice_asset.up_to_date():
+        print(f"Index Asset {indice_name} already up to date")
+    else:
+        assets_attrs[indice_name] = {
             "name": indice_name,
-            "asset": indice_asset,
+            "kind": "I",
             "country": indice_country,
-            "init_source": "investing.com"
+            "init_source": "investing.com",
+            "extra_data": investing.get_asset(indice_data.get("link"))
+        }
+
+    for asset_name, asset_data in components_data.items():
+        asset = existing.get(asset_name)
+        if asset and asset.up_to_date():
+            print(f"Asset {asset_name} already up to date")
+            continue
+
+        if "kind" not in asset_data:
+            asset_extra_data = investing.get_asset(asset_data.get("link"))
+            asset_data.update(asset_extra_data)
+
+        assets_attrs[asset_name] = {
+            "name": asset_name,
+            "kind": asset_data.get("kind"),
+            "country": asset_data.get("country"),
+            "init_source": "investing.com",
+            "extra_data": asset_data
         }
 
-        if indice := Index.objects.filter(name=indice_name).first():
-            if indice.update_values(**indice_attrs):
-                print(f"Update Index {indice_name}")
-            else:
-                print(f"Index {indice_name} already up to date")
+    with transaction.atomic():
+        assets = {**existing, **upsert_assets(assets_attrs.values(), existing, indice_name=indice_name)}
+
+        indice = upsert_indice({
+            "name": indice_name,
+            "asset": assets[indice_name],
+            "country": indice_country,
+            "init_source": "investing.com"
+        })
+
+        sync_components(indice, [assets[asset_name] for asset_name in components_data])
+
+
+def upsert_assets(assets_attrs, existing, indice_name=None):
+    """
+    Create the missing assets and update the changed ones in bulk,
+    return the assets by name
+    """
+    now = timezone.now()
+    assets = {}
+    created = []
+    updated = []
+
+    for asset_attrs in assets_attrs:
+        asset_name = asset_attrs["name"]
+        label = "Index Asset" if asset_name == indice_name else "Asset"
+
+        if (asset := existing.get(asset_name)) is None:
+            print(f"Create {label} {asset_name}")
+            asset = Asset(**asset_attrs)
+            created.append(asset)
+        elif asset.set_values(**asset_attrs):
+            print(f"Update {label} {asset_name}")
+            # Not set by bulk_update
+            asset.updated_at = now
+            updated.append(asset)
         else:
-            print(f"Create Index {indice_name}")
-            indice = Index.objects.create(**indice_attrs)
+            print(f"{label} {asset_name} already up to date")
 
-        indice_components = []
+        assets[asset_name] = asset
 
-        assets = investing.get_assets(indice_url)
+    Asset.objects.bulk_create(created)
+    Asset.objects.bulk_update(updated, [*INVESTING_FIELDS, "updated_at"])
 
-        for asset_name, asset_data in assets.items():
+    return assets
 
-            asset = Asset.objects.filter(name=asset_name).first()
-            if asset and asset.up_to_date():
-                print(f"Asset {asset_name} already up to date")
-            else:
-                asset_extra_data = investing.get_asset(asset_data.get("link"))
-                asset_data.update(asset_extra_data)
 
-                asset_attrs = {
-                    "name": asset_name,
-                    "kind": asset_data.get("kind"),
-                    "country": asset_data.get("country"),
-                    "init_source": "investing.com",
-                    "extra_data": asset_data
-                }
+def upsert_indice(indice_attrs):
+    indice_name = indice_attrs["name"]
 
-                if asset:
-                    if asset.update_values(**asset_attrs):
-                        print(f"Update Asset {asset_name}")
-                    else:
-                        print(f"Asset {asset_name} already up to date")
-                else:
-                    print(f"Create Asset {asset_name}")
-                    asset = Asset.objects.create(**asset_attrs)
+    if indice := Index.objects.filter(name=indice_name).first():
+        if indice.update_values(**indice_attrs):
+            print(f"Update Index {indice_name}")
+        else:
+            print(f"Index {indice_name} already up to date")
+    else:
+        print(f"Create Index {indice_name}")
+        indice = Index.objects.create(**indice_attrs)
 
-            indice_components.append(asset)
+    return indice
 
-        old_indice_components = list(indice.components.all())
 
-        for old_component in old_indice_components:
-            if old_component not in indice_components:
-                print(f"{indice}: Removing {old_component}")
+def sync_components(indice, components):
+    """
+    Apply the difference between the stored and the given components
+    """
+    old_components = {asset.id: asset for asset in indice.components.all()}
+    new_components = {asset.id: asset for asset in components}
 
-        for component in indice_components:
-            if component not in old_indice_components:
-                print(f"{indice}: Adding {component}")
+    removed = old_components.keys() - new_components.keys()
+    added = new_components.keys() - old_components.keys()
 
-        if set(indice_components) != set(old_indice_components):
-            print(f"Saving indice new components on {indice}")
-            indice.components.set(indice_components)
-            indice.save()
+    for asset_id in removed:
+        print(f"{indice}: Removing {old_components[asset_id]}")
 
+    for asset_id in added:
+        print(f"{indice}: Adding {new_components[asset_id]}")
 
-def scrap_values():  # noqa: C901
-    for asset in Asset.objects.all():
-        dataframe = asset.dataframe
+    if removed or added:
+        print(f"Saving indice new components on {indice}")
+        indice.components.remove(*removed)
+        indice.components.add(*added)
+        indice.save()
 
+
+def get_refresh(asset, metadata=None, max_age=timedelta(days=3)):
+    """
+    Return the ticker to fetch, the pending ticker and the last stored
+    date of an asset, raise SkipRefresh if it doesn't need a refresh,
+    its last values being less than max_age old
+    """
+    if metadata:
+        last_index = get_last_date(metadata)
+    else:
+        last_index = asset.get_last_index()
+
+    if max_age is not None and last_index is not None and last_index > datetime.now() - max_age:
+        print(f"Dataframe up to date : {asset.name}")
+        raise SkipRefresh("up to date")
+
+    ticker = asset.ticker
+    pending_ticker = None
+
+    if not ticker:
+        pending_ticker = asset.extra_data.get("pending_ticker")
+
+        invalid_tickers = asset.extra_data.get("invalid_tickers") or ()
         if (
-            isinstance(dataframe, pd.DataFrame) and
-            dataframe.last("d").index.to_pydatetime()[0] > datetime.now() - timedelta(days=3)
+            not pending_ticker or
+            pending_ticker in invalid_tickers
         ):
-            print(f"Dataframe up to date : {asset.name}")
-            continue
+            print(f"No tickers           : {asset.name}")
+            raise SkipRefresh("no tickers")
 
-        ticker = asset.ticker
-        pending_ticker = None
+    return ticker or pending_ticker, pending_ticker, last_index
 
-        if not ticker:
-            pending_ticker = asset.extra_data.get("pending_ticker")
 
-            invalid_tickers = asset.extra_data.get("invalid_tickers") or ()
-            if (
-                not pending_ticker or
-                pending_ticker in invalid_tickers
-            ):
-                print(f"No tickers           : {asset.name}")
-                continue
+def invalidate_ticker(asset, pending_ticker):
+    asset.extra_data.setdefault("invalid_tickers", [])
 
-        ticker = ticker or pending_ticker
+    if pending_ticker not in asset.extra_data["invalid_tickers"]:
+        asset.extra_data["invalid_tickers"].append(pending_ticker)
+        asset.save()
 
-        source, df = datareaders.get(ticker, asset.kind)
 
-        if not source:
-            if pending_ticker:
-                asset.extra_data.setdefault("invalid_tickers", [])
+def store_values(asset, ticker, pending_ticker, last_index, source, df):
+    """
+    Store the fetched values, return the task status and its reason
+    """
+    if not source:
+        print(f"No data              : {asset.name}")
 
-                if pending_ticker not in asset.extra_data["invalid_tickers"]:
-                    asset.extra_data["invalid_tickers"].append(pending_ticker)
-                    asset.save()
+        if pending_ticker:
+            invalidate_ticker(asset, pending_ticker)
 
-            continue
+        return FAILED, "no data"
 
-        if pending_ticker:
-            # Check between investing.com prices and the one retrieved
-            last_close_stored = asset.extra_data.get("close")
-            last_close = df.iloc[-1].close
+    if df.empty:
+        print(f"No new values        : {asset.name}")
+        return DONE, "no new values"
 
-            if not check_prices_diff(last_close, last_close_stored):
-                print(f"Prices don't match   : {asset.name} ({last_close};{last_close_stored})")
+    if pending_ticker:
+        # Check between investing.com prices and the one retrieved
+        last_close_stored = asset.extra_data.get("close")
+        last_close = df.iloc[-1].close
 
-                asset.extra_data.setdefault("invalid_tickers", [])
+        if not check_prices_diff(last_close, last_close_stored):
+            print(f"Prices don't match   : {asset.name} ({last_close};{last_close_stored})")
 
-                if pending_ticker not in asset.extra_data["invalid_tickers"]:
-                    asset.extra_data["invalid_tickers"].append(pending_ticker)
-                    asset.save()
+            invalidate_ticker(asset, pending_ticker)
+            return FAILED, "prices don't match"
 
-                continue
+        asset.update_values(ticker=ticker)
 
-            asset.update_values(ticker=ticker)
+    asset.update_values(data_source=source)
 
-        asset.update_values(data_source=source)
+    if last_index is None:
         asset.store_dataframe(df)
 
         print(f"Dataframe stored     : {asset.name}")
+
+        return DONE, f"{len(df)} rows stored"
+
+    try:
+        appended = asset.append_dataframe(df)
+    except SerieRebased:
+        return store_rebased_values(asset, ticker, source)
+
+    print(f"Dataframe appended   : {asset.name} ({appended} rows)")
+
+    return DONE, f"{appended} rows appended"
+
+
+def store_rebased_values(asset, ticker, source):
+    """
+    Fetch and store the whole serie again, the provider having
+    adjusted the closes already stored
+    """
+    print(f"Values rebased       : {asset.name}")
+
+    source, df = datareaders.get(ticker, asset.kind, source=source)
+
+    if not source:
+        return FAILED, "values rebased, no data"
+
+    asset.update_values(data_source=source)
+    asset.store_dataframe(df)
+
+    print(f"Dataframe stored     : {asset.name}")
+
+    return DONE, f"values rebased, {len(df)} rows stored"
+
+
+def get_job(resume=False, retry_failed=False, job_id=None):
+    """
+    Return the job to run with its assets, a new job
+    unless resuming or retrying the failed tasks of a job
+    """
+    if not (resume or retry_failed or job_id):
+        assets = Asset.objects.all()
+
+        return RefreshJob.create(list(assets.values_list("id", flat=True))), assets
+
+    if (job := RefreshJob.get(job_id) if job_id else RefreshJob.get_last()) is None:
+        return None, None
+
+    if retry_failed:
+        job.retry_failed()
+
+    asset_ids = job.get_asset_ids(PENDING)
+    assets = Asset.objects.filter(id__in=asset_ids)
+
+    for asset_id in set(asset_ids) - set(assets.values_list("id", flat=True)):
+        job.finish(asset_id, SKIPPED, reason="asset deleted")
+
+    return job, assets
+
+
+def scrap_values(resume=False, retry_failed=False, job_id=None):
+    """
+    Fetches run concurrently on the datareaders thread pools, each
+    provider within its own rate limit, while the results are stored
+    from this thread as they come
+
+    Each asset is a task of a refresh job, its state being saved once
+    handled, a stopped job can be resumed and its failed tasks retried
+    """
+    job, assets = get_job(resume=resume, retry_failed=retry_failed, job_id=job_id)
+
+    if job is None:
+        print("No refresh job found")
+        return None
+
+    metadatas = assets.metadatas()
+    refreshes = {}
+
+    print(f"Refresh job          : {job.id} ({len(assets)} assets)")
+
+    for asset in assets:
+        started_at = time()
+
+        try:
+            ticker, pending_ticker, last_index = get_refresh(asset, metadatas.get(asset.id))
+        except SkipRefresh as exc:
+            job.finish(asset.id, SKIPPED, reason=str(exc), started_at=started_at)
+            continue
+
+        future = datareaders.submit(ticker, asset.kind, since=last_index, source=asset.data_source)
+        refreshes[future] = (asset, ticker, pending_ticker, last_index, started_at)
+
+    for future in as_completed(refreshes):
+        asset, ticker, pending_ticker, last_index, started_at = refreshes[future]
+
+        try:
+            source, df = future.result()
+            status, reason = store_values(asset, ticker, pending_ticker, last_index, source, df)
+        except Exception as exc:
+            print(f"Refresh failed       : {asset.name} ({exc})")
+            status, reason = FAILED, str(exc)
+
+        job.finish(asset.id, status, reason=reason, started_at=started_at)
+
+    for name, stats in datareaders.stats.items():
+        print(
+            f"Provider {name:12s}: {stats['served']} served, {stats['not_found']} not found, "
+            f"{stats['failures']} failed, {stats['skipped']} skipped, {stats['latency'] * 1000:.0f} ms mean latency"
+        )
+
+    summary = job.get_summary()
+
+    print(f"Refresh job          : {job.id} (" + ", ".join(f"{count} {status}" for status, count in summary.items()) + ")")
+
+    return job
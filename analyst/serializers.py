@@ -3,6 +3,8 @@ import logging
 from django.contrib.auth.models import Group, User
 from rest_framework import serializers
 
+from analyst.models import Asset
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,3 +18,9 @@ class GroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = ('url', 'name')
+
+
+class AssetSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Asset
+        fields = ('url', 'id', 'name', 'kind', 'ticker', 'country', 'data_source', 'updated_at')
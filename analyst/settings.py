@@ -113,8 +113,38 @@ REDIS_CONFIG = get_config_from_env("REDIS")
 if TEST:
     REDIS_CONFIG["prefix"] = "test"
 
+TIMESERIES_CONFIG = {
+    # Storage of the series, redis or file to map them from local files
+    "backend": os.environ.get("TIMESERIES_BACKEND", "redis"),
+    "path": os.environ.get("TIMESERIES_PATH", os.path.join(BASE_DIR, "data", "timeseries")),
+    # In process cache of the loaded series, in bytes
+    "cache_size": int(os.environ.get("TIMESERIES_CACHE_SIZE", 256 * 2 ** 20)),
+    # Compression of the stored series: none, zlib, zstd or lz4
+    "codec": os.environ.get("TIMESERIES_CODEC", "zstd")
+}
+
+DATAREADERS_CONFIG = {
+    # Symbols a provider doesn't have are not asked again for a week
+    "missing_ttl": int(os.environ.get("DATAREADERS_MISSING_TTL", 7 * 24 * 3600)),
+    # Providers failing 5 times in a row are skipped for 5 minutes
+    "threshold": int(os.environ.get("DATAREADERS_FAILURE_THRESHOLD", 5)),
+    "cooldown": int(os.environ.get("DATAREADERS_COOLDOWN", 300)),
+}
+
+# In process cache of the aligned price matrices, in bytes
+PRICE_MATRIX_CACHE_SIZE = int(os.environ.get("PRICE_MATRIX_CACHE_SIZE", 256 * 2 ** 20))
+
+# In process cache of the portfolio valuations, in bytes
+NAV_CACHE_SIZE = int(os.environ.get("NAV_CACHE_SIZE", 64 * 2 ** 20))
+
 INVESTING_CONFIG = {
     "url": "https://www.investing.com",
+    # Requests in flight when crawling, all within the requests per minute
+    "concurrency": int(os.environ.get("INVESTING_CONCURRENCY", 4)),
+    "requests_per_minute": int(os.environ.get("INVESTING_REQUESTS_PER_MINUTE", 6)),
+    # Responses kept on disk for a day, set an empty path to disable
+    "cache_path": os.environ.get("INVESTING_CACHE_PATH", os.path.join(BASE_DIR, "data", "http_cache")) or None,
+    "cache_ttl": int(os.environ.get("INVESTING_CACHE_TTL", 86400)),
     "config": {
         "indice": {
             "include": {
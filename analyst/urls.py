@@ -5,11 +5,12 @@ from rest_framework import routers
 from rest_framework_simplejwt.views import (TokenObtainPairView,
                                             TokenRefreshView)
 
-from analyst.views import GroupViewSet, UserViewSet
+from analyst.views import AssetViewSet, GroupViewSet, UserViewSet
 
 router = routers.DefaultRouter(trailing_slash=False)
 router.register(r'users', UserViewSet)
 router.register(r'groups', GroupViewSet)
+router.register(r'assets', AssetViewSet)
 
 urlpatterns = [
     path('api/', include(router.urls)),
@@ -1,13 +1,28 @@
 import logging
+import zlib
+
+import pandas as pd
 
 from django.contrib.auth.models import Group, User
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 
-from analyst.serializers import GroupSerializer, UserSerializer
+from analyst.export import (EXPORT_FORMATS, UnknownExportColumns,
+                            export_timeseries, filter_assets)
+from analyst.models import Asset
+from analyst.serializers import (AssetSerializer, GroupSerializer,
+                                 UserSerializer)
 
 logger = logging.getLogger(__name__)
 
 
+# Rows serialized at once in the streamed series
+TIMESERIE_BATCH_SIZE = 5000
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """
     API endpoint that allows users to be viewed or edited.
@@ -22,3 +37,130 @@ class GroupViewSet(viewsets.ModelViewSet):
     """
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
+
+
+def get_date_param(request, name):
+    """
+    Date of the query, None if missing or empty
+    """
+    if not (value := request.query_params.get(name)):
+        return None
+
+    try:
+        date = pd.Timestamp(value)
+    except ValueError:
+        date = pd.NaT
+
+    if date is pd.NaT:
+        raise ValidationError({name: f"Invalid date: {value}"})
+
+    return date
+
+
+def get_columns_param(request, default=""):
+    """
+    Comma separated columns of the query, duplicates left out
+    """
+    return list(dict.fromkeys(column for column in request.query_params.get("columns", default).split(",") if column))
+
+
+def stream_timeserie(dataframe, batch_size=TIMESERIE_BATCH_SIZE):
+    """
+    Serialize a dataframe as a JSON object of its columns and rows,
+    yielding the rows by batches so the whole body is never built
+    """
+    yield '{"columns": ["date", %s], "data": [' % ", ".join(f'"{column}"' for column in dataframe.columns)
+
+    for position in range(0, len(dataframe), batch_size):
+        batch = dataframe.iloc[position:position + batch_size]
+        rows = pd.DataFrame(batch.values, columns=batch.columns).assign(date=batch.index.strftime("%Y-%m-%d"))
+
+        yield ("," if position else "") + rows[["date", *batch.columns]].to_json(orient="values")[1:-1]
+
+    yield "]}"
+
+
+class AssetViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint that allows assets and their timeseries to be viewed.
+    """
+    queryset = Asset.objects.all()
+    serializer_class = AssetSerializer
+
+    @action(detail=False)
+    def export(self, request):
+        """
+        Series of the assets filtered by kind, country and index, between
+        the start and end dates included, as a single Arrow IPC stream,
+        CSV or Parquet file of asset_id, date and columns rows
+        """
+        output = request.query_params.get("output", "arrow")
+        start = get_date_param(request, "start")
+        end = get_date_param(request, "end")
+        columns = get_columns_param(request, default="close")
+
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({"output": f"Must be one of {', '.join(EXPORT_FORMATS)}"})
+
+        assets = filter_assets(
+            self.get_queryset(),
+            kind=request.query_params.get("kind"),
+            country=request.query_params.get("country"),
+            index=request.query_params.get("index")
+        )
+
+        try:
+            chunks = export_timeseries(assets, output=output, start=start, end=end, columns=columns)
+        except UnknownExportColumns as exc:
+            raise ValidationError({"columns": f"Unknown columns: {exc}"})
+
+        return StreamingHttpResponse(
+            chunks,
+            content_type=EXPORT_FORMATS[output],
+            headers={"Content-Disposition": f'attachment; filename="timeseries.{output}"'}
+        )
+
+    @action(detail=True)
+    def timeserie(self, request, pk=None):
+        """
+        Rows of the asset timeserie between the start and end dates included,
+        restricted to the comma separated columns if given
+
+        The ETag is built from the stored serie version, so an unchanged
+        serie is answered 304 without being read
+
+        Series stored before versions were kept are read first, legacy
+        blobs get their version when migrated on read
+        """
+        asset = self.get_object()
+        start = get_date_param(request, "start")
+        end = get_date_param(request, "end")
+        columns = get_columns_param(request)
+        dataframe = None
+
+        if (version := asset.timeserie_version) is None:
+            if (dataframe := asset.get_dataframe(start=start, end=end)) is None:
+                raise NotFound("No timeserie stored")
+
+            version = asset.timeserie_version or 0
+
+        query = f"{start}:{end}:{','.join(columns)}".encode()
+        etag = f'"{asset.id}-{version}-{zlib.crc32(query):08x}"'
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return HttpResponseNotModified(headers={"ETag": etag})
+
+        if dataframe is None and (dataframe := asset.get_dataframe(start=start, end=end)) is None:
+            raise NotFound("No timeserie stored")
+
+        if unknown := [column for column in columns if column not in dataframe.columns]:
+            raise ValidationError({"columns": f"Unknown columns: {', '.join(unknown)}"})
+
+        if columns:
+            dataframe = dataframe[columns]
+
+        return StreamingHttpResponse(
+            stream_timeserie(dataframe, batch_size=TIMESERIE_BATCH_SIZE),
+            content_type="application/json",
+            headers={"ETag": etag}
+        )
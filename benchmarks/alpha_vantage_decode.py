@@ -0,0 +1,78 @@
+"""
+Dataframe construction from an Alpha Vantage full history payload
+of 25 years, against the previous transpose and per cell conversion
+
+    python3 benchmarks/alpha_vantage_decode.py
+"""
+import json
+
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from adapters.datareaders.alpha_vantage import AlphaVantageAdapter
+
+
+def build_payload(start="1999-11-01", end="2024-12-31"):
+    """
+    TIME_SERIES_DAILY_ADJUSTED payload, newest day first
+    """
+    index = pd.bdate_range(start, end)[::-1]
+    prices = 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, len(index))))
+
+    return json.dumps({
+        "Meta Data": {"2. Symbol": "BENCH", "4. Output Size": "Full size"},
+        "Time Series (Daily)": {
+            day.strftime("%Y-%m-%d"): {
+                "1. open": f"{price:.4f}",
+                "2. high": f"{price * 1.01:.4f}",
+                "3. low": f"{price * 0.99:.4f}",
+                "4. close": f"{price:.4f}",
+                "5. adjusted close": f"{price:.4f}",
+                "6. volume": "1234567",
+                "7. dividend amount": "0.0000",
+                "8. split coefficient": "1.0"
+            }
+            for day, price in zip(index, prices)
+        }
+    })
+
+
+def previous_build_dataframe(data):
+    df = pd.DataFrame(data).T
+    df.index = pd.to_datetime(df.index)
+
+    df = (
+        df
+        .rename(columns={"5. adjusted close": "adj_close"})
+        .drop(["7. dividend amount", "8. split coefficient"], axis=1)
+        .sort_index()
+        .map(float)
+    )
+
+    return df[["adj_close"]].rename({"adj_close": "close"}, axis=1)
+
+
+def main(number=5):
+    payload = build_payload()
+    data = json.loads(payload)["Time Series (Daily)"]
+
+    json_time = min(repeat(lambda: json.loads(payload), number=number, repeat=3)) / number
+    previous_time = min(repeat(lambda: previous_build_dataframe(data), number=number, repeat=3)) / number
+    build_time = min(repeat(lambda: AlphaVantageAdapter._build_dataframe(data), number=number, repeat=3)) / number
+
+    expected = previous_build_dataframe(data)
+    df = AlphaVantageAdapter._build_dataframe(data)
+
+    assert (df.index.values == expected.index.values).all()
+    assert np.array_equal(df.close.values, expected.close.values)
+
+    print(f"{len(data)} days, payload {len(payload) // 1024} KB")
+    print(f"json decode         {json_time * 1000:8.1f} ms")
+    print(f"previous dataframe  {previous_time * 1000:8.1f} ms")
+    print(f"vectorized          {build_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Parse time and peak memory of the investing.com html parsers
+on the saved pages padded to the size of live pages
+
+    python3 benchmarks/investing_parsing.py
+"""
+import multiprocessing
+import os
+import resource
+
+from timeit import repeat
+
+from adapters.investing import InvestingAdapter
+from adapters.parsing import PARSERS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "..", "tests", "investing", "fixtures")
+
+PAGES = {
+    "indices": "major-indices.html",
+    "components": "components.html",
+    "asset": "vinci.html",
+}
+
+
+def build_page(name, blocks=5000):
+    """
+    Live pages are mostly menus, scripts and ads around the few
+    parsed elements, about 600KB
+    """
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as fd:
+        content = fd.read()
+
+    noise = b"".join(
+        b'<div class="js-item"><a href="/news/%d">News %d</a><span class="time">%d min</span>'
+        b'<script>window.items.push({"id": %d});</script></div>\n' % (i, i, i, i)
+        for i in range(blocks)
+    )
+
+    return content.replace(b"<body>", b"<body>\n" + noise)
+
+
+def extract(adapter, content):
+    soup = adapter.parse_html(content)
+
+    return (
+        adapter.get_page_count(soup),
+        adapter.get_ticker_datas(soup),
+        adapter.parse_extra_list(soup)
+    )
+
+
+def measure_peak(parser, content, queue):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    extract(InvestingAdapter(parser=parser), content)
+
+    queue.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+
+
+def get_peak(parser, content):
+    """
+    Peak resident memory growth in KB, measured in a fresh process
+    """
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=measure_peak, args=(parser, content, queue))
+    process.start()
+    peak = queue.get()
+    process.join()
+
+    return peak
+
+
+def main(number=5):
+    for page_type, name in PAGES.items():
+        content = build_page(name)
+
+        print(f"{page_type} page, {len(content) // 1024} KB")
+
+        for parser in PARSERS:
+            adapter = InvestingAdapter(parser=parser)
+            parse_time = min(repeat(lambda: extract(adapter, content), number=number, repeat=3)) / number
+
+            print(f"  {parser:12s} {parse_time * 1000:8.1f} ms {get_peak(parser, content) / 1024:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
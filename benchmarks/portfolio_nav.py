@@ -0,0 +1,78 @@
+"""
+Valuation of a portfolio of 1000 assets over 30 years, with different
+listing dates, for each rebalancing frequency, against a day by day
+valuation of the holdings
+
+    python3 benchmarks/portfolio_nav.py
+"""
+from time import perf_counter
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from analyst.analytics.matrix import fill_forward
+from analyst.analytics.portfolio import (REBALANCE_FREQUENCIES, compute_nav,
+                                         get_rebalance_mask)
+
+
+def build_prices(count=1000, start="1991-01-01", end="2020-12-31"):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(start, end)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), count)), axis=0))
+
+    # The matrix dates being the union of the series dates, one is listed first
+    for i, listed_at in enumerate(rng.integers(0, len(dates) // 2, count)):
+        prices[:listed_at * (i > 0), i] = np.nan
+
+    return dates, fill_forward(prices)
+
+
+def day_by_day(prices, weights, rebalance, initial=100.0):
+    nav = np.empty(len(prices))
+    units = np.zeros(prices.shape[1])
+    listed_before = np.zeros(prices.shape[1], dtype=bool)
+    value = initial
+
+    for t, row in enumerate(prices):
+        listed = np.isfinite(row)
+
+        if t:
+            value = np.where(listed, units * np.nan_to_num(row), 0).sum()
+
+        nav[t] = value
+
+        if rebalance[t] or (listed & ~listed_before).any():
+            target = np.where(listed, weights, 0.0)
+            target /= target.sum()
+            units = np.where(listed, target * value / np.where(listed, row, 1.0), 0.0)
+
+        listed_before = listed
+
+    return nav
+
+
+def main(number=5):
+    dates, prices = build_prices()
+    weights = np.random.default_rng(1).random(prices.shape[1])
+
+    print(f"{prices.shape[1]} assets, {len(dates)} dates")
+
+    for rebalance in REBALANCE_FREQUENCIES:
+        mask = get_rebalance_mask(dates, rebalance)
+        nav_time = min(repeat(lambda: compute_nav(prices, weights, mask), number=number, repeat=3)) / number
+
+        print(f"  {str(rebalance):10s} {nav_time * 1000:8.1f} ms")
+
+    mask = get_rebalance_mask(dates, "monthly")
+    started_at = perf_counter()
+    expected = day_by_day(prices, weights, mask)
+    loop_time = perf_counter() - started_at
+
+    assert np.allclose(compute_nav(prices, weights, mask), expected)
+
+    print(f"  day by day (monthly) {loop_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Align 500 daily series of 30 years with different histories
+in a price matrix, against a pandas outer join
+
+    python3 benchmarks/price_matrix.py
+"""
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from analyst.analytics.matrix import align
+
+
+def build_series(count=500, start="1990-01-01", end="2020-12-31"):
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(start, end)
+    series = {}
+
+    for i in range(count):
+        # Different listing dates and a few missing days
+        dates = index[rng.integers(0, len(index) // 2):]
+        dates = dates[rng.random(len(dates)) > 0.01]
+        series[i] = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))), index=dates)
+
+    return series
+
+
+def pandas_join(series):
+    return pd.concat(series, axis=1, join="outer", sort=True).ffill()
+
+
+def main(number=5):
+    series = build_series()
+
+    align_time = min(repeat(lambda: align(series), number=number, repeat=3)) / number
+    float32_time = min(repeat(lambda: align(series, dtype="float32"), number=number, repeat=3)) / number
+    pandas_time = min(repeat(lambda: pandas_join(series), number=number, repeat=3)) / number
+
+    matrix = align(series)
+    expected = pandas_join(series)
+
+    assert np.allclose(matrix.values, expected.values, equal_nan=True)
+
+    print(f"{len(series)} series, matrix shape {matrix.shape}")
+    print(f"align (float64)    {align_time * 1000:8.1f} ms")
+    print(f"align (float32)    {float32_time * 1000:8.1f} ms")
+    print(f"pandas outer join  {pandas_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Rolling analytics of 500 assets over 30 years, with different listing
+dates, computed at once on the whole series, on the trailing rows of
+a single new day, and asset by asset with pandas rolling windows
+
+    PYTHONPATH=. python3 benchmarks/rolling_analytics.py
+"""
+from time import perf_counter
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from analyst.analytics.rolling import (BETA_WINDOW, MOVING_AVERAGE_WINDOWS,
+                                       TAIL_ROWS, VOLATILITY_WINDOW,
+                                       compute_indicators, stack)
+
+
+def build_prices(count=500, start="1991-01-01", end="2020-12-31"):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(start, end)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), count)), axis=0))
+    benchmark = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+
+    columns = [prices[listed_at:, i] for i, listed_at in enumerate(rng.integers(0, len(dates) // 2, count))]
+
+    return stack(columns), stack([benchmark[-len(column):] for column in columns])
+
+
+def asset_by_asset(prices, benchmark):
+    indicators = []
+
+    for i in range(prices.shape[1]):
+        closes = pd.Series(prices[:, i]).dropna()
+        returns = closes.pct_change()
+        benchmark_returns = pd.Series(benchmark[-len(closes):, i], index=closes.index).pct_change()
+
+        indicators.append(pd.DataFrame({
+            "return": returns,
+            "volatility": returns.rolling(VOLATILITY_WINDOW).std() * np.sqrt(252),
+            **{f"ma_{window}": closes.rolling(window).mean() for window in MOVING_AVERAGE_WINDOWS},
+            "drawdown": closes / closes.cummax() - 1,
+            "beta": (
+                returns.rolling(BETA_WINDOW).cov(benchmark_returns) / benchmark_returns.rolling(BETA_WINDOW).var()
+            ),
+        }))
+
+    return indicators
+
+
+def main(number=3):
+    prices, benchmark = build_prices()
+    peaks = np.fmax.reduce(prices[:-1], axis=0)
+
+    print(f"{prices.shape[1]} assets, {len(prices)} rows")
+
+    full_time = min(repeat(lambda: compute_indicators(prices, benchmark), number=number, repeat=3)) / number
+    tail_time = min(repeat(
+        lambda: compute_indicators(prices[-TAIL_ROWS - 1:], benchmark[-TAIL_ROWS - 1:], peaks),
+        number=number * 100,
+        repeat=3
+    )) / (number * 100)
+
+    started_at = perf_counter()
+    expected = asset_by_asset(prices, benchmark)
+    loop_time = perf_counter() - started_at
+
+    full = compute_indicators(prices, benchmark)
+    tail = compute_indicators(prices[-TAIL_ROWS - 1:], benchmark[-TAIL_ROWS - 1:], peaks)
+
+    for column, values in full.items():
+        last = np.array([dataframe[column].iloc[-1] for dataframe in expected])
+
+        assert np.allclose(values[-1], last, equal_nan=True), column
+        assert np.allclose(tail[column][-1], last, equal_nan=True), column
+
+    print(f"Full recompute       : {full_time * 1000:8.1f} ms")
+    print(f"Incremental (1 day)  : {tail_time * 1000:8.1f} ms")
+    print(f"Asset by asset       : {loop_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
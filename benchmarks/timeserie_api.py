@@ -0,0 +1,116 @@
+"""
+Latency percentiles of the asset timeserie endpoint under concurrent
+requests of the Django test client, on a test database and the
+configured Redis, full series, one year ranges and revalidations
+
+    TEST=true python3 benchmarks/timeserie_api.py
+"""
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import django
+import numpy as np
+import pandas as pd
+
+
+def create_assets(count, start="1999-01-01", end="2024-12-31"):
+    from analyst.models import Asset
+
+    index = pd.bdate_range(start, end)
+    assets = []
+
+    for i in range(count):
+        asset = Asset.objects.create(name=f"bench_{i}", kind="S", ticker=f"BENCH{i}")
+        asset.store_dataframe(pd.DataFrame(
+            {"close": 100 * np.exp(np.cumsum(np.random.default_rng(i).normal(0, 0.01, len(index))))},
+            index=index
+        ))
+        assets.append(asset)
+
+    return assets
+
+
+def get_client():
+    from django.contrib.auth.models import User
+    from django.test import Client
+
+    client = Client()
+    client.force_login(User.objects.get(username="bench"))
+
+    return client
+
+
+def measure(urls, etags=None, workers=8):
+    """
+    Latencies in ms of the urls requested by concurrent clients,
+    the streamed body being read
+    """
+    headers = [{"HTTP_IF_NONE_MATCH": etags[url]} if etags else {} for url in urls]
+
+    def run(client, worker):
+        latencies = []
+
+        for url, url_headers in zip(urls[worker::workers], headers[worker::workers]):
+            started_at = perf_counter()
+            response = client.get(url, **url_headers)
+            b"".join(response.streaming_content) if response.streaming else response.content
+
+            assert response.status_code == (304 if etags else 200)
+
+            latencies.append((perf_counter() - started_at) * 1000)
+
+        return latencies
+
+    clients = [get_client() for _ in range(workers)]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return np.concatenate(list(executor.map(run, clients, range(workers))))
+
+
+def main(assets=20, requests=400, workers=8):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "analyst.settings")
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    from adapters import timeseries
+    from analyst.models import Asset
+
+    setup_test_environment(debug=False)
+    database = connection.creation.create_test_db(verbosity=0)
+    ids = []
+
+    try:
+        User.objects.create_user("bench", password="bench")
+        ids = [asset.id for asset in create_assets(assets)]
+
+        scenarios = {
+            "full": [f"/api/assets/{ids[i % assets]}/timeserie" for i in range(requests)],
+            "year range": [f"/api/assets/{ids[i % assets]}/timeserie?start=2024-01-01" for i in range(requests)],
+        }
+        etags = {url: get_client().get(url)["ETag"] for url in set(scenarios["year range"])}
+
+        print(f"{assets} series of {len(pd.bdate_range('1999-01-01', '2024-12-31'))} rows, {workers} clients")
+
+        for name, urls in [*scenarios.items(), ("not modified", scenarios["year range"])]:
+            started_at = perf_counter()
+            latencies = measure(urls, etags=etags if name == "not modified" else None, workers=workers)
+            elapsed = perf_counter() - started_at
+
+            print(
+                f"  {name:14s} p50 {np.percentile(latencies, 50):7.1f} ms  "
+                f"p99 {np.percentile(latencies, 99):7.1f} ms  {len(urls) / elapsed:7.0f} req/s"
+            )
+    finally:
+        for asset_id in ids:
+            timeseries.delete(Asset.get_timeserie_label(asset_id))
+
+        connection.creation.destroy_test_db(database, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
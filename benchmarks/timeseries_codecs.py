@@ -0,0 +1,51 @@
+"""
+Compression ratio and throughput of the timeserie codecs
+on a 50 years daily serie
+
+    python3 benchmarks/timeseries_codecs.py
+"""
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from adapters.timeseries import codecs, serializers
+
+
+def build_dataframe(start="1970-01-01", end="2020-12-31"):
+    index = pd.bdate_range(start, end)
+    returns = np.random.default_rng(0).normal(0, 0.01, len(index))
+
+    # Prices are quoted with 2 decimals
+    return pd.DataFrame(
+        {"close": np.round(100 * np.exp(np.cumsum(returns)), 2)},
+        index=index
+    )
+
+
+def bench(data, codec, number=20):
+    blob = codecs.encode(data, codec)
+
+    encode_time = min(repeat(lambda: codecs.encode(data, codec), number=number, repeat=3)) / number
+    decode_time = min(repeat(lambda: codecs.decode(blob), number=number, repeat=3)) / number
+
+    return len(blob), encode_time, decode_time
+
+
+def main():
+    data = serializers.dumps(build_dataframe())
+    megabytes = len(data) / 2 ** 20
+
+    print(f"{len(data)} bytes")
+    print(f"{'codec':6s} {'bytes':>8s} {'ratio':>6s} {'encode (MB/s)':>14s} {'decode (MB/s)':>14s}")
+
+    for name in codecs.CODECS:
+        size, encode_time, decode_time = bench(data, codecs.get_codec(name))
+        print(
+            f"{name:6s} {size:8d} {len(data) / size:6.2f} "
+            f"{megabytes / encode_time:14.0f} {megabytes / decode_time:14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Compare the legacy JSON timeserie format with the binary records one
+on a 50 years daily serie
+
+    python3 benchmarks/timeseries_serialization.py
+"""
+from timeit import repeat
+
+import numpy as np
+import pandas as pd
+
+from adapters.timeseries import serializers
+
+
+def build_dataframe(start="1970-01-01", end="2020-12-31"):
+    index = pd.bdate_range(start, end)
+
+    return pd.DataFrame(
+        {"close": np.random.default_rng(0).random(len(index)) * 100},
+        index=index
+    )
+
+
+def bench(dataframe, format, number=20):
+    data = serializers.dumps(dataframe, format=format)
+
+    dump_time = min(repeat(lambda: serializers.dumps(dataframe, format=format), number=number, repeat=3)) / number
+    load_time = min(repeat(lambda: serializers.loads(data), number=number, repeat=3)) / number
+
+    return len(data), dump_time, load_time
+
+
+def main():
+    dataframe = build_dataframe()
+
+    print(f"{len(dataframe)} rows")
+    print(f"{'format':10s} {'bytes':>10s} {'dump (ms)':>10s} {'load (ms)':>10s}")
+
+    for name, format in (("json", serializers.JSON_FORMAT), ("records", serializers.RECORDS_FORMAT)):
+        size, dump_time, load_time = bench(dataframe, format)
+        print(f"{name:10s} {size:10d} {dump_time * 1000:10.2f} {load_time * 1000:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyst.analytics.indices import compute_index_returns
+from analyst.models import Asset, Index
+
+
+def test_cap_weighted_returns():
+    prices = np.array([[10.0, 20.0], [11.0, 20.0], [11.0, 10.0]])
+    shares = np.array([2.0, 1.0])
+    caps = (prices * shares).sum(axis=1)
+
+    assert np.allclose(compute_index_returns(prices, shares=shares), [0, caps[1] / caps[0] - 1, caps[2] / caps[1] - 1])
+
+
+def test_equal_weighted_returns():
+    prices = np.array([[10.0, 20.0], [11.0, 20.0], [11.0, 10.0]])
+
+    assert np.allclose(compute_index_returns(prices, method="equal"), [0, 0.05, -0.25])
+
+    with pytest.raises(ValueError):
+        compute_index_returns(prices, method="price")
+
+
+def test_component_listed_later():
+    prices = np.array([[10.0, np.nan], [10.0, 50.0], [10.0, 100.0], [20.0, 100.0]])
+
+    # No jump on listing, weighted from the next day
+    assert np.allclose(compute_index_returns(prices, shares=np.array([1.0, 1.0])), [0, 0, 50 / 60, 10 / 110])
+    assert np.allclose(compute_index_returns(prices, method="equal"), [0, 0, 0.5, 0.5])
+
+
+@pytest.fixture
+def index(clean_timeseries):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    shares = [100, 300, 50]
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), len(shares))), axis=0))
+    prices[:100, 2] = np.nan
+
+    components = []
+
+    for i, count in enumerate(shares):
+        asset = Asset.objects.create(name=f"c{i}", kind="S", extra_data={"shares": count})
+        asset.store_dataframe(pd.DataFrame({"close": prices[:250, i]}, index=dates[:250]).dropna())
+        components.append(asset)
+
+    official = Asset.objects.create(name="official", kind="I")
+    official.store_dataframe(pd.DataFrame({"close": np.full(250, 1000.0)}, index=dates[:250]))
+
+    index = Index.objects.create(name="index", asset=official)
+    index.components.set(components)
+
+    return index, dates, prices
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("method", ["cap", "equal"])
+def test_build_synthetic_incrementally(index, method):
+    index, dates, prices = index
+
+    assert index.build_synthetic(method) == 250
+    assert index.get_synthetic(method)["close"].iloc[0] == 1000.0
+    assert index.build_synthetic(method) == 0
+
+    for i, asset in enumerate(index.components.all()):
+        asset.append_dataframe(pd.DataFrame({"close": prices[250:, i]}, index=dates[250:]))
+
+    assert index.build_synthetic(method) == 50
+
+    incremental = index.get_synthetic(method)
+
+    assert index.build_synthetic(method, full=True) == 300
+    assert np.allclose(incremental["close"].values, index.get_synthetic(method)["close"].values)
+
+
+@pytest.mark.django_db
+def test_tracking_error(index):
+    index, dates, prices = index
+    official = index.asset
+    shares = np.array([100, 300, 50])
+
+    # Official index computed with the same shares, with a 1% jump
+    levels = 1000 * np.cumprod(1 + compute_index_returns(prices[:250], shares=shares))
+    levels[200:] *= 1.01
+    official.store_dataframe(pd.DataFrame({"close": levels}, index=dates[:250]))
+
+    index.build_synthetic("cap")
+    tracking = index.get_tracking_error("cap")
+
+    assert tracking["dates"] == 250
+    assert tracking["correlation"] > 0.99
+    assert 0 < tracking["tracking_error"] < 0.01 * np.sqrt(252)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyst.analytics.matrix import align, fill_values
+
+
+@pytest.fixture
+def series():
+    return {
+        1: pd.Series([1.0, 2.0, 3.0], index=pd.to_datetime(["2020-01-01", "2020-01-02", "2020-01-03"])),
+        2: pd.Series([10.0, 30.0], index=pd.to_datetime(["2020-01-02", "2020-01-06"]))
+    }
+
+
+def test_align(series):
+    matrix = align(series, fill=None)
+
+    assert matrix.asset_ids == [1, 2]
+    assert list(matrix.dates.strftime("%d")) == ["01", "02", "03", "06"]
+    assert np.allclose(
+        matrix.values,
+        [[1, np.nan], [2, 10], [3, np.nan], [np.nan, 30]],
+        equal_nan=True
+    )
+
+    assert not matrix.values.flags.writeable
+
+
+def test_align_forward_filled(series):
+    matrix = align(series, dtype="float32")
+
+    assert matrix.values.dtype == np.float32
+    assert np.allclose(
+        matrix.values,
+        [[1, np.nan], [2, 10], [3, 10], [3, 30]],
+        equal_nan=True
+    )
+    assert np.allclose(matrix.to_dataframe().values, pd.concat(series, axis=1, sort=True).ffill().values, equal_nan=True)
+
+
+def test_slice(series):
+    matrix = align(series).slice(start="2020-01-02", end="2020-01-03")
+
+    assert matrix.shape == (2, 2)
+    assert np.allclose(matrix.get_column(2), [10, 10])
+
+
+@pytest.mark.parametrize("fill, expected", [
+    ("bfill", [[1, 10], [2, 10], [3, 30], [np.nan, 30]]),
+    ("zero", [[1, 0], [2, 10], [3, 0], [0, 30]])
+])
+def test_fill_policies(series, fill, expected):
+    values = align(series, fill=None).values
+
+    assert np.allclose(fill_values(values, fill=fill), expected, equal_nan=True)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyst.analytics.portfolio import (compute_nav, get_rebalance_mask,
+                                         nav_cache)
+from analyst.models import Asset, Portfolio
+
+
+def simulate(prices, weights, rebalance, initial=100.0):
+    """
+    Day by day holdings of the portfolio
+    """
+    nav = np.empty(len(prices))
+    units = np.zeros(prices.shape[1])
+    listed_before = np.zeros(prices.shape[1], dtype=bool)
+    value = initial
+
+    for t, row in enumerate(prices):
+        listed = np.isfinite(row)
+
+        if t:
+            value = np.where(listed, units * np.nan_to_num(row), 0).sum()
+
+        nav[t] = value
+
+        if rebalance[t] or (listed & ~listed_before).any():
+            target = np.where(listed, weights, 0.0)
+            target /= target.sum()
+            units = np.where(listed, target * value / np.where(listed, row, 1.0), 0.0)
+
+        listed_before = listed
+
+    return nav
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    values = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (500, 6)), axis=0))
+
+    # Listed later
+    values[:40, 2] = np.nan
+    values[:300, 5] = np.nan
+
+    return values
+
+
+def test_rebalance_mask():
+    dates = pd.bdate_range("2020-01-28", "2020-03-04")
+
+    assert list(dates[get_rebalance_mask(dates, "monthly")].strftime("%m-%d")) == ["01-28", "02-03", "03-02"]
+    assert get_rebalance_mask(dates).sum() == 1
+
+    with pytest.raises(ValueError):
+        get_rebalance_mask(dates, "hourly")
+
+
+def test_buy_and_hold():
+    prices = np.array([[10.0, 100.0], [20.0, 100.0], [20.0, 50.0]])
+
+    assert np.allclose(compute_nav(prices, np.array([1.0, 1.0]), get_rebalance_mask(range(3))), [100, 150, 125])
+
+
+@pytest.mark.parametrize("rebalance", [None, "weekly", "monthly", "daily"])
+def test_compute_nav(prices, rebalance):
+    dates = pd.bdate_range("2020-01-01", periods=len(prices))
+    weights = np.array([0.1, 0.3, 0.2, 0.1, 0.2, 0.1])
+    mask = get_rebalance_mask(dates, rebalance)
+
+    assert np.allclose(compute_nav(prices, weights, mask), simulate(prices, weights, mask))
+
+
+@pytest.mark.django_db
+def test_portfolio_valuation(clean_timeseries):
+    index = pd.bdate_range("2020-01-01", periods=100)
+    assets = [Asset.objects.create(name=name) for name in "abc"]
+
+    for i, asset in enumerate(assets):
+        asset.store_dataframe(pd.DataFrame({"close": np.linspace(10, 10 + 10 * i, len(index))}, index=index))
+
+    portfolio = Portfolio.objects.create(name="p", weights={str(assets[0].id): 1, str(assets[1].id): 3})
+    portfolio.assets.set(assets)
+
+    valuation = portfolio.valuation(rebalance="monthly")
+    hits = nav_cache.hits
+
+    assert list(valuation.columns) == ["nav", "return"]
+    assert valuation["nav"].iloc[0] == 100.0
+    assert valuation["return"].iloc[0] == 0.0
+    assert np.isclose(valuation["nav"].iloc[-1], 100 * (0.25 + 0.75 * 2), rtol=0.05)
+
+    assert portfolio.valuation(rebalance="monthly").equals(valuation)
+    assert nav_cache.hits == hits + 1
+
+    # Unweighted c left out, equally weighted when no weights are set
+    assets[2].append_dataframe(pd.DataFrame({"close": [40.0]}, index=[index[-1] + pd.offsets.BDay(1)]))
+
+    assert portfolio.valuation(rebalance="monthly").equals(valuation)
+
+    portfolio.weights = {}
+
+    assert len(portfolio.valuation(rebalance="monthly")) == 101
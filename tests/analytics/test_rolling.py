@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyst.analytics.rolling import (ANALYTICS_COLUMNS, compute_indicators,
+                                       rolling_sum, stack)
+from analyst.models import Asset, Index
+
+
+def test_rolling_sum():
+    values = np.array([[1.0, np.nan], [2.0, 1.0], [3.0, 2.0], [4.0, 3.0]])
+
+    assert np.allclose(rolling_sum(values, 2), [[np.nan, np.nan], [3, np.nan], [5, 3], [7, 5]], equal_nan=True)
+
+
+def test_indicators_match_pandas():
+    rng = np.random.default_rng(0)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (300, 2)), axis=0))
+    benchmark = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+
+    indicators = compute_indicators(prices, benchmark=np.column_stack([benchmark, benchmark]))
+
+    closes = pd.Series(prices[:, 0])
+    returns = closes.pct_change()
+    benchmark_returns = pd.Series(benchmark).pct_change()
+
+    expected = {
+        "return": returns,
+        "volatility": returns.rolling(20).std() * np.sqrt(252),
+        "ma_50": closes.rolling(50).mean(),
+        "ma_200": closes.rolling(200).mean(),
+        "drawdown": closes / closes.cummax() - 1,
+        "beta": returns.rolling(60).cov(benchmark_returns) / benchmark_returns.rolling(60).var(),
+    }
+
+    for column in ANALYTICS_COLUMNS:
+        assert np.allclose(indicators[column][:, 0], expected[column].values, equal_nan=True), column
+
+
+def test_stack_aligns_last_values():
+    values = stack([np.array([1.0, 2.0, 3.0]), np.array([4.0])])
+
+    assert np.allclose(values, [[1, np.nan], [2, np.nan], [3, 4]], equal_nan=True)
+
+
+@pytest.fixture
+def index(clean_timeseries):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=600)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), 3)), axis=0))
+
+    official = Asset.objects.create(name="official", kind="I")
+    official.store_dataframe(pd.DataFrame({"close": prices[:500, 0]}, index=dates[:500]))
+
+    components = []
+
+    for i in (1, 2):
+        asset = Asset.objects.create(name=f"c{i}", kind="S")
+        # The second component is listed later, with fewer rows
+        asset.store_dataframe(pd.DataFrame({"close": prices[i * 100:500, i]}, index=dates[i * 100:500]))
+        components.append(asset)
+
+    index = Index.objects.create(name="index", asset=official)
+    index.components.set(components)
+    Asset.objects.all().update_analytics(full=True)
+
+    return index, dates, prices
+
+
+@pytest.mark.django_db
+def test_update_analytics_incrementally(index):
+    index, dates, prices = index
+    official = index.asset
+    components = list(index.components.order_by("id"))
+
+    assert len(components[0].get_analytics()) == 400
+    assert components[0].get_analytics()["beta"].notna().any()
+    assert Asset.objects.all().update_analytics() == 0
+
+    for i, asset in enumerate(components, 1):
+        asset.append_dataframe(pd.DataFrame({"close": prices[500:503, i]}, index=dates[500:503]))
+
+    # Waiting for the index, less than a week late
+    assert components[0].get_analytics().index[-1] == dates[499]
+
+    official.append_dataframe(pd.DataFrame({"close": prices[500:503, 0]}, index=dates[500:503]))
+
+    assert components[0].get_analytics().index[-1] == dates[502]
+
+    for i, asset in enumerate([official, *components]):
+        asset.append_dataframe(pd.DataFrame({"close": prices[503:550, i]}, index=dates[503:550]))
+
+    incremental = {asset.id: asset.get_analytics() for asset in [official, *components]}
+
+    assert Asset.objects.all().update_analytics() == 0
+    assert_rebuilt_equal([official, *components], incremental)
+
+    # Forward filling the index, more than a week late
+    for i, asset in enumerate(components, 1):
+        asset.append_dataframe(pd.DataFrame({"close": prices[550:, i]}, index=dates[550:]))
+
+    assert components[0].get_analytics().index[-1] == dates[-1]
+
+    # Computed again with the index values once they come
+    official.append_dataframe(pd.DataFrame({"close": prices[550:, 0]}, index=dates[550:]))
+
+    incremental = {asset.id: asset.get_analytics() for asset in [official, *components]}
+
+    assert_rebuilt_equal([official, *components], incremental)
+
+
+@pytest.mark.django_db
+def test_analytics_failure_doesnt_fail_the_write(index, monkeypatch):
+    index, dates, prices = index
+    asset = index.components.order_by("id").first()
+    new_values = pd.DataFrame({"close": prices[500:, 1]}, index=dates[500:])
+
+    def fail(*args, **kwargs):
+        raise ValueError("analytics failure")
+
+    monkeypatch.setattr(Asset, "update_analytics", fail)
+
+    assert asset.append_dataframe(new_values) == 100
+    assert asset.get_analytics().index[-1] == dates[499]
+
+    monkeypatch.undo()
+
+    # Retried, nothing is appended but the analytics catch up
+    assert asset.append_dataframe(new_values) == 0
+    assert asset.get_analytics().index[-1] == dates[-1]
+
+
+def assert_rebuilt_equal(assets, incremental):
+    Asset.objects.filter(id__in=[asset.id for asset in assets]).update_analytics(full=True)
+
+    for asset in assets:
+        expected = asset.get_analytics()
+
+        assert incremental[asset.id].index.equals(expected.index)
+        assert np.allclose(incremental[asset.id].values, expected.values, equal_nan=True)
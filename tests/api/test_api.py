@@ -5,4 +5,4 @@ import pytest
 def test_api_root(admin_client, admin_user):
     response = admin_client.get("/api/")
 
-    assert len(response.json().keys()) == 2
+    assert len(response.json().keys()) == 3
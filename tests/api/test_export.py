@@ -0,0 +1,100 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from django.core.management import CommandError, call_command
+
+from analyst.models import Asset, Index
+
+
+@pytest.fixture
+def assets(clean_timeseries):
+    index = pd.bdate_range("2019-01-01", "2020-12-31")
+    assets = [
+        Asset.objects.create(name="a", kind="S", country="France"),
+        Asset.objects.create(name="b", kind="S", country="United States"),
+        Asset.objects.create(name="c", kind="F"),
+        Asset.objects.create(name="d", kind="S", country="France")
+    ]
+
+    for i, asset in enumerate(assets[:3]):
+        asset.store_dataframe(pd.DataFrame({"close": np.arange(len(index), dtype=float) + i * 1000}, index=index))
+
+    Index.objects.create(name="cac").components.set([assets[0], assets[3]])
+
+    return assets
+
+
+def export(admin_client, **params):
+    response = admin_client.get("/api/assets/export", params)
+
+    assert response.status_code == 200
+
+    return list(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_export_arrow(admin_client, assets, monkeypatch):
+    monkeypatch.setattr("analyst.export.EXPORT_BATCH_SIZE", 1)
+
+    chunks = export(admin_client)
+    table = pa.ipc.open_stream(b"".join(chunks)).read_all()
+    df = table.to_pandas()
+
+    # A chunk by asset then the end of stream
+    assert len(chunks) == 4
+    assert table.schema.names == ["asset_id", "date", "close"]
+    assert sorted(set(df.asset_id)) == [asset.id for asset in assets[:3]]
+    assert len(df) == 3 * len(pd.bdate_range("2019-01-01", "2020-12-31"))
+    assert df[df.asset_id == assets[1].id].close.iloc[-1] == 1000.0 + len(pd.bdate_range("2019-01-01", "2020-12-31")) - 1
+
+
+@pytest.mark.django_db
+def test_export_filters(admin_client, assets):
+    df = pd.read_csv(io.BytesIO(b"".join(export(
+        admin_client, output="csv", kind="S", country="France", start="2020-12-01", end="2020-12-31"
+    ))))
+
+    assert list(df.columns) == ["asset_id", "date", "close"]
+    assert set(df.asset_id) == {assets[0].id}
+    assert list(df.date) == [day.strftime("%Y-%m-%d") for day in pd.bdate_range("2020-12-01", "2020-12-31")]
+
+    df = pq.read_table(io.BytesIO(b"".join(export(admin_client, output="parquet", index="cac")))).to_pandas()
+
+    assert set(df.asset_id) == {assets[0].id}
+
+    empty = pa.ipc.open_stream(b"".join(export(admin_client, kind="I"))).read_all()
+
+    assert empty.num_rows == 0
+    assert admin_client.get("/api/assets/export", {"output": "xls"}).status_code == 400
+    assert admin_client.get("/api/assets/export", {"start": "nope"}).status_code == 400
+
+    for output in ("arrow", "csv", "parquet"):
+        response = admin_client.get("/api/assets/export", {"output": output, "columns": "close,foo"})
+
+        assert response.status_code == 400
+        assert "foo" in response.json()["columns"]
+
+    # Empty bounds are ignored
+    df = pd.read_csv(io.BytesIO(b"".join(export(admin_client, output="csv", kind="F", start="", end=""))))
+
+    assert len(df) == len(pd.bdate_range("2019-01-01", "2020-12-31"))
+
+
+@pytest.mark.django_db
+def test_export_command(assets, tmp_path):
+    path = tmp_path / "export.parquet"
+
+    call_command("export_timeseries", str(path), output="parquet", kind="S", start="2020-01-01")
+
+    df = pq.read_table(path).to_pandas()
+
+    assert set(df.asset_id) == {assets[0].id, assets[1].id}
+    assert df.date.min() == pd.Timestamp("2020-01-01")
+
+    with pytest.raises(CommandError):
+        call_command("export_timeseries", str(path), columns="close,foo")
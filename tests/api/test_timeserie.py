@@ -0,0 +1,116 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from adapters import redis as redis_adapter
+from analyst.models import Asset
+
+
+@pytest.fixture
+def asset(clean_timeseries):
+    asset = Asset.objects.create(name="a", kind="S", ticker="AAA")
+    asset.store_dataframe(pd.DataFrame(
+        {"close": np.arange(300, dtype=float), "volume": np.arange(300, dtype=float) * 10},
+        index=pd.bdate_range("2020-12-01", periods=300)
+    ))
+
+    return asset
+
+
+def get_json(response):
+    return json.loads(b"".join(response.streaming_content))
+
+
+@pytest.mark.django_db
+def test_timeserie(admin_client, asset):
+    response = admin_client.get(f"/api/assets/{asset.id}/timeserie")
+    data = get_json(response)
+
+    assert response.status_code == 200
+    assert response["ETag"]
+    assert data["columns"] == ["date", "close", "volume"]
+    assert len(data["data"]) == 300
+    assert data["data"][0] == ["2020-12-01", 0.0, 0.0]
+    assert data["data"][-1] == ["2022-01-24", 299.0, 2990.0]
+
+
+@pytest.mark.django_db
+def test_timeserie_range_and_columns(admin_client, asset, monkeypatch):
+    monkeypatch.setattr("analyst.views.TIMESERIE_BATCH_SIZE", 7)
+
+    response = admin_client.get(f"/api/assets/{asset.id}/timeserie?start=2021-01-01&end=2021-01-31&columns=volume")
+    data = get_json(response)
+
+    assert data["columns"] == ["date", "volume"]
+    assert [row[0] for row in data["data"]] == [
+        day.strftime("%Y-%m-%d") for day in pd.bdate_range("2021-01-01", "2021-01-31")
+    ]
+
+
+@pytest.mark.django_db
+def test_timeserie_duplicated_columns(admin_client, asset):
+    data = get_json(admin_client.get(f"/api/assets/{asset.id}/timeserie?columns=volume,close,volume"))
+
+    assert data["columns"] == ["date", "volume", "close"]
+    assert data["data"][1] == ["2020-12-02", 10.0, 1.0]
+
+
+@pytest.mark.django_db
+def test_timeserie_not_modified(admin_client, asset, monkeypatch):
+    url = f"/api/assets/{asset.id}/timeserie?start=2021-01-01"
+    etag = admin_client.get(url)["ETag"]
+
+    monkeypatch.setattr(Asset, "get_dataframe", lambda *args, **kwargs: pytest.fail("serie read"))
+
+    response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+
+    monkeypatch.undo()
+
+    assert admin_client.get(f"{url}&columns=close")["ETag"] != etag
+
+    asset.append_dataframe(pd.DataFrame({"close": [300.0], "volume": [3000.0]}, index=[pd.Timestamp("2022-01-26")]))
+
+    response = admin_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    assert len(get_json(response)["data"]) == 278
+
+
+@pytest.mark.django_db
+def test_timeserie_errors(admin_client, asset):
+    empty = Asset.objects.create(name="b")
+
+    assert admin_client.get(f"/api/assets/{asset.id}/timeserie?start=nope").status_code == 400
+    assert admin_client.get(f"/api/assets/{asset.id}/timeserie?end=NaT").status_code == 400
+    assert len(get_json(admin_client.get(f"/api/assets/{asset.id}/timeserie?start=&end="))["data"]) == 300
+    assert admin_client.get(f"/api/assets/{asset.id}/timeserie?columns=open").status_code == 400
+    assert admin_client.get(f"/api/assets/{empty.id}/timeserie").status_code == 404
+    assert admin_client.get("/api/assets/0/timeserie").status_code == 404
+
+
+@pytest.mark.django_db
+def test_timeserie_legacy_blob(admin_client, clean_timeseries):
+    asset = Asset.objects.create(name="legacy", kind="S")
+    dataframe = pd.DataFrame({"close": np.arange(10, dtype=float)}, index=pd.bdate_range("2021-01-01", periods=10))
+    redis_adapter.set(asset.timeserie_label, dataframe.to_json())
+
+    assert asset.timeserie_version is None
+
+    response = admin_client.get(f"/api/assets/{asset.id}/timeserie")
+
+    assert response.status_code == 200
+    assert len(get_json(response)["data"]) == 10
+    assert admin_client.get(
+        f"/api/assets/{asset.id}/timeserie", HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 304
+
+    # Chunked without a version, as recompressed before versions were kept
+    redis_adapter.delete(f"{asset.timeserie_label}:version")
+
+    assert admin_client.get(f"/api/assets/{asset.id}/timeserie").status_code == 200
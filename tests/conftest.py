@@ -2,6 +2,7 @@ from django.contrib.auth.models import User
 from pytest import fixture, mark
 
 from adapters import redis as redis_adapter
+from adapters import timeseries
 
 
 @fixture(scope="session")
@@ -13,6 +14,18 @@ def redis():
     redis_adapter.delete_all()
 
 
+@fixture
+def clean_timeseries(redis):
+    """
+    Drop the series stored by a test, the versions starting over
+    and the asset ids being reused by the next tests
+    """
+    yield
+
+    redis_adapter.delete_all()
+    timeseries.cache.clear()
+
+
 @fixture
 @mark.django_db
 def admin_user():
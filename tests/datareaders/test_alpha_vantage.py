@@ -0,0 +1,102 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from adapters.datareaders.alpha_vantage import AlphaVantageAdapter
+from adapters.datareaders.exceptions import ProviderUnavailable, SymbolNotFound
+from adapters.ratelimit import TokenBucket
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class FakeResponse(object):
+    ok = True
+    reason = "OK"
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class FailedResponse(FakeResponse):
+    ok = False
+    reason = "Bad Gateway"
+
+
+class FakeSession(object):
+    def __init__(self, payload):
+        self.payload = payload
+        self.urls = []
+
+    def get(self, url):
+        self.urls.append(url)
+
+        return FakeResponse(self.payload)
+
+
+def build_adapter(fixture=None, payload=None):
+    if fixture:
+        with open(os.path.join(FIXTURES_DIR, fixture)) as fd:
+            payload = json.load(fd)
+
+    adapter = AlphaVantageAdapter(url="https://alpha.test", key="key")
+    adapter.session = FakeSession(payload)
+    adapter.rate_limit = TokenBucket(1000, capacity=1000)
+
+    return adapter
+
+
+def test_get_daily_adjusted():
+    df = build_adapter("alpha_vantage_daily_adjusted.json").get("AAPL", asset_type="S")
+
+    assert list(df.columns) == ["close"]
+    assert df.index.is_monotonic_increasing
+    assert df.index[0] == pd.Timestamp("2021-01-04")
+    assert df.close.dtype == np.float64
+    assert df.close.tolist() == [128.4, 130.0, 125.6, 129.9, 131.0]
+
+
+def test_get_fx_daily():
+    df = build_adapter("alpha_vantage_fx_daily.json").get("EUR/USD", asset_type="F")
+
+    assert df.close.tolist() == [1.2325, 1.2270, 1.2219]
+    assert df.index[-1] == pd.Timestamp("2021-01-08")
+
+
+def test_get_unknown_symbol():
+    adapter = build_adapter(payload={"Error Message": "Invalid API call"})
+
+    with pytest.raises(SymbolNotFound):
+        adapter.get("UNKNOWN", asset_type="S")
+
+
+def test_get_provider_failures():
+    adapter = build_adapter(payload={})
+    adapter.session.get = lambda url: FailedResponse({})
+
+    with pytest.raises(ProviderUnavailable):
+        adapter.get("AAPL", asset_type="S")
+
+    def unreachable(url):
+        raise requests.ConnectionError("Connection refused")
+
+    adapter.session.get = unreachable
+
+    with pytest.raises(ProviderUnavailable):
+        adapter.get("AAPL", asset_type="S")
+
+
+def test_get_compact_since_recent_date():
+    adapter = build_adapter("alpha_vantage_daily_adjusted.json")
+
+    adapter.get("AAPL", asset_type="S", since=pd.Timestamp.today() - pd.Timedelta(days=10))
+    adapter.get("AAPL", asset_type="S", since=pd.Timestamp.today() - pd.Timedelta(days=365))
+    adapter.get("AAPL", asset_type="S")
+
+    assert ["outputsize=compact" in url for url in adapter.session.urls] == [True, False, False]
@@ -0,0 +1,212 @@
+from threading import Event
+from time import monotonic
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from adapters.datareaders.exceptions import (NoDataAvailable,
+                                             ProviderUnavailable,
+                                             SymbolNotFound)
+from adapters.datareaders.manager import DataReaderManager
+from adapters.ratelimit import TokenBucket
+
+
+def build_dataframe(rows=10):
+    return pd.DataFrame(
+        {"close": np.arange(rows, dtype=float)},
+        index=pd.bdate_range("2020-01-01", periods=rows)
+    )
+
+
+class FakeAdapter(object):
+    max_workers = 2
+
+    def __init__(self, name, symbols=(), released=None):
+        self.name = name
+        self.symbols = symbols
+        self.released = released
+        self.calls = []
+
+    def get(self, symbol, asset_type=None, since=None):
+        self.since = since
+
+        if self.released:
+            self.released.wait(timeout=5)
+
+        self.calls.append(symbol)
+
+        if symbol not in self.symbols:
+            raise SymbolNotFound(symbol)
+
+        return build_dataframe()
+
+
+def test_token_bucket_allows_bursts_then_waits():
+    bucket = TokenBucket(10, capacity=2)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert 0 < bucket.try_acquire() <= 0.1
+
+    start = monotonic()
+    bucket.acquire()
+
+    assert monotonic() - start > 0.05
+
+
+def test_manager_falls_back_to_next_adapter():
+    first = FakeAdapter("first", symbols=("AAA",))
+    second = FakeAdapter("second", symbols=("BBB",))
+    manager = DataReaderManager(first, second)
+
+    source, df = manager.get("BBB", "S", since="2020-01-10")
+
+    assert source == "second"
+    assert second.since == "2020-01-10"
+    # The since row is kept to be checked against the stored one
+    assert df.index[0] == pd.Timestamp("2020-01-10")
+    assert manager.get("CCC", "S") == (None, None)
+
+
+def test_manager_submit_doesnt_wait_on_a_blocked_adapter():
+    released = Event()
+    slow = FakeAdapter("slow", released=released)
+    fast = FakeAdapter("fast", symbols=("AAA", "BBB"))
+    manager = DataReaderManager(fast, slow)
+
+    blocked = manager.submit("CCC", "S")
+    results = [manager.submit(symbol, "S").result(timeout=5) for symbol in ("AAA", "BBB")]
+
+    assert [source for source, _ in results] == ["fast", "fast"]
+    assert not blocked.done()
+
+    released.set()
+
+    assert blocked.result(timeout=5) == (None, None)
+
+    manager.shutdown()
+
+
+def test_manager_starts_with_last_source():
+    first = FakeAdapter("first", symbols=("AAA",))
+    second = FakeAdapter("second", symbols=("AAA", "BBB"))
+    manager = DataReaderManager(first, second)
+
+    assert manager.get("BBB", "S")[0] == "second"
+    assert manager.get("BBB", "S")[0] == "second"
+    assert first.calls == ["BBB"]
+
+    assert manager.get("AAA", "S", source="second")[0] == "second"
+    assert first.calls == ["BBB"]
+
+
+def test_manager_remembers_missing_symbols(redis):
+    from adapters import redis as redis_adapter
+
+    for store in (None, redis_adapter):
+        adapter = FakeAdapter("missing", symbols=("AAA",))
+        manager = DataReaderManager(adapter, redis=store, missing_ttl=60)
+
+        assert manager.get("ZZZ", "S") == (None, None)
+        assert manager.get("ZZZ", "S") == (None, None)
+        assert adapter.calls == ["ZZZ"]
+        assert manager.stats["missing"]["skipped"] == 1
+
+        redis_adapter.delete_all("datareaders:*")
+
+
+class LateAdapter(FakeAdapter):
+    """
+    Answer without rows on the first call of each symbol
+    """
+
+    def get(self, symbol, asset_type=None, since=None):
+        if symbol not in self.calls:
+            self.calls.append(symbol)
+            return build_dataframe().iloc[:0]
+
+        return super().get(symbol, asset_type=asset_type, since=since)
+
+
+def test_manager_doesnt_remember_empty_answers():
+    adapter = LateAdapter("late", symbols=("AAA",))
+    manager = DataReaderManager(adapter)
+
+    source, df = manager.get("AAA", "S", since="2020-01-01")
+
+    assert source == "late"
+    assert df.empty
+    assert not manager.is_missing(adapter, "AAA")
+
+    source, df = manager.get("AAA", "S", since="2020-01-01")
+
+    assert source == "late"
+    assert len(df) == 10
+
+
+class BrokenAdapter(FakeAdapter):
+    def get(self, symbol, asset_type=None, since=None):
+        self.calls.append(symbol)
+
+        raise ConnectionError("Connection refused")
+
+
+class FlakyAdapter(FakeAdapter):
+    def __init__(self, name, error):
+        super().__init__(name)
+
+        self.error = error
+
+    def get(self, symbol, asset_type=None, since=None):
+        self.calls.append(symbol)
+
+        raise self.error(symbol)
+
+
+@pytest.mark.parametrize("error", [ProviderUnavailable, NoDataAvailable])
+def test_manager_doesnt_remember_failed_requests(error):
+    adapter = FlakyAdapter("flaky", error)
+    manager = DataReaderManager(adapter, threshold=2, cooldown=60)
+
+    for _ in range(3):
+        try:
+            manager.get("AAA", "S")
+        except ProviderUnavailable:
+            pass
+
+    assert not manager.is_missing(adapter, "AAA")
+
+    if error is ProviderUnavailable:
+        # Tripped the breaker instead
+        assert len(adapter.calls) == 2
+        assert manager.stats["flaky"]["failures"] == 2
+    else:
+        assert len(adapter.calls) == 3
+        assert manager.stats["flaky"]["not_found"] == 3
+
+
+def test_manager_breaker_skips_failing_adapter():
+    broken = BrokenAdapter("broken")
+    fallback = FakeAdapter("fallback", symbols=("AAA", "BBB", "CCC"))
+    manager = DataReaderManager(broken, fallback, threshold=2, cooldown=60)
+
+    for symbol in ("AAA", "BBB", "CCC"):
+        assert manager.get(symbol, "S")[0] == "fallback"
+
+    assert len(broken.calls) == 2
+    assert manager.stats["broken"]["failures"] == 2
+    assert manager.stats["broken"]["skipped"] == 1
+    assert manager.stats["fallback"]["served"] == 3
+
+
+def test_manager_raises_when_providers_are_unavailable():
+    manager = DataReaderManager(BrokenAdapter("broken"), FakeAdapter("empty"))
+
+    with pytest.raises(ProviderUnavailable):
+        manager.get("AAA", "S")
+
+    with pytest.raises(ProviderUnavailable):
+        manager.submit("AAA", "S").result(timeout=5)
+
+    manager.shutdown()
@@ -0,0 +1,130 @@
+import json
+import threading
+
+from datetime import datetime
+from time import time
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import pytest
+
+from adapters import redis as redis_adapter
+from adapters.datareaders.manager import DataReaderManager
+from analyst import scheduler
+from analyst.jobs import DONE
+from analyst.models import Asset
+from analyst.scheduler import RefreshScheduler, get_due_at
+
+from .test_manager import FakeAdapter
+
+
+def test_due_at_next_market_close():
+    paris = Asset(kind="S", country="France")
+    new_york = Asset(kind="S", country="United States")
+    currency = Asset(kind="F", country="France")
+    utc = ZoneInfo("UTC")
+
+    # Friday values are due on Monday close
+    assert get_due_at(paris, datetime(2024, 3, 1)) == datetime(2024, 3, 4, 16, 30, tzinfo=utc).timestamp()
+    assert get_due_at(new_york, datetime(2024, 3, 4), delay=60) == datetime(2024, 3, 5, 21, 1, tzinfo=utc).timestamp()
+    assert get_due_at(currency, datetime(2024, 3, 4)) == datetime(2024, 3, 5, 22, tzinfo=utc).timestamp()
+    assert get_due_at(Asset(kind="C"), datetime(2024, 3, 1)) == datetime(2024, 3, 2, 22, tzinfo=utc).timestamp()
+    assert get_due_at(paris, None) == 0.0
+
+
+def test_pop_due_most_stale_first():
+    refresh_scheduler = RefreshScheduler()
+
+    refresh_scheduler.schedule(1, 30.0)
+    refresh_scheduler.schedule(2, 10.0)
+    refresh_scheduler.schedule(3, 20.0)
+    refresh_scheduler.schedule(4, 500.0)
+
+    # Rescheduled, the previous entry is ignored
+    refresh_scheduler.schedule(3, 400.0)
+
+    assert refresh_scheduler.get_stats(100.0) == {
+        **refresh_scheduler.get_stats(100.0), "scheduled": 4, "due": 2, "lag": 90.0
+    }
+    assert refresh_scheduler.pop_due(100.0) == (2, 10.0)
+    assert refresh_scheduler.pop_due(100.0) == (1, 30.0)
+    assert refresh_scheduler.pop_due(100.0) is None
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    adapter = FakeAdapter("fake", symbols=("AAA",))
+    monkeypatch.setattr(scheduler, "datareaders", DataReaderManager(adapter))
+
+    return adapter
+
+
+@pytest.mark.django_db
+def test_refresh_and_reschedule(clean_timeseries, adapter):
+    stored = Asset.objects.create(name="a", kind="S", ticker="AAA", country="France")
+    missing = Asset.objects.create(name="b", kind="S", ticker="BBB")
+    no_ticker = Asset.objects.create(name="c", kind="S")
+
+    refresh_scheduler = RefreshScheduler(max_in_flight=1, retry_delay=60, max_retry_delay=3600)
+    refresh_scheduler.run_once()
+
+    assert len(refresh_scheduler.in_flight) == 1
+
+    while refresh_scheduler.in_flight:
+        refresh_scheduler.wakeup.wait(5)
+        refresh_scheduler.run_once()
+
+    now = time()
+    refresh_scheduler.report(now)
+    stats = json.loads(redis_adapter.get(RefreshScheduler.stats_label))
+
+    assert sorted(adapter.calls) == ["AAA", "BBB"]
+    assert len(stored.dataframe) == 10
+    assert refresh_scheduler.failures == {missing.id: 1}
+    assert now < refresh_scheduler.scheduled[stored.id] <= now + 60
+    assert now < refresh_scheduler.scheduled[missing.id] <= now + 60
+    assert now + 60 < refresh_scheduler.scheduled[no_ticker.id] <= now + 3600
+    assert stats["scheduled"] == 3
+    assert stats["due"] == 0
+
+
+@pytest.mark.django_db
+def test_backoff_while_values_are_late(clean_timeseries):
+    asset = Asset.objects.create(name="a", kind="S", country="France")
+    asset.store_dataframe(pd.DataFrame({"close": [1.0, 2.0]}, index=pd.bdate_range("2024-03-01", periods=2)))
+    last_index = asset.get_last_index()
+
+    refresh_scheduler = RefreshScheduler(retry_delay=60, max_retry_delay=200)
+    now = time()
+    delays = []
+
+    # No new values after each refresh
+    for _ in range(4):
+        refresh_scheduler.reschedule(asset, DONE, now, last_index=last_index)
+        delays.append(refresh_scheduler.scheduled[asset.id] - now)
+
+    assert delays == [60, 120, 200, 200]
+
+    # New values are late too, retried without delay growth
+    refresh_scheduler.reschedule(asset, DONE, now, last_index=last_index - pd.offsets.BDay(1))
+
+    assert refresh_scheduler.scheduled[asset.id] == now + 60
+    assert refresh_scheduler.misses == {}
+
+
+@pytest.mark.django_db
+def test_stop_drains_in_flight(clean_timeseries, adapter):
+    adapter.released = threading.Event()
+    asset = Asset.objects.create(name="a", kind="S", ticker="AAA")
+
+    refresh_scheduler = RefreshScheduler()
+
+    def stop():
+        refresh_scheduler.stop()
+        adapter.released.set()
+
+    threading.Timer(0.2, stop).start()
+    refresh_scheduler.run()
+
+    assert refresh_scheduler.in_flight == {}
+    assert len(asset.dataframe) == 10
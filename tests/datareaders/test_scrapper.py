@@ -0,0 +1,104 @@
+import pytest
+
+from adapters.datareaders.manager import DataReaderManager
+from analyst import scrapper
+from analyst.jobs import RefreshJob
+from analyst.models import Asset
+
+from .test_manager import FakeAdapter, build_dataframe
+
+
+class FlakyAdapter(FakeAdapter):
+    """
+    Fail on the first call of each symbol
+    """
+
+    def get(self, symbol, asset_type=None, since=None):
+        if symbol not in self.calls:
+            self.calls.append(symbol)
+            raise ConnectionError(f"Connection reset on {symbol}")
+
+        return super().get(symbol, asset_type=asset_type, since=since)
+
+
+@pytest.fixture
+def assets():
+    return [
+        Asset.objects.create(name="a", kind="S", ticker="AAA"),
+        Asset.objects.create(name="b", kind="S", ticker="BBB"),
+        Asset.objects.create(name="c", kind="S")
+    ]
+
+
+def use_adapter(monkeypatch, adapter):
+    monkeypatch.setattr(scrapper, "datareaders", DataReaderManager(adapter))
+
+
+@pytest.mark.django_db
+def test_scrap_values_records_tasks(redis, monkeypatch, assets):
+    use_adapter(monkeypatch, FakeAdapter("fake", symbols=("AAA",)))
+
+    job = scrapper.scrap_values()
+    tasks = job.get_tasks()
+
+    assert RefreshJob.get_last().id == job.id
+    assert tasks[assets[0].id]["status"] == "done"
+    assert tasks[assets[0].id]["reason"] == "10 rows stored"
+    assert tasks[assets[0].id]["duration"] >= 0
+    assert tasks[assets[1].id] == {**tasks[assets[1].id], "status": "failed", "reason": "no data"}
+    assert tasks[assets[2].id]["status"] == "skipped"
+    assert job.get_summary() == {"done": 1, "failed": 1, "skipped": 1, "pending": 0}
+
+
+@pytest.mark.django_db
+def test_scrap_values_retries_failed_tasks(redis, monkeypatch, assets):
+    adapter = FlakyAdapter("flaky", symbols=("AAA", "BBB"))
+    use_adapter(monkeypatch, adapter)
+
+    job = scrapper.scrap_values()
+
+    assert job.get_summary() == {"done": 0, "failed": 2, "skipped": 1, "pending": 0}
+    assert "Connection reset" in job.get_tasks()[assets[0].id]["reason"]
+
+    retried = scrapper.scrap_values(retry_failed=True)
+
+    assert retried.id == job.id
+    assert job.get_summary() == {"done": 2, "failed": 0, "skipped": 1, "pending": 0}
+    assert len(Asset.objects.get(name="b").dataframe) == 10
+
+
+@pytest.mark.django_db
+def test_scrap_values_resumes_pending_tasks(redis, monkeypatch, assets):
+    adapter = FakeAdapter("fake", symbols=("AAA", "BBB"))
+    use_adapter(monkeypatch, adapter)
+
+    # Stopped after the first asset
+    job = RefreshJob.create([asset.id for asset in assets])
+    job.finish(assets[0].id, "done")
+
+    assert scrapper.scrap_values(resume=True).id == job.id
+    assert adapter.calls == ["BBB"]
+    assert job.get_summary() == {"done": 2, "failed": 0, "skipped": 1, "pending": 0}
+    assert scrapper.scrap_values(job_id="unknown") is None
+
+
+@pytest.mark.django_db
+def test_store_values_refetches_rebased_serie(clean_timeseries, monkeypatch):
+    adapter = FakeAdapter("fake", symbols=("AAA",))
+    use_adapter(monkeypatch, adapter)
+
+    asset = Asset.objects.create(name="a", kind="S", ticker="AAA")
+    stored = build_dataframe()
+    asset.store_dataframe(stored.iloc[:5])
+
+    # Same close on the last stored date, the new rows are appended
+    assert scrapper.store_values(asset, "AAA", None, stored.index[4], "fake", stored.iloc[4:7]) == (
+        "done", "2 rows appended"
+    )
+
+    # Closes adjusted by a dividend, the whole serie is fetched again
+    status, reason = scrapper.store_values(asset, "AAA", None, stored.index[6], "fake", stored.iloc[6:] * 0.9)
+
+    assert (status, reason) == ("done", "values rebased, 10 rows stored")
+    assert adapter.calls == ["AAA"]
+    assert asset.dataframe["close"].tolist() == stored["close"].tolist()
@@ -0,0 +1,46 @@
+import sys
+
+import pandas as pd
+import pytest
+
+from pandas_datareader._utils import RemoteDataError
+
+from adapters.datareaders.exceptions import ProviderUnavailable, SymbolNotFound
+from adapters.datareaders.yahoo import YahooAdapter
+
+
+def test_get_starts_from_since(monkeypatch):
+    starts = []
+
+    def data_reader(symbol, source, start=None, **kwargs):
+        starts.append(start)
+
+        return pd.DataFrame(
+            {"Close": [1.0, 2.0], "Adj Close": [1.0, 2.0]},
+            index=pd.to_datetime(["2021-01-05", "2021-01-04"])
+        )
+
+    monkeypatch.setattr(sys.modules[YahooAdapter.__module__], "DataReader", data_reader)
+
+    adapter = YahooAdapter()
+    df = adapter.get("AAPL", asset_type="S", since=pd.Timestamp("2021-01-01"))
+    adapter.get("AAPL", asset_type="S")
+
+    assert starts == [pd.Timestamp("2021-01-01"), "1950-01-01"]
+    assert df.close.tolist() == [2.0, 1.0]
+
+
+@pytest.mark.parametrize("message, error", [
+    ("No data fetched for symbol ZZZ using YahooDailyReader", SymbolNotFound),
+    ("Unable to read URL: https://finance.yahoo.com\nResponse Text:\nb'404 Not Found'", SymbolNotFound),
+    ("Unable to read URL: https://finance.yahoo.com\nException:\nConnection refused", ProviderUnavailable),
+    ("Unable to read URL: https://finance.yahoo.com\nResponse Text:\nb'503 Service Unavailable'", ProviderUnavailable),
+])
+def test_get_errors(monkeypatch, message, error):
+    def data_reader(symbol, source, **kwargs):
+        raise RemoteDataError(message)
+
+    monkeypatch.setattr(sys.modules[YahooAdapter.__module__], "DataReader", data_reader)
+
+    with pytest.raises(error):
+        YahooAdapter().get("ZZZ", asset_type="S")
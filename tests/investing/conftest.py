@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import sleep
+
+import pytest
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+ROUTES = {
+    "/indices/major-indices": "major-indices.html",
+    "/indices/france-40": "france-40.html",
+    "/indices/france-40-components": "components.html",
+    "/indices/france-40-components/2": "components_2.html",
+    "/equities/air-liquide": "air-liquide.html",
+    "/equities/airbus-group": "airbus-group.html",
+    "/equities/total": "total.html",
+    "/equities/vinci": "vinci.html",
+}
+
+
+class StubHandler(SimpleHTTPRequestHandler):
+    """
+    Serve the saved pages slowly, counting the requests in flight
+    """
+    lock = Lock()
+    in_flight = 0
+    max_in_flight = 0
+    paths = []
+
+    def do_GET(self):
+        cls = type(self)
+
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+            cls.paths.append(self.path)
+
+        sleep(0.05)
+
+        with cls.lock:
+            cls.in_flight -= 1
+
+        if self.path not in ROUTES:
+            self.send_error(404)
+            return
+
+        with open(os.path.join(FIXTURES_DIR, ROUTES[self.path]), "rb") as fd:
+            content = fd.read()
+
+        etag = f'"{hashlib.md5(content).hexdigest()}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    """
+    Stub of investing.com serving the saved pages
+    """
+    StubHandler.in_flight = StubHandler.max_in_flight = 0
+    StubHandler.paths = []
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    StubHandler.url = f"http://127.0.0.1:{server.server_port}"
+
+    yield StubHandler
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,56 @@
+from adapters.investing import InvestingAdapter
+
+
+def build_adapter(url, concurrency=4, **kwargs):
+    return InvestingAdapter(url=url, concurrency=concurrency, requests_per_minute=60000, **kwargs)
+
+
+def test_crawl_assets_matches_sync_assets(stub):
+    adapter = build_adapter(stub.url)
+
+    crawled = {asset["name"]: asset for asset in adapter.crawl_assets("/indices/france-40")}
+
+    assert stub.max_in_flight > 1
+
+    assets = adapter.get_assets("/indices/france-40")
+
+    for asset in assets.values():
+        asset.update(adapter.get_asset(asset["link"]))
+
+    assert crawled == assets
+    assert crawled["Vinci"]["pending_ticker"] == "DG"
+    assert crawled["Vinci"]["kind"] == "S"
+    assert crawled["Vinci"]["close"] == 101.5
+
+
+def test_crawl_assets_skips_details(stub):
+    adapter = build_adapter(stub.url)
+
+    crawled = {
+        asset["name"]: asset
+        for asset in adapter.crawl_assets("/indices/france-40", skip={"Air Liquide", "Vinci"})
+    }
+
+    assert set(crawled) == {"Air Liquide", "Airbus Group", "TotalEnergies", "Vinci"}
+    assert "kind" not in crawled["Vinci"]
+    assert crawled["TotalEnergies"]["pending_ticker"] == "TTE"
+    assert "/equities/vinci" not in stub.paths
+
+
+def test_crawl_assets_keeps_concurrency(stub):
+    adapter = build_adapter(stub.url, concurrency=1)
+
+    assert len(list(adapter.crawl_assets("/indices/france-40"))) == 4
+    assert stub.max_in_flight == 1
+
+
+def test_crawl_assets_follows_politeness_budget(stub):
+    adapter = InvestingAdapter(url=stub.url, concurrency=4, requests_per_minute=600)
+    adapter.rate_limit.tokens = 0
+
+    crawled = adapter.crawl_assets("/indices/france-40")
+    next(crawled)
+    crawled.close()
+
+    # At least the first page and one asset page, 0.1s apart
+    assert 2 <= len(stub.paths) <= 4
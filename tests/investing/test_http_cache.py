@@ -0,0 +1,68 @@
+import os
+
+from adapters.http_cache import ResponseCache
+from adapters.timeseries import codecs
+
+from .test_crawler import build_adapter
+
+ENDPOINT = "/equities/vinci"
+
+
+def test_cache_serves_fresh_responses(stub, tmp_path):
+    adapter = build_adapter(stub.url, cache_path=str(tmp_path))
+    adapter.rate_limit.tokens = 0
+
+    soup = adapter.get_soup(ENDPOINT)
+    tokens = adapter.rate_limit.tokens
+
+    assert adapter.get_soup(ENDPOINT).text == soup.text
+    assert stub.paths == [ENDPOINT]
+    assert adapter.rate_limit.tokens >= tokens
+    assert adapter.cache.stats == {"hits": 1, "revalidations": 0, "misses": 1}
+
+
+def test_cache_stores_compressed_bodies(stub, tmp_path):
+    adapter = build_adapter(stub.url, cache_path=str(tmp_path))
+    content = adapter.fetch(ENDPOINT)
+
+    body_file, = [name for name in os.listdir(tmp_path) if name.endswith(".body")]
+
+    with open(tmp_path / body_file, "rb") as fd:
+        blob = fd.read()
+
+    assert codecs.get_blob_codec(blob) == "zlib"
+    assert codecs.decode(blob) == content
+
+
+def test_cache_revalidates_stale_responses(stub, tmp_path):
+    adapter = build_adapter(stub.url, cache_path=str(tmp_path), cache_ttl=0)
+
+    content = adapter.fetch(ENDPOINT)
+
+    assert adapter.get_cached(ENDPOINT) is None
+    assert adapter.fetch(ENDPOINT) == content
+    assert adapter.cache.stats == {"hits": 0, "revalidations": 1, "misses": 1}
+    assert len(stub.paths) == 2
+
+
+def test_cache_is_shared_by_the_crawler(stub, tmp_path):
+    adapter = build_adapter(stub.url, cache_path=str(tmp_path))
+
+    crawled = {asset["name"]: asset for asset in adapter.crawl_assets("/indices/france-40")}
+    requests = len(stub.paths)
+
+    adapter = build_adapter(stub.url, cache_path=str(tmp_path))
+
+    assert {asset["name"]: asset for asset in adapter.crawl_assets("/indices/france-40")} == crawled
+    assert len(stub.paths) == requests
+    assert adapter.cache.stats["hits"] == requests
+
+
+def test_cache_ignores_missing_bodies(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.set("http://host/page", b"<html></html>", {"ETag": '"abc"'})
+
+    os.remove(cache._get_path("http://host/page", "body"))
+
+    assert cache.get("http://host/page") is None
+    assert cache.get_validators("http://host/page") == {"If-None-Match": '"abc"'}
@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from adapters.investing import InvestingAdapter
+from adapters.parsing import PARSERS, UnknownParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as fd:
+        return fd.read()
+
+
+def extract(adapter, content):
+    """
+    Everything the adapter reads from a page
+    """
+    soup = adapter.parse_html(content)
+    parser = adapter.parser
+    data = {
+        "page_count": adapter.get_page_count(soup),
+        "ticker": adapter.get_ticker_datas(soup),
+        "extra": adapter.parse_extra_list(soup)
+    }
+
+    if parser.find_id(soup, "cross_rates_container") is not None:
+        data["indices"] = [adapter.parse_span(row) for row in adapter.get_rows(soup, "cross_rates_container")]
+
+    if parser.find_id(soup, "marketInnerContent") is not None:
+        data["assets"] = adapter.parse_assets(soup)
+
+    return data
+
+
+@pytest.mark.parametrize("fixture", sorted(os.listdir(FIXTURES_DIR)))
+def test_parsers_parity(fixture):
+    content = read_fixture(fixture)
+    results = [extract(InvestingAdapter(parser=name), content) for name in PARSERS]
+
+    assert all(result == results[0] for result in results[1:])
+
+
+@pytest.mark.parametrize("parser", list(PARSERS))
+def test_parse_indices(parser):
+    adapter = InvestingAdapter(parser=parser)
+    data = extract(adapter, read_fixture("major-indices.html"))
+
+    assert data["indices"][2] == {
+        "name": "BRVM Composite",
+        "link": "/indices/brvm-composite",
+        "country": "Côte d'Ivoire"
+    }
+    assert data["indices"][3]["name"] == "SMI Zürich"
+    assert data["page_count"] == 1
+
+
+@pytest.mark.parametrize("parser", list(PARSERS))
+def test_parse_asset(parser):
+    adapter = InvestingAdapter(parser=parser)
+
+    vinci = adapter.parse_asset("/equities/vinci", adapter.parse_html(read_fixture("vinci.html")))
+    index = adapter.parse_asset("/indices/france-40", adapter.parse_html(read_fixture("france-40.html")))
+
+    assert vinci["pending_ticker"] == "DG"
+    assert vinci["currency"] == "EUR"
+    assert vinci["shares"] == 590260000
+    assert vinci["beta"] == 0.0
+    assert index == {
+        "pending_ticker": "^FCHI",
+        "close": 7123.45,
+        "dividend": 0.0,
+        "link": "/indices/france-40",
+        "kind": "I"
+    }
+
+
+def test_unknown_parser():
+    with pytest.raises(UnknownParser):
+        InvestingAdapter(parser="html5lib")
@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from analyst import scrapper
+from analyst.models import Asset, Index
+
+from .test_crawler import build_adapter
+
+CONFIG = {"indice": {"include": {"name": ["CAC 40"]}}}
+
+
+@pytest.fixture
+def investing(stub, monkeypatch):
+    adapter = build_adapter(stub.url, config=CONFIG)
+    monkeypatch.setattr(scrapper, "investing", adapter)
+
+    return adapter
+
+
+def scrap(**kwargs):
+    with CaptureQueriesContext(connection) as queries:
+        scrapper.scrap_investing(**kwargs)
+
+    return len(queries)
+
+
+@pytest.mark.django_db
+def test_scrap_investing_stores_index(investing):
+    scrap()
+
+    indice = Index.objects.get(name="CAC 40")
+
+    assert indice.asset.extra_data["pending_ticker"] == "^FCHI"
+    assert sorted(indice.components.values_list("name", flat=True)) == [
+        "Air Liquide", "Airbus Group", "TotalEnergies", "Vinci"
+    ]
+    assert Asset.objects.get(name="Vinci").extra_data["pending_ticker"] == "DG"
+
+
+@pytest.mark.django_db
+def test_scrap_investing_query_count_is_constant(investing, monkeypatch):
+    monkeypatch.setattr(investing, "get_page_count", lambda soup: 1)
+    first_page_queries = scrap()
+
+    assert Index.objects.get(name="CAC 40").components.count() == 2
+
+    Index.objects.all().delete()
+    Asset.objects.all().delete()
+    monkeypatch.undo()
+    monkeypatch.setattr(scrapper, "investing", investing)
+
+    assert scrap() == first_page_queries
+    assert Index.objects.get(name="CAC 40").components.count() == 4
+
+
+@pytest.mark.django_db
+def test_scrap_investing_updates_stale_assets(investing, monkeypatch):
+    scrap()
+
+    yesterday = timezone.now() - timedelta(days=1)
+    Asset.objects.update(updated_at=yesterday)
+    Asset.objects.filter(name="Air Liquide").update(country="Spain")
+
+    monkeypatch.setattr(investing, "get_page_count", lambda soup: 1)
+    scrap()
+
+    assert Asset.objects.get(name="Air Liquide").country == "France"
+    assert Asset.objects.get(name="Air Liquide").up_to_date()
+    assert sorted(Index.objects.get(name="CAC 40").components.values_list("name", flat=True)) == [
+        "Air Liquide", "Airbus Group"
+    ]
+
+
+@pytest.mark.django_db
+def test_crawl_skips_up_to_date_assets_in_a_query(investing):
+    scrap(crawl=True)
+
+    Asset.objects.bulk_create([Asset(name=f"other {i}") for i in range(20)])
+    queries = scrap(crawl=True)
+
+    Asset.objects.bulk_create([Asset(name=f"another {i}") for i in range(20)])
+
+    assert scrap(crawl=True) == queries
+    assert Index.objects.get(name="CAC 40").components.count() == 4
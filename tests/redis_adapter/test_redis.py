@@ -0,0 +1,43 @@
+import pytest
+
+from adapters import redis as redis_adapter
+
+
+def test_mset_mget(redis):
+    redis_adapter.mset({"mkey_1": "1", "mkey_2": "2"})
+
+    assert redis_adapter.mget(["mkey_1", "mkey_2", "mkey_3"]) == [b"1", b"2", None]
+
+
+def test_pipeline(redis):
+    with redis_adapter.pipeline() as pipeline:
+        pipeline.set("pipe_key", "value")
+        pipeline.incr("pipe_counter")
+        pipeline.get("pipe_key")
+
+    assert pipeline.results == [True, 1, b"value"]
+
+
+def test_pipeline_discarded_on_error(redis):
+    with pytest.raises(ValueError):
+        with redis_adapter.pipeline() as pipeline:
+            pipeline.set("discarded_key", "value")
+            raise ValueError()
+
+    assert redis_adapter.get("discarded_key") is None
+
+
+def test_scan_and_delete_all(redis):
+    redis_adapter.mset({f"scan_{i}": i for i in range(25)})
+
+    assert len(list(redis_adapter.scan_iter("scan_*", count=10))) == 25
+    assert redis_adapter.delete_all("scan_*", chunk_size=10) == 25
+    assert list(redis_adapter.scan_iter("scan_*")) == []
+
+
+def test_hash(redis):
+    redis_adapter.hset("hash_key", {"a": "1", "b": "2"})
+    redis_adapter.hset("hash_key", {"b": "3"})
+
+    assert redis_adapter.hgetall("hash_key") == {b"a": b"1", b"b": b"3"}
+    assert redis_adapter.expire("hash_key", 60)
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+from adapters.timeseries.cache import LRUCache, get_size
+
+
+def build_dataframe(rows=100):
+    return pd.DataFrame(
+        {"close": np.arange(rows, dtype=float)},
+        index=pd.bdate_range("2020-01-01", periods=rows)
+    )
+
+
+def test_cache_serves_matching_version():
+    cache = LRUCache(max_size=2 ** 20)
+    dataframe = build_dataframe()
+
+    cache.set("serie", 1, dataframe)
+
+    assert cache.get("serie", 1) is dataframe
+    assert cache.get("serie", 2) is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    dataframe = build_dataframe()
+    cache = LRUCache(max_size=get_size(dataframe) * 2)
+
+    cache.set("first", 1, dataframe)
+    cache.set("second", 1, dataframe)
+    cache.get("first", 1)
+    cache.set("third", 1, dataframe)
+
+    assert cache.get("second", 1) is None
+    assert cache.get("first", 1) is dataframe
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["size"] == get_size(dataframe) * 2
+
+
+def test_cache_skips_values_bigger_than_its_size():
+    cache = LRUCache(max_size=10)
+
+    cache.set("serie", 1, build_dataframe())
+
+    assert cache.stats["entries"] == 0
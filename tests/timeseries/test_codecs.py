@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from adapters.timeseries import codecs
+from adapters.timeseries.exceptions import UnknownCodec
+
+DATA = b"\x01\x00\x01\x00" + bytes(range(256)) * 64
+
+
+@pytest.mark.parametrize("name", list(codecs.CODECS))
+def test_round_trip(name):
+    codec = codecs.get_codec(name)
+    blob = codecs.encode(DATA, codec)
+
+    assert codecs.is_framed(blob)
+    assert codecs.get_blob_codec(blob) == name
+    assert len(blob) < len(DATA)
+    assert codecs.decode(blob) == DATA
+
+
+def test_no_codec():
+    assert codecs.get_codec("none") is None
+    assert codecs.encode(DATA, None) == DATA
+    assert codecs.decode(DATA) == DATA
+
+
+def test_concatenated_frames():
+    blob = (
+        codecs.encode(DATA, codecs.get_codec("zstd")) +
+        codecs.encode(DATA, codecs.get_codec("zlib"))
+    )
+
+    assert codecs.decode(blob) == DATA * 2
+
+
+@pytest.mark.parametrize("name", list(codecs.CODECS))
+def test_concurrent_round_trips(name):
+    codec = codecs.get_codec(name)
+    blobs = [codecs.encode(DATA * (i % 7 + 1) * 64, codec) for i in range(64)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert list(executor.map(codecs.decode, blobs)) == [DATA * (i % 7 + 1) * 64 for i in range(64)]
+
+
+def test_unknown_codec():
+    with pytest.raises(UnknownCodec):
+        codecs.get_codec("snappy")
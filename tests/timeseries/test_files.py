@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from adapters.timeseries import FileTimeserieStorage, build_storage
+from adapters.timeseries.exceptions import UnknownBackend
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return FileTimeserieStorage(str(tmp_path), cache_size=2 ** 20)
+
+
+@pytest.fixture
+def dataframe():
+    index = pd.bdate_range("2020-01-01", "2020-12-31")
+
+    return pd.DataFrame(
+        {"close": np.linspace(1, 100, len(index))},
+        index=index
+    )
+
+
+def test_store_and_map(storage, dataframe):
+    storage.set("serie", dataframe, source="yahoo")
+
+    columns, records = storage.get_records("serie")
+
+    assert columns == ["close"]
+    assert isinstance(records, np.memmap)
+    assert np.allclose(records["c0"], dataframe.close.values)
+
+    stored = storage.get("serie")
+
+    assert (stored.index.values == dataframe.index.values).all()
+    assert storage.get_metadata("serie")["source"] == "yahoo"
+    assert storage.get_version("serie") == 1
+
+
+def test_append(storage, dataframe):
+    storage.set("append", dataframe.iloc[:-10])
+    storage.get("append")
+
+    assert storage.append("append", dataframe.iloc[-20:]) == 10
+    assert storage.append("append", dataframe.iloc[-5:]) == 0
+
+    stored = storage.get("append")
+
+    assert (stored.index.values == dataframe.index.values).all()
+    assert storage.get_version("append") == 2
+    assert storage.get_last_index("append") == dataframe.index[-1]
+
+
+def test_missing_and_delete(storage, dataframe):
+    assert storage.get("missing") is None
+    assert storage.get_many(["missing"]) == {}
+
+    storage.set("deleted", dataframe)
+
+    assert storage.delete("deleted") == 2
+    assert storage.get("deleted") is None
+
+
+def test_deleted_serie_not_served_from_another_cache(storage, dataframe):
+    other = FileTimeserieStorage(storage.path, cache_size=2 ** 20)
+
+    storage.set("rebuilt", dataframe.iloc[:8])
+    storage.append("rebuilt", dataframe.iloc[:10])
+    other.get("rebuilt")
+
+    storage.delete("rebuilt")
+
+    assert other.get("rebuilt") is None
+    assert storage.get_metadata("rebuilt") is None
+
+    storage.set("rebuilt", dataframe.iloc[20:28])
+    storage.append("rebuilt", dataframe.iloc[20:30])
+
+    assert other.get("rebuilt").index.equals(dataframe.index[20:30])
+
+
+def test_unknown_backend():
+    with pytest.raises(UnknownBackend):
+        build_storage(backend="memcached")
+
+
+def test_get_range(storage, dataframe):
+    storage.set("range", dataframe)
+
+    stored = storage.get_range("range", start="2020-03-01", end="2020-03-31")
+
+    assert (stored.index.values == dataframe.loc["2020-03-01":"2020-03-31"].index.values).all()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from adapters.timeseries import serializers
+from adapters.timeseries.exceptions import UnknownFormat
+
+
+@pytest.fixture
+def dataframe():
+    index = pd.bdate_range("1970-01-01", "1980-12-31")
+
+    return pd.DataFrame(
+        {"close": np.linspace(1, 100, len(index))},
+        index=index
+    )
+
+
+def assert_same_dataframe(left, right):
+    assert list(left.columns) == list(right.columns)
+    assert (left.index.values == right.index.values).all()
+    assert np.allclose(left.values, right.values)
+
+
+def test_records_round_trip(dataframe):
+    data = serializers.dumps(dataframe)
+
+    assert data[0] == serializers.RECORDS_FORMAT
+    assert not serializers.is_legacy(data)
+
+    assert_same_dataframe(serializers.loads(data), dataframe)
+
+
+def test_records_sort_unordered_rows(dataframe):
+    data = serializers.dumps(dataframe.iloc[::-1])
+
+    assert_same_dataframe(serializers.loads(data), dataframe)
+
+
+def test_legacy_json_still_readable(dataframe):
+    data = dataframe.to_json().encode()
+
+    assert serializers.is_legacy(data)
+
+    assert_same_dataframe(serializers.loads(data), dataframe)
+
+
+def test_unknown_format(dataframe):
+    with pytest.raises(UnknownFormat):
+        serializers.loads(b"\xff" + serializers.dumps(dataframe)[1:])
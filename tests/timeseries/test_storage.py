@@ -0,0 +1,223 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from adapters import redis as redis_adapter
+from adapters import timeseries
+from adapters.timeseries import RedisTimeserieStorage, codecs
+from adapters.timeseries.exceptions import SerieRebased
+
+
+@pytest.fixture
+def dataframe():
+    index = pd.bdate_range("2020-01-01", "2020-12-31")
+
+    return pd.DataFrame(
+        {"close": np.linspace(1, 100, len(index))},
+        index=index
+    )
+
+
+def test_store_and_get(redis, dataframe):
+    timeseries.set("serie", dataframe)
+
+    stored = timeseries.get("serie")
+
+    assert (stored.index.values == dataframe.index.values).all()
+    assert timeseries.get_last_index("serie") == dataframe.index[-1]
+
+
+def test_legacy_serie_migrated_on_read(redis, dataframe):
+    redis_adapter.set("legacy", dataframe.to_json())
+
+    assert len(timeseries.get("legacy")) == len(dataframe)
+    assert timeseries.get_metadata("legacy")["last_date"] == dataframe.index[-1].isoformat()
+
+
+def test_append_only_new_rows(redis, dataframe):
+    timeseries.set("append", dataframe.iloc[:-10])
+
+    assert timeseries.append("append", dataframe.iloc[-20:]) == 10
+    assert timeseries.append("append", dataframe.iloc[-5:]) == 0
+
+    stored = timeseries.get("append")
+
+    assert (stored.index.values == dataframe.index.values).all()
+    assert np.allclose(stored.close.values, dataframe.close.values)
+
+
+def test_append_rebased_serie(redis, dataframe):
+    timeseries.set("rebased", dataframe.iloc[:-10])
+
+    with pytest.raises(SerieRebased):
+        timeseries.append("rebased", dataframe.iloc[-11:] * 0.98)
+
+    assert timeseries.append("rebased", dataframe.iloc[-11:]) == 10
+
+
+def test_concurrent_appends(redis, dataframe, monkeypatch):
+    other = RedisTimeserieStorage(redis_adapter)
+    timeseries.set("concurrent", dataframe.iloc[:10])
+    get_metadata = timeseries.get_metadata
+    raced = []
+
+    def racing_get_metadata(label):
+        metadata = get_metadata(label)
+
+        # Another writer appends the same rows once the metadata is read
+        if not raced:
+            raced.append(other.append(label, dataframe.iloc[:12]))
+
+        return metadata
+
+    monkeypatch.setattr(timeseries, "get_metadata", racing_get_metadata)
+
+    assert timeseries.append("concurrent", dataframe.iloc[:12]) == 0
+    assert raced == [2]
+
+    stored = timeseries.get("concurrent")
+
+    assert stored.index.equals(dataframe.index[:12])
+    assert timeseries.get_metadata("concurrent")["rows"] == 12
+
+
+def test_append_on_missing_serie(redis, dataframe):
+    assert timeseries.append("missing", dataframe) == len(dataframe)
+    assert len(timeseries.get("missing")) == len(dataframe)
+
+
+def test_version_bumped_on_write(redis, dataframe):
+    timeseries.set("versioned", dataframe.iloc[:-1])
+    version = timeseries.get_version("versioned")
+
+    timeseries.append("versioned", dataframe)
+
+    assert timeseries.get_version("versioned") == version + 1
+
+
+def test_cached_serie_invalidated_by_write(redis, dataframe):
+    timeseries.set("cached", dataframe.iloc[:-1])
+    timeseries.get("cached")
+
+    hits = timeseries.cache.hits
+    timeseries.get("cached")
+
+    assert timeseries.cache.hits == hits + 1
+
+    timeseries.append("cached", dataframe)
+
+    assert len(timeseries.get("cached")) == len(dataframe)
+    assert timeseries.cache.hits == hits + 1
+
+
+def test_deleted_serie_not_served_from_another_cache(redis, dataframe):
+    other = RedisTimeserieStorage(redis_adapter, cache_size=2 ** 20)
+
+    timeseries.set("rebuilt", dataframe.iloc[:8])
+    timeseries.append("rebuilt", dataframe.iloc[:10])
+    other.get("rebuilt")
+
+    timeseries.delete("rebuilt")
+
+    assert other.get("rebuilt") is None
+
+    timeseries.set("rebuilt", dataframe.iloc[20:28])
+    timeseries.append("rebuilt", dataframe.iloc[20:30])
+
+    assert other.get("rebuilt").index.equals(dataframe.index[20:30])
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_get_many(redis, dataframe, workers):
+    timeseries.set("many_1", dataframe)
+    timeseries.set("many_2", dataframe.iloc[:10])
+    timeseries.get("many_1")
+
+    dataframes = timeseries.get_many(["many_1", "many_2", "many_3"], workers=workers)
+
+    assert sorted(dataframes) == ["many_1", "many_2"]
+    assert len(dataframes["many_1"]) == len(dataframe)
+    assert len(dataframes["many_2"]) == 10
+
+
+def test_metadata_follows_writes(redis, dataframe):
+    timeseries.set("meta", dataframe.iloc[:-10], source="yahoo")
+    timeseries.append("meta", dataframe, source="alpha_vantage")
+
+    metadata = timeseries.get_metadata("meta")
+    data = b"".join(redis_adapter.mget([timeseries.get_chunk_label("meta", year) for year in metadata["chunks"]]))
+
+    assert metadata["rows"] == len(dataframe)
+    assert metadata["first_date"] == dataframe.index[0].isoformat()
+    assert metadata["last_date"] == dataframe.index[-1].isoformat()
+    assert metadata["last_close"] == dataframe.close.iloc[-1]
+    assert metadata["source"] == "alpha_vantage"
+    assert metadata["size"] == len(data)
+    assert metadata["checksum"] == zlib.crc32(data)
+
+    assert timeseries.get_metadatas(["meta", "no_meta"]) == {"meta": metadata}
+
+
+def test_append_compressed_frame(redis, dataframe):
+    timeseries.set("frames", dataframe.iloc[:-10])
+    timeseries.append("frames", dataframe)
+
+    chunk_label = timeseries.get_chunk_label("frames", 2020)
+
+    assert timeseries.get_metadata("frames")["codec"] == timeseries.codec_name
+    assert len(list(codecs.iter_frames(redis_adapter.get(chunk_label)))) == 2
+    assert (timeseries.get("frames").index.values == dataframe.index.values).all()
+
+    redis_adapter.set("legacy_frames", dataframe.to_json())
+
+    stats = timeseries.recompress(["frames", "legacy_frames", "missing_frames"])
+
+    assert stats["series"] == 2
+    assert len(list(codecs.iter_frames(redis_adapter.get(chunk_label)))) == 1
+    assert timeseries.get_metadata("legacy_frames")["rows"] == len(dataframe)
+    assert timeseries.get_version("legacy_frames") == 1
+    assert (timeseries.get("frames").index.values == dataframe.index.values).all()
+
+    assert timeseries.recompress(["frames", "legacy_frames"])["series"] == 0
+
+
+def test_serie_chunked_by_year(redis):
+    index = pd.bdate_range("2018-06-01", "2020-06-30")
+    dataframe = pd.DataFrame({"close": np.arange(len(index), dtype=float)}, index=index)
+
+    timeseries.set("chunked", dataframe.loc[:"2019-12-20"])
+    timeseries.append("chunked", dataframe)
+
+    assert timeseries.get_metadata("chunked")["chunks"] == [2018, 2019, 2020]
+
+    stored = timeseries.get_range("chunked", start="2019-03-01", end="2019-03-31")
+
+    assert (stored.index.values == dataframe.loc["2019-03-01":"2019-03-31"].index.values).all()
+    assert len(timeseries.get("chunked")) == len(dataframe)
+
+    timeseries.set("chunked", dataframe.loc["2020-01-01":])
+
+    assert timeseries.get_metadata("chunked")["chunks"] == [2020]
+    assert redis_adapter.get(timeseries.get_chunk_label("chunked", 2018)) is None
+
+
+def test_get_many_range(redis, monkeypatch):
+    index = pd.bdate_range("2018-06-01", "2020-06-30")
+    dataframe = pd.DataFrame({"close": np.arange(len(index), dtype=float)}, index=index)
+
+    timeseries.set("range_1", dataframe)
+    timeseries.set("range_2", dataframe.loc[:"2019-06-30"])
+
+    mget = timeseries._mget
+    keys = []
+    monkeypatch.setattr(timeseries, "_mget", lambda batch: keys.extend(batch) or mget(batch))
+
+    dataframes = timeseries.get_many(["range_1", "range_2"], start="2019-12-01", end="2020-01-31")
+
+    assert [key for key in keys if ":chunk:" in key] == [
+        "range_1:chunk:2019", "range_1:chunk:2020", "range_2:chunk:2019"
+    ]
+    assert (dataframes["range_1"].index.values == dataframe.loc["2019-12-01":"2020-01-31"].index.values).all()
+    assert dataframes["range_2"].empty